@@ -0,0 +1,161 @@
+"""Cold start latency of the CLI: import time of confluence_poster.main and wall time of short commands.
+
+Every measurement starts a new interpreter. The median of the repeats is compared against the thresholds in
+cold_start_thresholds.json next to this file, the script exits with 1 if any of them is exceeded.
+
+The heaviest imports are the modules imported (directly or not) by confluence_poster.main,
+sorted by the cumulative import time reported by `python -X importtime`.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--repeats 5] [--top 15] [--output results.json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+THRESHOLDS_FILE = Path(__file__).resolve().parent / "cold_start_thresholds.json"
+RUN_APP = "from confluence_poster.main import app; app()"
+CONFIG = """[pages.page1]
+page_title = "Page"
+page_file = "{page_file}"
+page_space = "SPACE"
+
+[auth]
+confluence_url = "https://confluence.local"
+username = "user"
+password = "password"
+is_cloud = false
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parses the output of -X importtime. Returns (module, self, cumulative) with times in microseconds,
+    keeping the nesting as the indentation of the module name"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        imports.append((module.rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_import() -> Tuple[float, List[Tuple[str, int, int]]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import confluence_poster.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = parse_importtime(result.stderr)
+    main_import = next(_ for _ in imports if _[0].strip() == "confluence_poster.main")
+    return main_import[2] / 1000, imports
+
+
+def heaviest_imports(imports: List[Tuple[str, int, int]], top: int) -> List[dict]:
+    """Modules imported while importing confluence_poster.main, heaviest first.
+
+    -X importtime prints the imported module after the modules it imported, so the chain of
+    confluence_poster.main is everything printed before it, up to the previous top level import
+    """
+    end = next(
+        number
+        for number, (module, *_) in enumerate(imports)
+        if module.strip() == "confluence_poster.main"
+    )
+    start = end
+    while start > 0 and imports[start - 1][0].startswith("  "):
+        start -= 1
+    chain = [
+        {
+            "module": module.strip(),
+            "self_ms": self_us / 1000,
+            "cumulative_ms": cum_us / 1000,
+        }
+        for module, self_us, cum_us in imports[start:end]
+    ]
+    return sorted(chain, key=lambda _: _["cumulative_ms"], reverse=True)[:top]
+
+
+def measure_command(args: List[str]) -> float:
+    start = perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", RUN_APP] + args,
+        capture_output=True,
+        check=True,
+    )
+    return (perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Write JSON here instead of stdout"
+    )
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp:
+        page_file = Path(tmp) / "page.md"
+        page_file.write_text("# Title\n\nSome *text*\n")
+        config_file = Path(tmp) / "config.toml"
+        config_file.write_text(CONFIG.format(page_file=page_file))
+        commands = {
+            "version": ["--version"],
+            "help": ["--help"],
+            "validate": ["--config", str(config_file), "validate"],
+            "convert_markdown": ["--config", str(config_file), "convert-markdown"],
+        }
+
+        import_times, imports = [], []
+        for _ in range(args.repeats):
+            import_time, imports = measure_import()
+            import_times.append(import_time)
+        results: Dict[str, float] = {"import_ms": round(median(import_times), 1)}
+        for name, command in commands.items():
+            results[f"{name}_ms"] = round(
+                median(measure_command(command) for _ in range(args.repeats)), 1
+            )
+
+    thresholds = json.loads(THRESHOLDS_FILE.read_text())
+    exceeded = {
+        name: {"value": results[name], "threshold": threshold}
+        for name, threshold in thresholds.items()
+        if results[name] > threshold
+    }
+    output = json.dumps(
+        {
+            "benchmark": "cold_start",
+            "python_version": sys.version.split()[0],
+            "repeats": args.repeats,
+            "results": results,
+            "thresholds": thresholds,
+            "exceeded": exceeded,
+            "heaviest_imports": heaviest_imports(imports, args.top),
+        },
+        indent=2,
+        sort_keys=True,
+    )
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+    for name, values in exceeded.items():
+        print(
+            f"{name}: {values['value']} ms exceeds the threshold of {values['threshold']} ms",
+            file=sys.stderr,
+        )
+    sys.exit(1 if exceeded else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Throughput and output equivalence of the markdown engines that can be set with markdown_engine in the config.
+
+Converts the markdown files of the project and synthetic documents of the given sizes with every installed engine.
+The output of every engine is compared with the output of python-markdown, the default one, after normalizing
+the whitespace between the tags and the form of empty elements. Engines that are not installed are reported as such.
+
+Usage:
+    python benchmarks/bench_markdown_engines.py [--sizes 65536 262144] [--repeats 3] [--output results.json]
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from confluence_poster.convert_utils import convert_markdown_with_engine
+from confluence_poster.poster_config import MarkdownEngine
+
+ROOT = Path(__file__).resolve().parent.parent
+SECTION = """## Section {number}
+
+Paragraph with *emphasis*, **strong text**, `inline code` and a [link](https://example.com/{number}).
+
+* First item
+* Second item
+    * Nested item
+
+1. One
+2. Two
+
+```python
+def function_{number}():
+    return {number}
+```
+
+| Name | Value |
+|------|-------|
+| a | {number} |
+| b | text |
+
+> Quote with a line
+> continued here
+
+"""
+
+
+def project_documents() -> dict:
+    paths = [
+        ROOT / "README.md",
+        ROOT / "HACKING.md",
+        *sorted((ROOT / "docs").rglob("*.md")),
+    ]
+    return {str(_.relative_to(ROOT)): _.read_text() for _ in paths if _.is_file()}
+
+
+def synthetic_document(size: int) -> str:
+    sections = []
+    while sum(len(_) for _ in sections) < size:
+        sections.append(SECTION.format(number=len(sections)))
+    return "# Synthetic document\n\n" + "".join(sections)
+
+
+def normalize(html: str) -> str:
+    html = re.sub(r"\s*/>", ">", html)
+    return re.sub(r">\s+<", "><", html).strip()
+
+
+def measure(text: str, engine: MarkdownEngine, repeats: int):
+    """Returns the best time out of the repeats and the output"""
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        html = convert_markdown_with_engine(text, engine=engine)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64 * 1024, 256 * 1024])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Write JSON here instead of stdout"
+    )
+    args = parser.parse_args()
+
+    documents = project_documents()
+    for size in args.sizes:
+        documents[f"synthetic_{size}"] = synthetic_document(size)
+
+    results = {}
+    for name, text in documents.items():
+        reference = None
+        document_results = {"bytes": len(text.encode())}
+        for engine in MarkdownEngine:
+            try:
+                seconds, html = measure(text, engine, args.repeats)
+            except ValueError as e:
+                document_results[engine.value] = {"error": str(e)}
+                continue
+            if reference is None:
+                reference = normalize(html)
+            document_results[engine.value] = {
+                "seconds": round(seconds, 4),
+                "mb_per_second": round(document_results["bytes"] / seconds / 1e6, 2),
+                "same_as_python_markdown": normalize(html) == reference,
+            }
+        results[name] = document_results
+
+    output = json.dumps(
+        {
+            "benchmark": "markdown_engines",
+            "python_version": sys.version.split()[0],
+            "repeats": args.repeats,
+            "documents": results,
+        },
+        indent=2,
+        sort_keys=True,
+    )
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
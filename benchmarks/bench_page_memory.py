@@ -0,0 +1,112 @@
+"""Measures per-page memory overhead of the config and report structures.
+
+Compares the slotted page records against equivalent classes that keep a per-instance __dict__ and
+compares the compact report entries against keeping whole pages (including their text) in the report.
+
+Usage:
+    python benchmarks/bench_page_memory.py [--pages 50000] [--text-size 2048]
+"""
+
+import argparse
+import json
+import tracemalloc
+from dataclasses import dataclass, fields, MISSING
+from typing import Callable
+
+from confluence_poster.poster_config import Config, Page
+from confluence_poster.main_helpers import PostedPage
+from confluence_poster.main_helpers import ReportEntry
+
+
+def unslotted(cls):
+    """Recreates the dataclass the way it was declared before, with per-instance __dict__"""
+    namespace = {"__annotations__": {}}
+    for _ in fields(cls):
+        namespace["__annotations__"][_.name] = _.type
+        if _.default is not MISSING:
+            namespace[_.name] = _.default
+    return dataclass(type(f"Dict{cls.__name__}", (), namespace))
+
+
+def copy_fields(page) -> tuple:
+    return tuple(getattr(page, _.name) for _ in fields(page))
+
+
+def generate_config_data(pages: int) -> dict:
+    return {
+        "auth": {
+            "confluence_url": "https://confluence.local",
+            "username": "user",
+            "is_cloud": False,
+        },
+        "pages": {
+            "default": {"page_space": "LOC"},
+            **{
+                f"page{number}": {
+                    "page_title": f"Page {number}",
+                    "page_file": f"docs/page{number}.md",
+                    # Every page redefining the space produces a separate string object per page
+                    "page_space": "".join(["SP", "ACE"]),
+                }
+                for number in range(pages)
+            },
+        },
+    }
+
+
+def measure(factory: Callable[[], object], pages: int) -> float:
+    """Returns the amount of bytes per page retained by the result of factory()"""
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    result = factory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (current - baseline) / pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50_000)
+    parser.add_argument("--text-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    data = generate_config_data(args.pages)
+    pages = Config(data=data).pages
+    text = "x" * args.text_size
+    DictPage, DictPostedPage = unslotted(Page), unslotted(PostedPage)
+
+    def report_with_pages():
+        result = []
+        for page in pages:
+            posted_page = DictPostedPage(*copy_fields(page))
+            posted_page.page_text = text[:-1] + "x"  # every page holds its own text
+            result.append(posted_page)
+        return result
+
+    results = {
+        "pages": args.pages,
+        "page_before": measure(
+            lambda: [DictPage(*copy_fields(_)) for _ in pages], args.pages
+        ),
+        "page_after": measure(
+            lambda: [Page(*copy_fields(_)) for _ in pages], args.pages
+        ),
+        "posted_page_before": measure(
+            lambda: [DictPostedPage(*copy_fields(_)) for _ in pages], args.pages
+        ),
+        "posted_page_after": measure(
+            lambda: [PostedPage(*copy_fields(_)) for _ in pages], args.pages
+        ),
+        "report_before": measure(report_with_pages, args.pages),
+        "report_after": measure(
+            lambda: [ReportEntry.from_page(_, "updated", "https://x") for _ in pages],
+            args.pages,
+        ),
+        "config_load": measure(lambda: Config(data=data), args.pages),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
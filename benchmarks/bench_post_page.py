@@ -0,0 +1,192 @@
+"""End-to-end throughput of post-page against the fake Confluence from tests/fake_confluence.py.
+
+Runs the real app through typer's CliRunner for every combination of the page count, new or existing pages,
+markdown or confluencewiki page files, with or without attachments. Every run happens in a fresh process so that
+the peak RSS is measured per run. The server is kept in this process and counts the requests.
+
+Output is JSON with sorted keys and a fixed set of fields, to be compared between versions.
+
+Usage:
+    python benchmarks/bench_post_page.py [--pages 1 100 1000 10000] [--latency 0] [--output results.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+from itertools import product
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import toml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tests"))
+from fake_confluence import FakeConfluenceServer  # noqa: E402
+
+SPACE = "BENCH"
+ATTACHMENTS = 3
+ATTACHMENT_SIZE = 64 * 1024
+FILE_EXTENSIONS = {"markdown": "md", "confluencewiki": "confluencewiki"}
+PAGE_TEXT = {
+    "markdown": "# Page {number}\n\nSome text for revision {revision}.\n\n* one\n* two\n",
+    "confluencewiki": "h1. Page {number}\n\nSome text for revision {revision}.\n\n* one\n* two\n",
+}
+
+
+def write_pages(
+    directory: Path, url: str, pages: int, file_format: str, revision: int
+) -> Path:
+    """Writes the page files and the config for them. Returns path to the config"""
+    page_definitions = {"default": {"page_space": SPACE}}
+    for number in range(pages):
+        page_file = directory / f"page{number}.{FILE_EXTENSIONS[file_format]}"
+        page_file.write_text(
+            PAGE_TEXT[file_format].format(number=number, revision=revision)
+        )
+        page_definitions[f"page{number}"] = {
+            "page_title": f"Page {number}",
+            "page_file": str(page_file),
+        }
+    config_file = directory / "config.toml"
+    config_file.write_text(
+        toml.dumps(
+            {
+                "pages": page_definitions,
+                "auth": {
+                    "confluence_url": url,
+                    "username": "bench",
+                    "password": "bench",
+                    "is_cloud": False,
+                },
+            }
+        )
+    )
+    return config_file
+
+
+def run_app(args: list, cli_input: str) -> dict:
+    """Runs the app in the current process. Executed in a fresh process for every run"""
+    from typer.testing import CliRunner
+    from confluence_poster.main import app
+
+    runner = CliRunner()
+    start = perf_counter()
+    result = runner.invoke(app, args, input=cli_input)
+    wall_time = perf_counter() - start
+    return {
+        "exit_code": result.exit_code,
+        "wall_time_s": wall_time,
+        # Kilobytes on Linux
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_in_fresh_process(pool_context, args: list, cli_input: str) -> dict:
+    with pool_context.Pool(1) as pool:
+        return pool.apply(run_app, (args, cli_input))
+
+
+def run_scenario(
+    pool_context,
+    pages: int,
+    existing: bool,
+    file_format: str,
+    attachments: bool,
+    latency: float,
+) -> dict:
+    with TemporaryDirectory() as tmp, FakeConfluenceServer(
+        spaces=(SPACE,), latency=latency
+    ) as server:
+        directory = Path(tmp)
+        args = ["--quiet", "--force-create", "post-page", "--create-in-space-root"]
+        if existing:
+            config_file = write_pages(directory, server.url, pages, file_format, 0)
+            setup = run_in_fresh_process(
+                pool_context, ["--config", str(config_file)] + args, ""
+            )
+            assert setup["exit_code"] == 0, "Could not create the pages"
+
+        config_file = write_pages(directory, server.url, pages, file_format, 1)
+        cli_input = ""
+        if attachments:
+            files = []
+            for number in range(ATTACHMENTS):
+                attachment = directory / f"attachment{number}.bin"
+                attachment.write_bytes(bytes(ATTACHMENT_SIZE))
+                files.append(str(attachment))
+            args = args + ["--upload-files"] + files
+            # Confirms attaching the files to the first page if there are more
+            cli_input = "Y\n"
+
+        requests_before = server.fake.request_count
+        result = run_in_fresh_process(
+            pool_context, ["--config", str(config_file)] + args, cli_input
+        )
+        requests = server.fake.request_count - requests_before
+
+    return {
+        "scenario": f"pages={pages},existing={existing},format={file_format},attachments={attachments}",
+        "pages": pages,
+        "existing": existing,
+        "format": file_format,
+        "attachments": attachments,
+        "exit_code": result["exit_code"],
+        "wall_time_s": round(result["wall_time_s"], 4),
+        "pages_per_s": round(pages / result["wall_time_s"], 2),
+        "requests": requests,
+        "requests_per_page": round(requests / pages, 2),
+        "peak_rss_kib": result["peak_rss_kib"],
+    }
+
+
+def main():
+    from confluence_poster.main import __version__
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1_000, 10_000])
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Latency of the fake server, seconds"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Write JSON here instead of stdout"
+    )
+    args = parser.parse_args()
+
+    # Fresh interpreter for every run: forked processes would inherit the memory of this one
+    pool_context = multiprocessing.get_context("spawn")
+    results = []
+    for pages, existing, file_format, attachments in product(
+        args.pages, (False, True), ("markdown", "confluencewiki"), (False, True)
+    ):
+        result = run_scenario(
+            pool_context, pages, existing, file_format, attachments, args.latency
+        )
+        print(
+            f"{result['scenario']}: {result['wall_time_s']}s, "
+            f"{result['requests_per_page']} requests per page",
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    output = json.dumps(
+        {
+            "benchmark": "post_page",
+            "confluence_poster_version": __version__,
+            "python_version": platform.python_version(),
+            "latency_s": args.latency,
+            "results": results,
+        },
+        indent=2,
+        sort_keys=True,
+    )
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
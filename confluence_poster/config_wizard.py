@@ -2,14 +2,14 @@ import typer
 from click import Choice
 from pathlib import Path
 from functools import reduce
-from typing import Union, Any, Tuple, FrozenSet, Iterable, Callable
+from typing import Union, Any, Tuple, FrozenSet, Iterable, Callable, List
 from tomlkit import document, parse, table, dumps
 from tomlkit.parser import TOMLDocument
 from tomlkit.items import Table
 from dataclasses import dataclass
-from copy import deepcopy
 
 from confluence_poster.poster_config import AllowedFileFormat
+from confluence_poster.page_discovery_helpers import derive_page_title
 
 
 @dataclass
@@ -133,11 +133,10 @@ def _create_or_update_attribute(
     1. Traverse the document, creating tables for path1 and path2 if they do not exist. 'path2' would be nested in path1
     2. Set the attribute attribute to the value
 
-    Returns a copy of config with updated value
+    The document is edited in place, the same config is returned for convenience
     """
     *attribute_path, attribute_name = attribute.split(".")
-    _config = deepcopy(config)
-    caret = _config
+    caret = config
     for path_node in attribute_path:  # more clear than a reduce() call
         next_node = caret.get(path_node)
         if next_node is None:
@@ -145,22 +144,37 @@ def _create_or_update_attribute(
         caret = caret.get(path_node)
 
     caret[attribute_name] = value
-    return parse(dumps(_config))
+    return config
 
 
 def print_config_with_hidden_attrs(
     config: TOMLDocument, hidden_attributes: Iterable[Union[str, DialogParameter]]
 ) -> str:
-    """Given a path on the filesystem and a list of hidden attributes, returns content of that file,
-    redacting the sensitive fields"""
-    _config = deepcopy(config)
-    for attribute in hidden_attributes:
-        if _get_attribute_by_path(str(attribute), _config) is not None:
-            _config = _create_or_update_attribute(
-                str(attribute), _config, value="[REDACTED]"
+    """Given a config and a list of hidden attributes, returns content of the config,
+    redacting the sensitive fields.
+
+    Sensitive values are swapped in place only while rendering, no copy is made"""
+    swapped = []
+    try:
+        for attribute in hidden_attributes:
+            *attribute_path, attribute_name = str(attribute).split(".")
+            container = (
+                _get_attribute_by_path(".".join(attribute_path), config)
+                if attribute_path
+                else config
             )
+            if (
+                container is None
+                or (value := container.get(attribute_name, None)) is None
+            ):
+                continue
+            swapped.append((container, attribute_name, value))
+            container[attribute_name] = "[REDACTED]"
 
-    return dumps(_config)
+        return dumps(config)
+    finally:
+        for container, attribute_name, value in reversed(swapped):
+            container[attribute_name] = value
 
 
 def config_dialog(
@@ -205,7 +219,7 @@ def config_dialog(
         new_value = _dialog_prompt(parameter=attr, default_value=current_value)
 
         if new_value is not None:
-            new_config = _create_or_update_attribute(
+            _create_or_update_attribute(
                 attribute=attr, config=new_config, value=new_value
             )
 
@@ -298,3 +312,67 @@ def page_add_dialog(
         config_print_function=config_print_function,
         incremental=True,
     )
+
+
+def add_pages_to_config(
+    filename: Union[Path, str],
+    page_files: Iterable[Path],
+    page_space: Union[str, None] = None,
+) -> List[Tuple[str, str]]:
+    """Non-interactive counterpart of page_add_dialog. Appends a [pages.pageN] section for every new page file.
+
+    The config is read and written once. Files that are already in the config and titles that already exist in
+    the same space are skipped.
+
+    :return list of (title, file) of the added pages
+    """
+    if type(filename) is str:
+        filename = Path(filename)
+    config = parse(filename.read_text()) if filename.exists() else document()
+    pages = config.get("pages", {})
+    default_space = _get_attribute_by_path("default.page_space", pages)
+
+    # Index of the existing pages
+    page_names = set(pages)
+    known_files = set()
+    known_titles = set()
+    for name, page in pages.items():
+        if name == "default" or not isinstance(page, dict):
+            continue
+        if (page_file := page.get("page_file")) is not None:
+            known_files.add(Path(page_file).resolve())
+        known_titles.add(
+            (page.get("page_space", default_space), page.get("page_title"))
+        )
+
+    new_space = page_space or default_space
+    page_number = 1
+    added_pages = []
+    for page_file in page_files:
+        if (resolved_file := Path(page_file).resolve()) in known_files:
+            continue
+        title = derive_page_title(page_file)
+        if (new_space, title) in known_titles:
+            continue
+        known_files.add(resolved_file)
+        known_titles.add((new_space, title))
+
+        while f"page{page_number}" in page_names:
+            page_number += 1
+        page_names.add(page_name := f"page{page_number}")
+
+        _create_or_update_attribute(f"pages.{page_name}.page_title", config, title)
+        _create_or_update_attribute(
+            f"pages.{page_name}.page_file", config, str(page_file)
+        )
+        _create_or_update_attribute(f"pages.{page_name}.front_matter", config, True)
+        if page_space is not None:
+            _create_or_update_attribute(
+                f"pages.{page_name}.page_space", config, page_space
+            )
+        added_pages.append((title, str(page_file)))
+
+    if added_pages:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        filename.write_text(dumps(config))
+    return added_pages
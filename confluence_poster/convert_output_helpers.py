@@ -0,0 +1,86 @@
+import json
+import os
+from concurrent.futures import Executor, as_completed
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Callable, List, NamedTuple, Tuple, Union
+
+from confluence_poster.progress_helpers import Progress
+
+"""Conversion of many pages into a directory, one output file per page"""
+
+# Keeps the hashes of the texts the outputs were converted from, to skip the unchanged ones
+MANIFEST_NAME = ".confluence_poster_outputs.json"
+
+
+class ConversionJob(NamedTuple):
+    page_file: str
+    text: str
+    # Has to be picklable to run in a process pool
+    convert: Callable[[str], str]
+    # Identifies the conversion, the output is converted again if it changes
+    converter: str
+    # Identifies the text without hashing it, like the id of the git blob it was read from
+    content_id: Union[str, None] = None
+
+
+def output_name(page_file: str) -> str:
+    return f"{Path(page_file).stem}.html"
+
+
+def _write_manifest(path: Path, manifest: dict):
+    with NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f"{path.name}.", delete=False
+    ) as tmp_file:
+        json.dump(manifest, tmp_file, indent=2, sort_keys=True)
+    os.replace(tmp_file.name, path)
+
+
+def convert_to_directory(
+    jobs: List[ConversionJob],
+    output_dir: Path,
+    executor: Executor,
+    progress: Union[Progress, None] = None,
+) -> Tuple[List[Path], List[Path]]:
+    """Converts the pages in the executor and writes every output as soon as it is ready.
+    Pages converted from the same text by the same converter before are skipped.
+
+    :return written and skipped output files
+    """
+    names = [output_name(_.page_file) for _ in jobs]
+    if len(set(names)) != len(names):
+        duplicates = sorted({_ for _ in names if names.count(_) > 1})
+        raise ValueError(
+            f"Several pages would be written to the same files: {', '.join(duplicates)}"
+        )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = output_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_file.read_text()) if manifest_file.is_file() else {}
+    if progress is not None:
+        progress.start(len(jobs))
+
+    written, skipped, futures = [], [], {}
+    for name, job in zip(names, jobs):
+        content = job.text if job.content_id is None else job.content_id
+        digest = sha256(f"{job.converter}\0{content}".encode()).hexdigest()
+        if manifest.get(name) == digest and (output_dir / name).is_file():
+            skipped.append(output_dir / name)
+            if progress is not None:
+                progress.advance()
+        else:
+            futures[executor.submit(job.convert, job.text)] = (name, digest)
+
+    try:
+        for future in as_completed(futures):
+            name, digest = futures[future]
+            (output_dir / name).write_text(future.result(), encoding="utf-8")
+            manifest[name] = digest
+            written.append(output_dir / name)
+            if progress is not None:
+                progress.advance()
+    finally:
+        # Outputs written before a failure are not converted again
+        _write_manifest(manifest_file, manifest)
+    return written, skipped
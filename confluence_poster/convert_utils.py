@@ -1,32 +1,287 @@
+import os
+import re
+import xml.etree.ElementTree as etree
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from functools import partial
+from html import unescape
 from pathlib import Path
+from typing import Callable, Dict, List, Union
+from urllib.parse import urlparse
 from atlassian import Confluence
 from requests import Response
-from markdown import markdown
+from markdown import markdown, Markdown
+from markdown.extensions import Extension
+from markdown.extensions.attr_list import get_attrs
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+from markdown.extensions.tables import TableExtension
+from markdown.treeprocessors import Treeprocessor
 
-from confluence_poster.poster_config import AllowedFileFormat
+from confluence_poster.poster_config import AllowedFileFormat, MarkdownEngine
+from confluence_poster.markdown_cache_helpers import MarkdownCache
 
 
 def post_to_convert_api(confluence: Confluence, text: str) -> str:
     url = "rest/tinymce/1/markdownxhtmlconverter"
     # the endpoint returns plain text, need to redefine the default header
     headers = {"Content-Type": "application/json"}
-    # Keep until https://github.com/atlassian-api/atlassian-python-api/pull/684 is released
-    original_advanced_mode = confluence.advanced_mode
-    if confluence.advanced_mode is False or confluence.advanced_mode is None:
-        confluence.advanced_mode = True
-
-    response: Response = confluence.post(url, data={"wiki": text}, headers=headers)
+    # advanced_mode is passed per request instead of being set on the instance, so that this can run in threads
+    response: Response = confluence.post(
+        url, data={"wiki": text}, headers=headers, advanced_mode=True
+    )
     # No way to trigger failure for this during tests
     response.raise_for_status()  # pragma: no cover
 
-    confluence.advanced_mode = original_advanced_mode
-
     return response.text
 
 
-def convert_using_markdown_lib(text: str) -> str:
-    return markdown(text, extensions=("tables", "fenced_code"))
+def post_many_to_convert_api(
+    confluence: Confluence,
+    texts: List[str],
+    workers: int = 4,
+    cache: Union[MarkdownCache, None] = None,
+) -> List[str]:
+    """Converts the texts with the Confluence converter, sending up to 'workers' requests at once.
+    Same texts are converted once, texts found in the cache are not sent at all."""
+    converter = f"confluence {confluence.url}"
+    converted = {}
+    for text in dict.fromkeys(texts):
+        if cache is not None and (html := cache.get(text, converter)) is not None:
+            converted[text] = html
+    missing = [_ for _ in dict.fromkeys(texts) if _ not in converted]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for text, html in zip(
+            missing, executor.map(partial(post_to_convert_api, confluence), missing)
+        ):
+            converted[text] = html
+            if cache is not None:
+                cache.put(text, html, converter)
+    return [converted[_] for _ in texts]
+
+
+MARKDOWN_EXTENSIONS = ("tables", "fenced_code")
+# Sections are grouped into chunks of at least this many characters, so that small documents are not split
+MIN_CHUNK_SIZE = 256 * 1024
+
+# Same as the fences of the fenced_code extension: the closing fence has to repeat the opening one
+_FENCE_RE = re.compile(r"^(?P<fence>~{3,}|`{3,})")
+# Definitions of reference links apply to the whole document, not only to the chunk they are in
+_REFERENCE_RE = re.compile(r"^[ ]{0,3}\[(?P<id>[^\]]+)\]:[ ]*\S+")
+_LINK_ID_RE = re.compile(r"\[([^\]]+)\]")
+
+
+def split_markdown(text: str, min_chunk_size: int = MIN_CHUNK_SIZE) -> List[str]:
+    """Splits the markdown text into chunks that can be converted separately.
+
+    The text is split only before ATX headings ('# Title') that follow a blank line and are outside
+    fenced code, so the chunks never cut a paragraph, list, table or code block.
+    Definitions of reference links used in a chunk are appended to it. Raw HTML blocks may span
+    headings, so documents with them are returned as one chunk."""
+    sections: List[List[str]] = [[]]
+    section_size = 0
+    # Maps the lowercase id of the reference to its definition. Like in the markdown library, the last one wins
+    references = {}
+    fence = None
+    previous_blank = True
+    for line in text.splitlines():
+        if fence is not None:
+            if line.rstrip(" ") == fence:
+                fence = None
+        elif match := _FENCE_RE.match(line):
+            fence = match.group("fence")
+        elif line.startswith("<"):
+            return [text]
+        elif match := _REFERENCE_RE.match(line):
+            references[match.group("id").lower()] = line
+        elif line.startswith("#") and previous_blank and section_size >= min_chunk_size:
+            sections.append([])
+            section_size = 0
+        sections[-1].append(line)
+        section_size += len(line) + 1
+        previous_blank = not line.strip()
+
+    if len(sections) == 1:
+        return [text]
+    chunks = []
+    for section in sections:
+        chunk = "\n".join(section)
+        # Unused definitions do not change the output, and keep the chunk the same when they change
+        link_ids = dict.fromkeys(_LINK_ID_RE.findall(chunk.lower()))
+        used = [references[_] for _ in link_ids if _ in references]
+        chunks.append(chunk + "\n\n" + "\n".join(used) if used else chunk)
+    return chunks
+
+
+def _convert_chunks(chunks: List[str], workers: int) -> List[str]:
+    if workers == 1 or len(chunks) == 1:
+        return [convert_using_markdown_lib(_) for _ in chunks]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return list(executor.map(convert_using_markdown_lib, chunks))
+
+
+def convert_using_markdown_lib(
+    text: str,
+    workers: int = 1,
+    min_chunk_size: int = MIN_CHUNK_SIZE,
+    cache: Union[MarkdownCache, None] = None,
+) -> str:
+    """Converts markdown to html. With more than one worker large documents are split
+    into chunks (see split_markdown) that are converted in separate processes.
+    0 workers means a process per CPU.
+
+    With a cache the document is split at every heading, and only the sections that are not
+    in the cache are converted."""
+    if cache is not None:
+        sections = split_markdown(text, min_chunk_size=1)
+        html = {_: cache.get(_) for _ in sections}
+        missing = [_ for _ in dict.fromkeys(sections) if html[_] is None]
+        for section, section_html in zip(missing, _convert_chunks(missing, workers)):
+            cache.put(section, section_html)
+            html[section] = section_html
+        return "\n".join(html[_] for _ in sections)
+
+    if workers != 1 and len(chunks := split_markdown(text, min_chunk_size)) > 1:
+        return "\n".join(_convert_chunks(chunks, workers))
+    return markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+
+def convert_using_markdown_it(text: str) -> str:
+    """CommonMark with tables, requires markdown-it-py"""
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt("commonmark").enable("table").render(text)
+
+
+def convert_using_mistune(text: str) -> str:
+    """Requires mistune 2 or newer"""
+    import mistune
+
+    return mistune.create_markdown(plugins=["table"])(text)
+
+
+# Functions that convert markdown to html. The engine is chosen by markdown_engine in the config
+MARKDOWN_ENGINES: Dict[MarkdownEngine, Callable[[str], str]] = {
+    MarkdownEngine.python_markdown: convert_using_markdown_lib,
+    MarkdownEngine.markdown_it: convert_using_markdown_it,
+    MarkdownEngine.mistune: convert_using_mistune,
+}
+
+
+def convert_markdown_with_engine(
+    text: str,
+    engine: MarkdownEngine = MarkdownEngine.python_markdown,
+    workers: int = 1,
+    cache: Union[MarkdownCache, None] = None,
+) -> str:
+    """Converts markdown to html with the engine. Parallel and cached conversions are done only by python-markdown,
+    they rely on how it treats the chunks of the document"""
+    if engine is MarkdownEngine.python_markdown:
+        return convert_using_markdown_lib(text, workers=workers, cache=cache)
+    try:
+        return MARKDOWN_ENGINES[engine](text)
+    except ImportError as e:
+        raise ValueError(
+            f"Markdown engine {engine.value} is not installed: {e}. "
+            f"Install confluence_poster[{engine.value}]."
+        ) from e
+
+
+def _code_macro(code: str, language: Union[str, None] = None) -> str:
+    """Code block as the 'code' macro of storage format"""
+    language_parameter = (
+        f'<ac:parameter ac:name="language">{language}</ac:parameter>'
+        if language
+        else ""
+    )
+    # CDATA section cannot contain its terminator, it is split into two sections
+    code = code.replace("]]>", "]]]]><![CDATA[>")
+    return (
+        f'<ac:structured-macro ac:name="code">{language_parameter}'
+        f"<ac:plain-text-body><![CDATA[{code}]]></ac:plain-text-body></ac:structured-macro>"
+    )
+
+
+class _StorageFencedBlockPreprocessor(FencedBlockPreprocessor):
+    """Stores fenced code blocks as code macros instead of <pre> elements"""
+
+    def run(self, lines):
+        text = "\n".join(lines)
+        while match := self.FENCED_BLOCK_RE.search(text):
+            language = match.group("lang")
+            if match.group("attrs"):
+                _, classes, _ = self.handle_attrs(get_attrs(match.group("attrs")))
+                language = classes[0] if classes else None
+            placeholder = self.md.htmlStash.store(
+                _code_macro(match.group("code").rstrip("\n"), language)
+            )
+            text = f"{text[:match.start()]}\n{placeholder}\n{text[match.end():]}"
+        return text.split("\n")
+
+
+class _StorageTreeprocessor(Treeprocessor):
+    """Turns the elements that have a storage format counterpart into it"""
+
+    def run(self, root: etree.Element):
+        for parent in list(root.iter()):
+            for index, element in enumerate(parent):
+                if element.tag == "pre" and len(element) and element[0].tag == "code":
+                    # Indented code block. Its text is already escaped by the block parser
+                    replacement = etree.Element("p")
+                    replacement.text = self.md.htmlStash.store(
+                        _code_macro(unescape(element[0].text or "").rstrip("\n"))
+                    )
+                elif element.tag == "img":
+                    replacement = self._image(element)
+                else:
+                    continue
+                replacement.tail = element.tail
+                parent[index] = replacement
+
+        for table in root.iter("table"):
+            # Storage format tables have header cells in the body
+            if (head := table.find("thead")) is not None:
+                table.remove(head)
+                if (body := table.find("tbody")) is None:
+                    body = etree.SubElement(table, "tbody")
+                body[0:0] = list(head)
+            for cell in table.iter():
+                if align := cell.attrib.pop("align", None):
+                    cell.set("style", f"text-align: {align};")
+
+    @staticmethod
+    def _image(element: etree.Element) -> etree.Element:
+        """Images with a relative path are expected to be attached to the page"""
+        image = etree.Element("ac:image")
+        if alt := element.get("alt"):
+            image.set("ac:alt", alt)
+        if title := element.get("title"):
+            image.set("ac:title", title)
+        source = element.get("src", "")
+        if urlparse(source).scheme or source.startswith("//"):
+            etree.SubElement(image, "ri:url", {"ri:value": source})
+        else:
+            etree.SubElement(
+                image, "ri:attachment", {"ri:filename": Path(unescape(source)).name}
+            )
+        return image
+
+
+class _StorageExtension(Extension):
+    def extendMarkdown(self, md: Markdown):
+        md.registerExtension(self)
+        # Lets the stashed macros replace the paragraphs holding them instead of being wrapped in them
+        md.block_level_elements.append("ac:structured-macro")
+        md.preprocessors.register(
+            _StorageFencedBlockPreprocessor(md, {}), "fenced_code_block", 25
+        )
+        # After the inline patterns, which create the images
+        md.treeprocessors.register(_StorageTreeprocessor(md), "storage", 5)
+
+
+def convert_markdown_to_storage(text: str) -> str:
+    """Converts markdown to Confluence storage format, which is posted without conversion on the server.
+    Code blocks become the 'code' macro, images become ac:image"""
+    return Markdown(extensions=[TableExtension(), _StorageExtension()]).convert(text)
 
 
 def guess_file_format(page_file: str) -> AllowedFileFormat:
@@ -59,10 +314,16 @@ def guess_file_format(page_file: str) -> AllowedFileFormat:
 class Representation(Enum):
     wiki = "wiki"
     editor = "editor"
+    storage = "storage"
 
 
-def get_representation_for_format(file_format: AllowedFileFormat) -> Representation:
+def get_representation_for_format(
+    file_format: AllowedFileFormat, storage_format: bool = False
+) -> Representation:
+    """storage_format: markdown is converted by convert_markdown_to_storage"""
     if file_format == AllowedFileFormat.markdown:
+        if storage_format:
+            return Representation.storage
         return Representation.editor
     elif file_format == AllowedFileFormat.html:
         return Representation.editor
@@ -14,8 +14,11 @@ def attach_files_to_page(
     for path in files:
         if path.is_file():
             echo(f"\tUploading file {path.name}...")
-            state.confluence_instance.attach_file(
-                str(path), name=path.name, page_id=str(page.page_id)
-            )
+            with state.timings.span(
+                "attach_file", f"{page.page_space}::{page.page_title}"
+            ):
+                state.confluence_instance.attach_file(
+                    str(path), name=path.name, page_id=str(page.page_id)
+                )
             echo(f"\tUploaded file {path.name}.")
     always_echo("Done uploading files")
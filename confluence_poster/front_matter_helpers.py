@@ -0,0 +1,78 @@
+from pathlib import Path
+from typing import Union, Tuple, Iterable
+import re
+
+"""Procedures to read page metadata from the header ('front matter') of the page file.
+
+The front matter is a block of 'key: value' lines between two '---' lines at the very beginning of the file:
+
+---
+title: Page title
+---
+"""
+
+FRONT_MATTER_DELIMITER = "---"
+# The header is expected to be short, this protects from reading the whole body of a file that starts with '---'
+MAX_FRONT_MATTER_LINES = 64
+_key_value_line = re.compile(r"^(?P<key>[A-Za-z_][\w-]*)\s*:\s*(?P<value>.*?)\s*$")
+
+
+def _parse_value(value: str) -> Union[str, list]:
+    """Handles quoted strings and inline lists like [a, 'b']"""
+    if value.startswith("[") and value.endswith("]"):
+        return [_parse_value(_.strip()) for _ in value[1:-1].split(",") if _.strip()]
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def _parse_header_lines(lines: Iterable[str]) -> Union[dict, None]:
+    """Parses lines following the opening delimiter.
+
+    :return dictionary with metadata, None if the lines do not form a valid front matter
+    """
+    metadata = {}
+    for line_number, line in enumerate(lines):
+        line = line.rstrip("\r\n")
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return metadata
+        if line_number >= MAX_FRONT_MATTER_LINES:
+            return None
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if match := _key_value_line.match(line):
+            metadata[match["key"].lower()] = _parse_value(match["value"])
+        else:
+            return None
+    return None  # closing delimiter not found
+
+
+def split_front_matter(text: str) -> Tuple[dict, str]:
+    """Splits the text into the front matter and the rest of the text.
+
+    If the text does not start with a valid front matter - returns empty metadata and the original text
+    """
+    if not text.startswith(FRONT_MATTER_DELIMITER):
+        return {}, text
+    first_line, _, rest = text.partition("\n")
+    if first_line.rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, text
+    lines = rest.splitlines(keepends=True)
+    metadata = _parse_header_lines(lines)
+    if metadata is None:
+        return {}, text
+    # Header lines + the closing delimiter
+    header_length = next(
+        number
+        for number, line in enumerate(lines)
+        if line.rstrip() == FRONT_MATTER_DELIMITER
+    )
+    return metadata, "".join(lines[header_length + 1 :])
+
+
+def read_front_matter(page_file: Union[str, Path]) -> dict:
+    """Reads only the header of the file, without reading the page body"""
+    with open(page_file, encoding="utf-8", errors="replace") as f:
+        if f.readline().rstrip() != FRONT_MATTER_DELIMITER:
+            return {}
+        return _parse_header_lines(f) or {}
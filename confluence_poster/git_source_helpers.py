@@ -0,0 +1,93 @@
+import os
+import subprocess
+from pathlib import Path
+from threading import Lock
+from typing import Tuple, Union
+
+from confluence_poster.front_matter_helpers import split_front_matter
+
+"""Reading of the page files from a git revision, without checking it out"""
+
+
+class GitSource:
+    """Reads the page files as they are in the revision of the repository.
+
+    The blobs are streamed by a single long-lived `git cat-file --batch` process, one request per file, so only the
+    files of the posted pages are read. The id of the blob identifies the content without hashing it.
+    """
+
+    def __init__(self, rev: str, repo: Union[str, Path] = "."):
+        """:raises ValueError if the directory is not in a repository or the revision does not exist"""
+        self.rev = rev
+        self.top_level = Path(_git(repo, "rev-parse", "--show-toplevel"))
+        try:
+            # Branches may move while the pages are read, the commit may not
+            self.commit = _git(repo, "rev-parse", "--verify", f"{rev}^{{commit}}")
+        except ValueError:
+            raise ValueError(f"Revision '{rev}' not found")
+        self._process = None
+        self._lock = Lock()
+
+    def _object_name(self, page_file: Union[str, Path]) -> str:
+        try:
+            path = Path(os.path.realpath(page_file)).relative_to(self.top_level)
+        except ValueError:
+            raise FileNotFoundError(f"{page_file} is outside of the repository")
+        if "\n" in str(path):
+            raise FileNotFoundError(f"{page_file} cannot be read from git")
+        return f"{self.commit}:{path.as_posix()}"
+
+    def read_blob(self, page_file: Union[str, Path]) -> Tuple[str, bytes]:
+        """:return id and content of the blob
+
+        :raises FileNotFoundError if there is no such file in the revision
+        """
+        object_name = self._object_name(page_file)
+        with self._lock:
+            if self._process is None:
+                self._process = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.top_level,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+            self._process.stdin.write(object_name.encode() + b"\n")
+            self._process.stdin.flush()
+            header = self._process.stdout.readline().decode()
+            if not header or header.endswith((" missing\n", " ambiguous\n")):
+                raise FileNotFoundError(f"{page_file} not found in {self.rev}")
+            object_id, object_type, size = header.split()
+            # Content is followed by a newline
+            content = self._process.stdout.read(int(size) + 1)[:-1]
+        if object_type != "blob":
+            raise FileNotFoundError(f"{page_file} is not a file in {self.rev}")
+        return object_id, content
+
+    def read_page(
+        self, page_file: Union[str, Path], front_matter: bool = False
+    ) -> Tuple[str, str]:
+        """:param front_matter: whether the file starts with a front matter that is not a part of the page
+        :return id of the blob and the text of the page
+        """
+        object_id, content = self.read_blob(page_file)
+        text = content.decode("utf-8")
+        if front_matter:
+            _, text = split_front_matter(text)
+        return object_id, text
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
+
+
+def _git(repo: Union[str, Path], *args) -> str:
+    result = subprocess.run(
+        ["git", *args], cwd=repo, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise ValueError(
+            result.stderr.decode().strip() or f"git {' '.join(args)} failed"
+        )
+    return result.stdout.decode().strip()
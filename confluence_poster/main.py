@@ -1,31 +1,67 @@
 import typer
 import sys
+import fileinput
+import json
+from collections import Counter
 from click import Choice
-from typing import Optional, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional, List, Callable, Tuple, Union
 from pathlib import Path
 from logging import basicConfig, DEBUG
 from atlassian import Confluence
 from atlassian.errors import ApiError
-from dataclasses import dataclass, field, astuple
+from requests import Session
 from requests.exceptions import ConnectionError
 
-from confluence_poster.poster_config import Page, AllowedFileFormat
+from confluence_poster.poster_config import AllowedFileFormat, MarkdownEngine, Page
 from confluence_poster.config_loader import load_config
 from confluence_poster.config_wizard import DialogParameter, generate_page_dialog_params
 from confluence_poster.main_helpers import (
     check_last_updated_by,
     PostedPage,
     StateConfig,
-    get_page_url,
+    SkipReason,
+    get_page_url_from_response,
+    Report,
+    ReportEntry,
 )
 from confluence_poster.convert_utils import (
     guess_file_format,
     get_representation_for_format,
     post_to_convert_api,
-    convert_using_markdown_lib,
+    post_many_to_convert_api,
+    convert_markdown_with_engine,
+    convert_markdown_to_storage,
 )
 from confluence_poster.page_creation_helpers import create_page
 from confluence_poster.file_upload_helpers import attach_files_to_page
+from confluence_poster.timing_helpers import Timings
+from confluence_poster.request_stats_helpers import RequestStats
+from confluence_poster.report_helpers import (
+    ReportFormat,
+    NdjsonReportWriter,
+    merge_ndjson_reports,
+)
+from confluence_poster.progress_helpers import Progress
+from confluence_poster.git_source_helpers import GitSource
+from confluence_poster.pipeline_helpers import prepare_ahead
+from confluence_poster.shard_helpers import Shard, parse_shard, select_shard
+from confluence_poster.stdin_stream_helpers import StdinFormat, post_page_stream
+from confluence_poster.metrics_helpers import format_metrics, write_metrics_textfile
+from confluence_poster.markdown_cache_helpers import (
+    MarkdownCache,
+    PYTHON_MARKDOWN_CONVERTER,
+)
+from confluence_poster.convert_output_helpers import (
+    ConversionJob,
+    convert_to_directory,
+)
+from confluence_poster.profiling_helpers import (
+    ProfilerType,
+    RunProfiler,
+    DEFAULT_OUTPUT,
+)
 
 __version__ = "1.4.4"
 default_config_name = "config.toml"
@@ -37,73 +73,166 @@ def version_callback(value: bool):
         raise typer.Exit()
 
 
-@dataclass
-class Report:
-    created_pages: List[Page] = field(default_factory=list)
-    updated_pages: List[Page] = field(default_factory=list)
-    unprocessed_pages: List[Tuple[Page, str]] = field(default_factory=list)
-    confluence_instance: Confluence = None
-
-    def __str__(self) -> str:
-        output = ""
-        for header, page_list in [
-            ("Created pages:", self.created_pages),
-            ("Updated pages:", self.updated_pages),
-        ]:
-            output += header + "\n"
-            if page_list:
-                for page in page_list:
-                    title = page.page_title
-                    space = page.page_space
-                    output += f"{space}::{title} {get_page_url(title, space, self.confluence_instance)}\n"
-            else:
-                output += "None\n"
-        if self.unprocessed_pages:
-            output += "Unprocessed pages:"
-            for page, reason in self.unprocessed_pages:
-                output += f"{page.page_space}::{page.page_title} Reason: {reason}"
-
-        return output
+def shard_callback(value: Optional[str]) -> Optional[Shard]:
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
 
 
 app = typer.Typer()
 state = StateConfig()
 
 
+def _page_converter(
+    page: Page, use_confluence_converter: bool, storage_format: bool
+) -> Tuple[Callable[[str], str], str]:
+    """Returns the function that converts the page text and the name of the conversion"""
+    if use_confluence_converter:
+        confluence = state.confluence_instance
+        return partial(post_to_convert_api, confluence), f"confluence {confluence.url}"
+    if storage_format:
+        return convert_markdown_to_storage, f"storage {PYTHON_MARKDOWN_CONVERTER}"
+    engine = page.markdown_engine or state.config.markdown_engine
+    convert = partial(
+        convert_markdown_with_engine, engine=engine, cache=state.markdown_cache
+    )
+    if engine is MarkdownEngine.python_markdown:
+        return convert, PYTHON_MARKDOWN_CONVERTER
+    return convert, engine.value
+
+
 @app.command()
 def convert_markdown(
+    files: Optional[List[Path]] = typer.Argument(
+        None,
+        exists=True,
+        dir_okay=False,
+        show_default=False,
+        help="Markdown files to convert instead of the pages from the config.",
+    ),
     use_confluence_converter: Optional[bool] = typer.Option(
         False,
         "--use-confluence-converter",
         show_default=False,
         help="Use built-in Confluence converter. Note: uses Confluence private API.",
-    )
+    ),
+    storage_format: Optional[bool] = typer.Option(
+        False,
+        "--storage-format",
+        show_default=False,
+        help="Convert to Confluence storage format instead of html.",
+    ),
+    workers: int = typer.Option(
+        4,
+        "--workers",
+        min=1,
+        help="Number of pages converted concurrently by the Confluence converter, "
+        "or by python's markdown library with --output-dir.",
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None,
+        "--output-dir",
+        file_okay=False,
+        help="Write the text of every page to its own file in this directory instead of printing it. "
+        "Pages that did not change since the previous conversion are skipped.",
+    ),
 ):
-    """Converts single page text to html. Prints the converted text.
+    """Converts the text of the pages from the config, or of the given files, to html. Prints the converted text.
+    If there is more than one page, the text of every page is preceded by a comment with its title.
     Implies running the utility with --quiet. Logs runtime info only to stderr.
 
     When the page is posted, "editor" representation should be used.
 
     By default uses python's markdown library with fenced code and tables extensions to render markdown to html.
 
-    If --use-confluence-converter flag is used - uses Confluence built-in converter."""
+    If --use-confluence-converter flag is used - uses Confluence built-in converter. The pages are sent
+    concurrently, with --markdown-cache-dir the results are cached and unchanged pages are not sent again.
+
+    If --storage-format flag is used - converts to storage format, with code blocks as the 'code' macro.
+    The result should be posted with "storage" representation.
+
+    If --output-dir is specified - the pages are converted in parallel and every page is written to a file named
+    after the page file, with '.html' extension."""
     confluence = state.confluence_instance
     always_echo = state.always_print_function
     echo_err = state.print_stderr
-    text = state.config.pages[0].page_text
 
-    if len(state.config.pages) > 1:
-        echo_err("This command supports converting only one page at a time.")
-        raise typer.Exit(1)
+    if files:
+        pages = [
+            Page(page_title=str(_), page_file=str(_), page_space=None) for _ in files
+        ]
+    else:
+        pages = state.config.pages
+    content_ids = [None] * len(pages)
+    if state.git_source is not None and not files:
+        try:
+            content_ids, texts = zip(
+                *(
+                    state.git_source.read_page(_.page_file, _.front_matter)
+                    for _ in pages
+                )
+            )
+        except FileNotFoundError as e:
+            echo_err(str(e))
+            raise typer.Exit(1)
+    else:
+        texts = [_.page_text for _ in pages]
+
+    if output_dir is not None:
+        if use_confluence_converter:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        jobs = [
+            ConversionJob(
+                page.page_file,
+                text,
+                *_page_converter(page, use_confluence_converter, storage_format),
+                content_id,
+            )
+            for page, text, content_id in zip(pages, texts, content_ids)
+        ]
+        try:
+            with executor:
+                written, skipped = convert_to_directory(
+                    jobs, output_dir, executor, progress=state.progress
+                )
+        except ValueError as e:
+            echo_err(str(e))
+            raise typer.Exit(1)
+        echo_err(
+            f"Converted {len(written)} pages, skipped {len(skipped)} unchanged pages."
+        )
+        return
 
     if use_confluence_converter:
         echo_err(
             "Using the converter built into Confluence which is labeled as private API. "
             "The results may be less than satisfactory."
         )
-        always_echo(post_to_convert_api(confluence, text))
+        converted = post_many_to_convert_api(
+            confluence, texts, workers=workers, cache=state.markdown_cache
+        )
+    elif storage_format:
+        converted = [convert_markdown_to_storage(_) for _ in texts]
     else:
-        always_echo(convert_using_markdown_lib(text))
+        converted = [
+            convert_markdown_with_engine(
+                text,
+                engine=page.markdown_engine or state.config.markdown_engine,
+                workers=state.markdown_workers,
+                cache=state.markdown_cache,
+            )
+            for page, text in zip(pages, texts)
+        ]
+
+    for page, html in zip(pages, converted):
+        if len(pages) > 1:
+            always_echo(f"<!-- {page.page_title} -->")
+        always_echo(html)
 
     echo_err(
         "Submit the converted text using `confluence_poster post-page --file-format html`.",
@@ -135,6 +264,13 @@ def post_page(
         "If provided at runtime - can only be applied to a single page. "
         "If set to 'None'(default) - script will try to guess it during the run.",
     ),
+    read_ahead: int = typer.Option(
+        2,
+        "--read-ahead",
+        min=0,
+        help="Number of pages read and converted while the previous page is posted. "
+        "0 processes the pages one at a time.",
+    ),
     files: Optional[List[Path]] = typer.Argument(None, help="List of files to upload"),
 ):
     """Posts the content of the pages."""
@@ -143,11 +279,33 @@ def post_page(
     echo_err = state.print_stderr
     confirm = state.confirm_function
     prompt = state.prompt_function
-
-    report = Report(confluence_instance=state.confluence_instance)
+    span = state.timings.span
+
+    if state.stdin_format is StdinFormat.ndjson:
+        # The result records go to stdout. They are the ndjson report, unless it is written to a file
+        result_writer = state.report_writer
+        if result_writer is None or result_writer.stream is not sys.stdout:
+            result_writer = NdjsonReportWriter(sys.stdout, timings=state.timings)
+        report = post_page_stream(
+            sys.stdin, state, state.config.default_space, result_writer
+        )
+        if state.print_report:
+            echo_err(report)
+        return
+
+    report = Report(
+        confluence_instance=state.confluence_instance,
+        request_stats=state.request_stats,
+        writer=state.report_writer,
+        progress=state.progress,
+        page_counts=state.page_counts,
+        keep_entries=state.print_report,
+    )
     confluence = state.confluence_instance
-    posted_pages = [PostedPage(*astuple(_)) for _ in state.config.pages]
+    posted_pages = [PostedPage.from_page(_) for _ in state.config.pages]
     target_page = posted_pages[0]
+    if state.progress is not None:
+        state.progress.start(len(posted_pages))
 
     if len(posted_pages) > 1 and version_comment is not None:
         apply_version_comment_to = prompt(
@@ -193,90 +351,236 @@ def post_page(
                 echo_err("Aborting.")
                 raise typer.Exit(3)
 
-    for page in posted_pages:
-        if page.page_file_format is AllowedFileFormat.none:
-            echo(
-                f"File format for page {page.page_title} not specified. Trying to determine it..."
-            )
+    def _read_and_convert(page: PostedPage) -> Tuple[bool, Union[Exception, None]]:
+        """First stage of processing the page. Runs in a thread, ahead of posting the previous pages.
+
+        :return whether the file format was guessed, error to report instead of posting the page
+        """
+        page_key = f"{page.page_space}::{page.page_title}"
+        format_guessed = page.page_file_format is AllowedFileFormat.none
+        if format_guessed:
             try:
-                guessed_format = guess_file_format(page.page_file)
+                with span("guess_file_format", page_key):
+                    page.page_file_format = guess_file_format(page.page_file)
             except ValueError as e:
-                echo_err(
-                    "Could not guess the file format. Consider specifying it manually. "
-                    "See --help for information.",
-                )
-                raise e
-            echo(f"Guessed file format as {guessed_format.value}")
-            page.page_file_format = guessed_format
+                return format_guessed, e
 
+        with span("read_page_file", page_key):
+            if state.git_source is not None:
+                try:
+                    _, page.page_text = state.git_source.read_page(
+                        page.page_file, page.front_matter
+                    )
+                except FileNotFoundError as e:
+                    return format_guessed, e
+            page_text = page.page_text
         if page.page_file_format is AllowedFileFormat.markdown:
-            page.page_text = convert_using_markdown_lib(page.page_text)
+            with span("markdown_conversion", page_key):
+                if page.storage_format:
+                    page.page_text = convert_markdown_to_storage(page_text)
+                else:
+                    page.page_text = convert_markdown_with_engine(
+                        page_text,
+                        engine=page.markdown_engine or state.config.markdown_engine,
+                        workers=state.markdown_workers,
+                        cache=state.markdown_cache,
+                    )
+        return format_guessed, None
+
+    def _release_text(page: PostedPage):
+        """Drops the text of the page that was posted, so only the pages in flight hold their texts"""
+        page.page_text = None
 
-        echo(f"Looking for page '{page.page_title}'")
-        if page_id := confluence.get_page_id(
-            space=page.page_space, title=page.page_title
+    # The pages are posted one by one in the config order, while the next ones are read and converted
+    with ThreadPoolExecutor(max_workers=max(read_ahead, 1)) as executor:
+        for page, (format_guessed, error) in prepare_ahead(
+            posted_pages, _read_and_convert, executor, read_ahead, release=_release_text
         ):
-            # Page exists
-            echo(f"Found page id #{page_id}")
-            page.page_id = page_id
-
-            # If --force is supplied - we do not really care about who edited the page last
-            if not (state.force or page.force_overwrite):
-                updated_by_author, page_last_updated_by = check_last_updated_by(
-                    page_id=page_id,
-                    username_to_check=state.config.author,
-                    confluence_instance=confluence,
+            page_key = f"{page.page_space}::{page.page_title}"
+            if format_guessed:
+                echo(
+                    f"File format for page {page.page_title} not specified. Trying to determine it..."
                 )
-                if not updated_by_author:
-                    echo(
-                        f"Flag 'force' is not set and last author of page '{page.page_title}'"
-                        f" is {page_last_updated_by}, not {state.config.author}. Skipping page"
+                if isinstance(error, ValueError):
+                    echo_err(
+                        "Could not guess the file format. Consider specifying it manually. "
+                        "See --help for information.",
                     )
-                    continue
-            else:
-                if state.force:
-                    echo("Flag 'force' set globally.")
-                elif page.force_overwrite:
-                    echo("Flag 'force overwrite' set on the page.")
-                echo("Author name check skipped.")
-
-            echo(f"Updating page #{page_id}")
-            confluence.update_existing_page(
-                page_id=page_id,
-                title=page.page_title,
-                body=page.page_text,
-                representation=get_representation_for_format(
-                    page.page_file_format
-                ).value,
-                minor_edit=state.minor_edit,
-                version_comment=page.version_comment,
-            )
-            report.updated_pages += [page]
-        else:
-            echo(
-                f"Could not find page '{page.page_title}' in space '{page.page_space}'"
-            )
-            if page_created := create_page(
-                page=page, state=state, create_in_root=create_in_space_root
-            ):
-                report.created_pages += [page]
-                if version_comment:
-                    echo(
-                        "Page was created, but Confluence API does not support setting the version comment for"
-                        " page creation. The comment was not saved in the page history."
+                    raise error
+                echo(f"Guessed file format as {page.page_file_format.value}")
+            if isinstance(error, FileNotFoundError):
+                echo_err(str(error))
+                report.add(ReportEntry.from_page(page, "unprocessed"), str(error))
+                continue
+
+            echo(f"Looking for page '{page.page_title}'")
+            with span("get_page_id", page_key):
+                page_id = confluence.get_page_id(
+                    space=page.page_space, title=page.page_title
+                )
+            if page_id:
+                # Page exists
+                echo(f"Found page id #{page_id}")
+                page.page_id = page_id
+
+                # If --force is supplied - we do not really care about who edited the page last
+                if not (state.force or page.force_overwrite):
+                    with span("check_last_updated_by", page_key):
+                        updated_by_author, page_last_updated_by = check_last_updated_by(
+                            page_id=page_id,
+                            username_to_check=state.config.author,
+                            confluence_instance=confluence,
+                        )
+                    if not updated_by_author:
+                        echo(
+                            f"Flag 'force' is not set and last author of page '{page.page_title}'"
+                            f" is {page_last_updated_by}, not {state.config.author}. Skipping page"
+                        )
+                        report.add(
+                            ReportEntry.from_page(page, "unprocessed"),
+                            SkipReason(
+                                f"Last updated by {page_last_updated_by}, not {state.config.author}"
+                            ),
+                        )
+                        continue
+                else:
+                    if state.force:
+                        echo("Flag 'force' set globally.")
+                    elif page.force_overwrite:
+                        echo("Flag 'force overwrite' set on the page.")
+                    echo("Author name check skipped.")
+
+                echo(f"Updating page #{page_id}")
+                with span("update_existing_page", page_key):
+                    response = confluence.update_existing_page(
+                        page_id=page_id,
+                        title=page.page_title,
+                        body=page.page_text,
+                        representation=get_representation_for_format(
+                            page.page_file_format, page.storage_format
+                        ).value,
+                        minor_edit=state.minor_edit,
+                        version_comment=page.version_comment,
                     )
-                page.page_id = page_created.page_id
+                report.add(
+                    ReportEntry.from_page(
+                        page,
+                        "updated",
+                        get_page_url_from_response(response, confluence),
+                    ),
+                    body_bytes=len(page.page_text.encode()),
+                )
             else:
-                always_echo(f"Not creating page '{page.page_title}'")
-                report.unprocessed_pages += [(page, page_created.comment)]
+                echo(
+                    f"Could not find page '{page.page_title}' in space '{page.page_space}'"
+                )
+                if page_created := create_page(
+                    page=page, state=state, create_in_root=create_in_space_root
+                ):
+                    page.page_id = page_created.page_id
+                    report.add(
+                        ReportEntry.from_page(page, "created", page_created.page_url),
+                        body_bytes=len(page.page_text.encode()),
+                    )
+                    if version_comment:
+                        echo(
+                            "Page was created, but Confluence API does not support setting the version comment for"
+                            " page creation. The comment was not saved in the page history."
+                        )
+                else:
+                    always_echo(f"Not creating page '{page.page_title}'")
+                    report.add(
+                        ReportEntry.from_page(page, "unprocessed"), page_created.comment
+                    )
+
+            if page.labels and page.page_id is not None:
+                with span("set_page_labels", page_key):
+                    for label in page.labels:
+                        confluence.set_page_label(page.page_id, label)
+
+            if (
+                upload_files
+                and target_page.page_id == page.page_id
+                and target_page.page_id is not None
+            ):
+                attach_files_to_page(page=target_page, files=files, state=state)
+
+    always_echo("Finished processing pages")
+
+    if state.print_report:
+        always_echo(report)
+
+
+@app.command()
+def sync_tree(
+    directory: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=False,
+        help="Directory with the page files.",
+    ),
+    page_space: Optional[str] = typer.Option(
+        None,
+        "--page-space",
+        help="Space key for the pages. If not specified - default space from the config is used.",
+    ),
+    root_page_title: Optional[str] = typer.Option(
+        None,
+        "--root-page-title",
+        help="Title of the page to create the tree under. If not specified - the tree is created in the space root.",
+    ),
+    workers: int = typer.Option(
+        4, "--workers", min=1, help="Number of pages posted concurrently."
+    ),
+    storage_format: Optional[bool] = typer.Option(
+        False,
+        "--storage-format",
+        show_default=False,
+        help="Convert markdown files to storage format locally, instead of letting Confluence convert them.",
+    ),
+):
+    """Mirrors a directory tree as a tree of pages.
+
+    Every page file becomes a page. Every subdirectory becomes a page with the text of its 'index' file,
+    the files inside the subdirectory become its children. The page of a subdirectory is titled after it, unless
+    the front matter of the index file sets the `title`. The 'index' file of DIRECTORY itself is not posted: the tree
+    is created under the root page or in the space root. Existing pages are updated, missing ones are created
+    without prompts."""
+    from confluence_poster.tree_sync_helpers import build_page_tree, sync_page_tree
+
+    always_echo = state.always_print_function
+    echo_err = state.print_stderr
+
+    if (space := page_space or state.config.default_space) is None:
+        echo_err(
+            "Space is not specified. Pass --page-space or set default space in the config."
+        )
+        raise typer.Exit(1)
 
-        if (
-            upload_files
-            and target_page.page_id == page.page_id
-            and target_page.page_id is not None
+    try:
+        levels = build_page_tree(directory, page_space=space)
+    except ValueError as e:
+        echo_err(str(e))
+        raise typer.Exit(1)
+    if storage_format:
+        for page in (_ for level in levels for _ in level):
+            page.storage_format = True
+
+    root_parent_id = None
+    if root_page_title is not None:
+        if not (
+            root_parent_id := state.confluence_instance.get_page_id(
+                space=space, title=root_page_title
+            )
         ):
-            attach_files_to_page(page=target_page, files=files, state=state)
+            echo_err(f"Page '{root_page_title}' not found in space '{space}'.")
+            raise typer.Exit(1)
 
+    if state.progress is not None:
+        state.progress.start(sum(len(_) for _ in levels))
+    report = sync_page_tree(
+        levels, root_parent_id=root_parent_id, state=state, max_workers=workers
+    )
     always_echo("Finished processing pages")
 
     if state.print_report:
@@ -468,6 +772,68 @@ def create_config(
     )
 
 
+@app.command()
+def add_pages(
+    directory: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=False,
+        help="Directory with the page files.",
+    ),
+    recursive: Optional[bool] = typer.Option(
+        False,
+        "--recursive",
+        show_default=False,
+        help="Also look for page files in subdirectories.",
+    ),
+    page_space: Optional[str] = typer.Option(
+        None,
+        "--page-space",
+        help="Space key for the added pages. If not specified - default space from the config is used.",
+    ),
+):
+    """Adds pages to the config without prompts. Every file in the directory with a known page file format becomes a
+    page. Page title is taken from the 'title' field of the file front matter, or from the file name. The front matter
+    of the added pages is not posted.
+
+    Files and titles that are already in the config are skipped."""
+    from confluence_poster.config_wizard import add_pages_to_config
+    from confluence_poster.page_discovery_helpers import scan_page_files
+
+    echo = state.print_function
+    always_echo = state.always_print_function
+
+    added_pages = add_pages_to_config(
+        filename=state.config_path,
+        page_files=scan_page_files(directory, recursive=recursive),
+        page_space=page_space,
+    )
+    for title, page_file in added_pages:
+        echo(f"Added page '{title}' from file {page_file}")
+    if added_pages:
+        always_echo(f"Added {len(added_pages)} pages to {state.config_path}")
+    else:
+        always_echo("No new pages found")
+
+
+@app.command()
+def merge_reports(
+    reports: List[Path] = typer.Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="Files with the ndjson reports of the runs.",
+    ),
+):
+    """Combines the ndjson reports of the runs that processed the parts of the pages with --shard.
+    Prints the page records of all the runs and a single summary record."""
+    always_echo = state.always_print_function
+
+    with fileinput.input(files=[str(_) for _ in reports]) as report_lines:
+        for record in merge_ndjson_reports(report_lines):
+            always_echo(json.dumps(record))
+
+
 @app.callback()
 def main(
     ctx: typer.Context,
@@ -489,10 +855,35 @@ def main(
         help="Provide a parent title to search for."
         " Applicable if there is only one page.",
     ),
+    parent_page_path: Optional[str] = typer.Option(
+        None,
+        help="Provide a path of titles from the space root to the parent page, like 'Team/Runbooks'."
+        " Applicable if there is only one page.",
+    ),
     page_file: Optional[Path] = typer.Option(
         None,
         help="Provide the path to the file containing page text. Allows passing '-' to read from stdin.",
     ),
+    scan: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        file_okay=False,
+        help="Define the pages by the front matter of the page files in this directory and its subdirectories "
+        "instead of the pages in the config. Title, space, parent, parent_path, labels and format are read "
+        "from the front matter.",
+    ),
+    git_rev: Optional[str] = typer.Option(
+        None,
+        help="Read the page files of the pages in the config from this git revision instead of the working tree. "
+        "Applicable to post-page and convert-markdown.",
+    ),
+    stdin_format: Optional[StdinFormat] = typer.Option(
+        StdinFormat.text,
+        "--stdin-format",
+        help="Format of stdin with '--page-file -'. 'ndjson' makes post-page read a JSON record per page "
+        "with title, space, parent, format and body, post every page as soon as it is read "
+        "and write a result record per page to stdout.",
+    ),
     password: Optional[str] = typer.Option(
         None, help="Supply the password in command line.", envvar="CONFLUENCE_PASSWORD"
     ),
@@ -520,7 +911,8 @@ def main(
         False,
         "--report",
         show_default=False,
-        help="Print report at the end of the run. " "Not enabled by default.",
+        help="Print report at the end of the run, including the summary of the API calls. "
+        "Not enabled by default.",
     ),
     debug: Optional[bool] = typer.Option(
         False,
@@ -534,13 +926,80 @@ def main(
         show_default=False,
         help="Suppresses certain output.",
     ),
+    timings: Optional[bool] = typer.Option(
+        False,
+        "--timings",
+        show_default=False,
+        help="Print the time spent in each phase of the run to stderr at the end of the run. "
+        "Not enabled by default.",
+    ),
+    timings_json: Optional[Path] = typer.Option(
+        None,
+        help="Write the time spent in each phase of the run, overall and per page, to this file as JSON.",
+    ),
+    progress: Optional[bool] = typer.Option(
+        False,
+        "--progress",
+        show_default=False,
+        help="Show the progress of processing the pages with throughput and ETA on stderr. "
+        "Not enabled by default.",
+    ),
+    report_format: Optional[ReportFormat] = typer.Option(
+        ReportFormat.text,
+        "--report-format",
+        help="Format of the report. 'ndjson' writes a JSON record per page as soon as the page is processed "
+        "and a summary record at the end of the run, without --report. 'ndjson' is only supported by post-page "
+        "and sync-tree.",
+    ),
+    report_file: Optional[Path] = typer.Option(
+        None,
+        help="File to write the ndjson report to. If not specified - the report is written to stdout.",
+    ),
+    metrics_textfile: Optional[Path] = typer.Option(
+        None,
+        help="Write the metrics of the run in Prometheus text format to this file at the end of the run. "
+        "Intended for the textfile collector of node_exporter. Pages are counted by status: created, updated, "
+        "skipped (e.g. last updated by another author or declined at a prompt) and failed.",
+    ),
+    shard: Optional[str] = typer.Option(
+        None,
+        "--shard",
+        callback=shard_callback,
+        help="Process only a part of the pages, like '2/3' for the second of three parts. "
+        "Parents are processed in the same part as their children. "
+        "The ndjson reports of the parts can be combined with merge-reports.",
+    ),
+    markdown_workers: int = typer.Option(
+        1,
+        min=0,
+        help="Convert large markdown files in this many processes, splitting them at headings. "
+        "0 means a process per CPU.",
+    ),
+    markdown_cache_dir: Optional[Path] = typer.Option(
+        None,
+        help="Cache the converted sections of markdown files in this directory. "
+        "Only the changed sections of a file are converted again.",
+    ),
+    profile: Optional[ProfilerType] = typer.Option(
+        None,
+        "--profile",
+        show_default=False,
+        help="Profile the run with cProfile or tracemalloc. "
+        "The top entries are printed to stderr unless --quiet is set.",
+    ),
+    profile_output: Optional[Path] = typer.Option(
+        None,
+        help=f"File to write the profile to. If not specified - {DEFAULT_OUTPUT[ProfilerType.cprofile]} "
+        f"or {DEFAULT_OUTPUT[ProfilerType.tracemalloc]} in the current directory is used.",
+    ),
 ):
     """Supplementary script for writing Confluence articles in
     local editor. Uses information from the config to post the article content to Confluence.
 
     """
 
-    if ctx.invoked_subcommand == "convert-markdown":
+    quiet_requested = quiet
+    if ctx.invoked_subcommand in {"convert-markdown", "merge-reports"}:
         quiet = True
 
     if str(page_file) == "-":
@@ -553,6 +1012,32 @@ def main(
             raise typer.Exit(3)
     else:
         state.filter_mode = False
+    if stdin_format is StdinFormat.ndjson and not (
+        state.filter_mode and ctx.invoked_subcommand == "post-page"
+    ):
+        typer.echo(
+            "--stdin-format ndjson can only be used with --page-file - and post-page",
+            err=True,
+        )
+        raise typer.Exit(3)
+    state.stdin_format = stdin_format
+    if report_format is ReportFormat.ndjson and ctx.invoked_subcommand not in {
+        "post-page",
+        "sync-tree",
+    }:
+        # Only the commands that post pages have something to report
+        typer.echo(
+            "--report-format ndjson can only be used with post-page and sync-tree",
+            err=True,
+        )
+        raise typer.Exit(3)
+    # Stdout is reserved for the ndjson records, either of the results or of the report.
+    # The messages that are always printed go to stderr instead
+    state.stdout_reserved = stdin_format is StdinFormat.ndjson or (
+        report_format is ReportFormat.ndjson and report_file is None
+    )
+    if state.stdout_reserved:
+        quiet = True
 
     state.quiet = quiet
 
@@ -574,27 +1059,138 @@ def main(
     else:
         state.debug = False
 
-    if (
-        ctx.invoked_subcommand != "create-config"
-    ):  # no need to validate or load the config if we're creating it
+    state.timings = Timings()
+    state.request_stats = RequestStats()
+    if timings or timings_json:
+
+        def _report_timings():
+            if timings:
+                echo_err(str(state.timings))
+            if timings_json:
+                state.timings.write_json(timings_json)
+
+        ctx.call_on_close(_report_timings)
+
+    if profile is not None:
+        profiler = RunProfiler(profile, profile_output)
+
+        def _report_profile():
+            summary = profiler.stop()
+            # Summary goes to stderr, so that stdout of convert-markdown and filter mode stays clean
+            if not quiet_requested:
+                echo_err(summary)
+                echo_err(f"Profile written to {profiler.output}")
+
+        ctx.call_on_close(_report_profile)
+        profiler.start()
+
+    state.markdown_workers = markdown_workers
+    state.markdown_cache = (
+        None if markdown_cache_dir is None else MarkdownCache(markdown_cache_dir)
+    )
+    state.git_source = None
+    if git_rev is not None:
+        if state.filter_mode or ctx.invoked_subcommand not in {
+            "convert-markdown",
+            "post-page",
+        }:
+            echo_err("--git-rev can only be used with post-page and convert-markdown")
+            raise typer.Exit(3)
+        try:
+            state.git_source = GitSource(git_rev)
+        except ValueError as e:
+            echo_err(str(e))
+            raise typer.Exit(1)
+        ctx.call_on_close(state.git_source.close)
+
+    state.page_counts = Counter()
+    if metrics_textfile is not None:
+        ctx.call_on_close(
+            lambda: write_metrics_textfile(
+                metrics_textfile,
+                format_metrics(
+                    command=ctx.invoked_subcommand,
+                    timings=state.timings,
+                    request_stats=state.request_stats,
+                    page_counts=state.page_counts,
+                ),
+            )
+        )
+
+    state.progress = None
+    if progress:
+        state.progress = Progress(request_stats=state.request_stats)
+        ctx.call_on_close(state.progress.stop)
+
+    state.config_path = config
+    if ctx.invoked_subcommand not in {
+        "create-config",
+        "add-pages",
+        "merge-reports",
+    }:  # no need to validate or load the config if we're creating or editing it, or not using it at all
         state.force = force
         state.force_create = force_create
         state.print_report = report
+        if report_format is ReportFormat.ndjson:
+            report_stream = sys.stdout if report_file is None else report_file.open("w")
+            state.report_writer = NdjsonReportWriter(
+                report_stream,
+                timings=state.timings,
+                request_stats=state.request_stats,
+                shard=None if shard is None else str(shard),
+            )
+
+            def _finish_report():
+                state.report_writer.write_summary()
+                if report_file is not None:
+                    report_stream.close()
+
+            ctx.call_on_close(_finish_report)
+        else:
+            state.report_writer = None
         state.minor_edit = minor_edit
 
         echo("Reading config")
         try:
-            confluence_config = load_config(config)
+            with state.timings.span("load_config"):
+                confluence_config = load_config(config)
         except FileNotFoundError as e:
             echo_err("Config file not found. Consider running `create-config`")
             raise e
         state.config = confluence_config
 
-        # Check that the parameters are not used with more than 1 page in the config
-        if page_title or parent_page_title or page_file:
+        if scan is not None:
+            from confluence_poster.page_discovery_helpers import discover_pages
+
+            try:
+                with state.timings.span("scan_pages"):
+                    scanned_pages = discover_pages(
+                        scan, confluence_config.default_space
+                    )
+            except ValueError as e:
+                echo_err(str(e))
+                raise typer.Exit(1)
+            if not scanned_pages:
+                echo_err(f"No page files found in {scan}")
+                raise typer.Exit(1)
+            confluence_config.replace_pages(scanned_pages)
+
+        if shard is not None:
+            confluence_config.replace_pages(
+                select_shard(confluence_config.pages, shard)
+            )
+            if not confluence_config.pages:
+                echo_err(f"No pages in shard {shard}")
+                raise typer.Exit(0)
+
+        # Check that the parameters are not used with more than 1 page in the config.
+        # With ndjson on stdin the pages come from the records, the ones in the config are not posted
+        if stdin_format is not StdinFormat.ndjson and (
+            page_title or parent_page_title or parent_page_path or page_file
+        ):
             if len(confluence_config.pages) > 1:
                 echo_err(
-                    "Page title, parent page title or page file specified as a parameter "
+                    "Page title, parent page title, parent page path or page file specified as a parameter "
                     "but there are more than 1 page in the config.\n"
                     "These parameters are intended to be used with only one page.\n"
                     "Please specify them in the config.\n"
@@ -605,6 +1201,8 @@ def main(
                 state.config.pages[0].page_title = page_title
             if parent_page_title:
                 state.config.pages[0].parent_page_title = parent_page_title
+            if parent_page_path:
+                state.config.pages[0].parent_page_path = parent_page_path
             if page_file:
                 if state.filter_mode:
                     state.config.pages[0].page_text = sys.stdin.read()
@@ -628,9 +1226,13 @@ def main(
         else:
             api_version = "latest"
 
+        # Every API call goes through this session, so that the calls are accounted in the report
+        session = Session()
+        state.request_stats.instrument(session, base_url=confluence_config.auth.url)
         state.confluence_instance = Confluence(
             url=confluence_config.auth.url,
             username=confluence_config.auth.username,
             password=_password,
             api_version=api_version,
+            session=session,
         )
@@ -1,10 +1,18 @@
 from atlassian import Confluence
-from dataclasses import dataclass, field
-from typing import Union, Callable, List
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from typing import Union, Callable, List, Tuple, NamedTuple
 from typer import echo, prompt, confirm
 from functools import partial
+from pathlib import Path
 
-from confluence_poster.poster_config import Page, Config
+from confluence_poster.poster_config import Page, Config, slotted
+from confluence_poster.timing_helpers import Timings
+from confluence_poster.request_stats_helpers import RequestStats
+from confluence_poster.report_helpers import NdjsonReportWriter
+from confluence_poster.markdown_cache_helpers import MarkdownCache
+from confluence_poster.progress_helpers import Progress
+from confluence_poster.git_source_helpers import GitSource
 
 """File that contains procedures used inside main.py's functions"""
 
@@ -21,6 +29,16 @@ def get_page_url(
         return None
 
 
+def get_page_url_from_response(
+    response: Union[dict, None], confluence: Confluence
+) -> Union[str, None]:
+    """Retrieves page URL from the content returned by page creation or update, saving a lookup by title"""
+    try:
+        return confluence.url + response["_links"]["webui"]
+    except (KeyError, TypeError):
+        return None
+
+
 def check_last_updated_by(
     page_id: int, username_to_check: str, confluence_instance: Confluence
 ) -> (bool, str):
@@ -40,6 +58,7 @@ def check_last_updated_by(
     return page_last_updated_by == username_to_check, page_last_updated_by
 
 
+@slotted
 @dataclass
 class PostedPage(Page):
     """Merges independently set fields with the runtime-set fields"""
@@ -47,6 +66,101 @@ class PostedPage(Page):
     version_comment: Union[str, None] = None
     page_id: Union[int, None] = None
 
+    @classmethod
+    def from_page(cls, page: Page) -> "PostedPage":
+        """Shallow copy of the page fields. dataclasses.astuple deep-copies every value, including page text"""
+        return cls(*(getattr(page, _.name) for _ in fields(page)))
+
+
+class SkipReason(str):
+    """Reason of a page left unprocessed on purpose, e.g. by the user. Other reasons are failures"""
+
+
+class ReportEntry(NamedTuple):
+    """Compact record of a processed page. Does not hold on to the page text."""
+
+    space: str
+    title: str
+    page_id: Union[int, None]
+    url: Union[str, None]
+    status: str
+
+    @classmethod
+    def from_page(cls, page: Page, status: str, url: Union[str, None] = None):
+        return cls(
+            page.page_space,
+            page.page_title,
+            getattr(page, "page_id", None),
+            url,
+            status,
+        )
+
+
+@dataclass
+class Report:
+    created_pages: List[ReportEntry] = field(default_factory=list)
+    updated_pages: List[ReportEntry] = field(default_factory=list)
+    unprocessed_pages: List[Tuple[ReportEntry, str]] = field(default_factory=list)
+    confluence_instance: Confluence = None
+    request_stats: Union[None, RequestStats] = None
+    writer: Union[None, NdjsonReportWriter] = None
+    progress: Union[None, Progress] = None
+    page_counts: Union[None, Counter] = None
+    # Entries are not needed if only the streamed report is written
+    keep_entries: bool = True
+
+    def add(
+        self,
+        entry: ReportEntry,
+        reason: Union[str, None] = None,
+        body_bytes: Union[int, None] = None,
+    ):
+        """Records the processed page. Reason is required for unprocessed pages"""
+        if self.writer is not None:
+            self.writer.write_page(entry, reason, body_bytes)
+        if self.progress is not None:
+            self.progress.advance()
+        if self.page_counts is not None:
+            status = entry.status
+            if status == "unprocessed":
+                # Skipped pages are counted apart, so that the failures can be told from them in the metrics
+                status = "skipped" if isinstance(reason, SkipReason) else "failed"
+            self.page_counts[status] += 1
+        if not self.keep_entries:
+            return
+        if entry.status == "created":
+            self.created_pages += [entry]
+        elif entry.status == "updated":
+            self.updated_pages += [entry]
+        else:
+            self.unprocessed_pages += [(entry, reason)]
+
+    def __str__(self) -> str:
+        output = ""
+        for header, page_list in [
+            ("Created pages:", self.created_pages),
+            ("Updated pages:", self.updated_pages),
+        ]:
+            output += header + "\n"
+            if page_list:
+                for entry in page_list:
+                    title = entry.title
+                    space = entry.space
+                    url = entry.url or get_page_url(
+                        title, space, self.confluence_instance
+                    )
+                    output += f"{space}::{title} {url}\n"
+            else:
+                output += "None\n"
+        if self.unprocessed_pages:
+            output += "Unprocessed pages:\n"
+            for entry, reason in self.unprocessed_pages:
+                output += f"{entry.space}::{entry.title} Reason: {reason}\n"
+        if self.request_stats is not None:
+            output += str(self.request_stats)
+
+        return output
+
 
 @dataclass
 class StateConfig:
@@ -56,12 +170,28 @@ class StateConfig:
     debug: bool = False
     confluence_instance: Union[None, Confluence] = None
     config: Union[None, Config] = None
+    config_path: Union[None, Path] = None
     minor_edit: bool = False
     print_report: bool = False
     force_create: bool = False
     created_pages: List[int] = field(default_factory=list)
+    # Per-run cache of the page tree, used to resolve parent page paths. Maps space key to the root node
+    page_tree_cache: dict = field(default_factory=dict)
+    timings: Timings = field(default_factory=Timings)
+    request_stats: RequestStats = field(default_factory=RequestStats)
+    report_writer: Union[None, NdjsonReportWriter] = None
+    progress: Union[None, Progress] = None
+    # Processed pages by status over the whole run
+    page_counts: Counter = field(default_factory=Counter)
+    markdown_workers: int = 1
+    markdown_cache: Union[None, MarkdownCache] = None
+    stdin_format: str = "text"
+    # Page files are read from this revision instead of the working tree
+    git_source: Union[None, GitSource] = None
     _filter_mode: bool = False
     quiet: bool = False
+    # Output that is always printed goes to stderr, stdout is left for machine-readable records
+    stdout_reserved: bool = False
 
     @property
     def print_function(self) -> Callable:
@@ -76,6 +206,8 @@ class StateConfig:
 
     @property
     def always_print_function(self) -> Callable:
+        if self.stdout_reserved:
+            return partial(echo, err=True)
         return echo
 
     @property
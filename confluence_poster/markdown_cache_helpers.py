@@ -0,0 +1,50 @@
+import os
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Union
+
+import markdown
+
+"""On-disk cache of the html of markdown sections, so that after a small edit of a large page
+only the changed sections are converted again"""
+
+# Conversions by different converters are cached separately. The version changes the output, so it is a part of it
+PYTHON_MARKDOWN_CONVERTER = f"python-markdown {markdown.__version__}"
+
+
+class MarkdownCache:
+    """Maps the text of a markdown section to its html. The files are named after the hash
+    of the section text and the converter, so stale entries are never read.
+    Nothing is removed from the directory, it can be deleted at any time."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, text: str, converter: str) -> Path:
+        key = sha256(f"{converter}\0{text}".encode()).hexdigest()
+        return self.directory / key[:2] / f"{key}.html"
+
+    def get(
+        self, text: str, converter: str = PYTHON_MARKDOWN_CONVERTER
+    ) -> Union[str, None]:
+        try:
+            html = self._path(text, converter).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, text: str, html: str, converter: str = PYTHON_MARKDOWN_CONVERTER):
+        """Writes the entry atomically, so that concurrent runs never read a partial one"""
+        path = self._path(text, converter)
+        path.parent.mkdir(exist_ok=True)
+        with NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+        ) as tmp_file:
+            tmp_file.write(html)
+        os.replace(tmp_file.name, path)
@@ -0,0 +1,130 @@
+import os
+from collections import defaultdict
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Dict, Iterable, List, Mapping, Union
+
+from confluence_poster.request_stats_helpers import RequestStats
+from confluence_poster.timing_helpers import Timings
+
+"""Run metrics in Prometheus text format, for the textfile collector of node_exporter.
+
+The file is overwritten by every run, so the values describe the last run and are exposed as gauges"""
+
+PREFIX = "confluence_poster"
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+        + "}"
+    )
+
+
+def _header(name: str, metric_type: str, help_text: str) -> List[str]:
+    return [
+        f"# HELP {PREFIX}_{name} {help_text}",
+        f"# TYPE {PREFIX}_{name} {metric_type}",
+    ]
+
+
+def _histogram(name: str, values: Iterable[float], **labels) -> List[str]:
+    values = list(values)
+    lines = []
+    for bucket in HISTOGRAM_BUCKETS:
+        lines.append(
+            f"{PREFIX}_{name}_bucket{_labels(**labels, le=bucket)} "
+            f"{sum(1 for _ in values if _ <= bucket)}"
+        )
+    lines += [
+        f"{PREFIX}_{name}_bucket{_labels(**labels, le='+Inf')} {len(values)}",
+        f"{PREFIX}_{name}_sum{_labels(**labels)} {sum(values)}",
+        f"{PREFIX}_{name}_count{_labels(**labels)} {len(values)}",
+    ]
+    return lines
+
+
+def format_metrics(
+    command: str,
+    timings: Timings,
+    request_stats: Union[RequestStats, None] = None,
+    page_counts: Union[Mapping[str, int], None] = None,
+) -> str:
+    lines = _header("last_run_timestamp_seconds", "gauge", "When the run finished.")
+    lines.append(
+        f"{PREFIX}_last_run_timestamp_seconds{_labels(command=command)} {time()}"
+    )
+    lines += _header("run_duration_seconds", "gauge", "Duration of the run.")
+    lines.append(
+        f"{PREFIX}_run_duration_seconds{_labels(command=command)} {timings.total}"
+    )
+
+    lines += _header("pages", "gauge", "Pages processed during the run by status.")
+    for status in ("created", "updated", "skipped", "failed"):
+        lines.append(
+            f"{PREFIX}_pages{_labels(command=command, status=status)} "
+            f"{(page_counts or {}).get(status, 0)}"
+        )
+
+    lines += _header(
+        "phase_duration_seconds", "histogram", "Duration of the phases of the run."
+    )
+    for phase, durations in sorted(timings.phases.items()):
+        lines += _histogram(
+            "phase_duration_seconds", durations, command=command, phase=phase
+        )
+
+    if request_stats is not None:
+        calls: Dict[tuple, int] = defaultdict(int)
+        for record in request_stats.records:
+            calls[(record.method, record.endpoint, record.status)] += 1
+        lines += _header("api_requests", "gauge", "API requests made during the run.")
+        for (method, endpoint, status), number in sorted(calls.items()):
+            lines.append(
+                f"{PREFIX}_api_requests"
+                f"{_labels(command=command, method=method, endpoint=endpoint, status=status)} {number}"
+            )
+        lines += _header(
+            "api_request_duration_seconds", "histogram", "Latency of the API requests."
+        )
+        for (method, endpoint), records in sorted(request_stats.by_endpoint().items()):
+            lines += _histogram(
+                "api_request_duration_seconds",
+                (_.latency for _ in records),
+                command=command,
+                method=method,
+                endpoint=endpoint,
+            )
+        lines += _header("api_sent_bytes", "gauge", "Bytes sent in API requests.")
+        lines.append(
+            f"{PREFIX}_api_sent_bytes{_labels(command=command)} "
+            f"{sum(_.request_bytes for _ in request_stats.records)}"
+        )
+        lines += _header(
+            "api_received_bytes", "gauge", "Bytes received in API responses."
+        )
+        lines.append(
+            f"{PREFIX}_api_received_bytes{_labels(command=command)} "
+            f"{sum(_.response_bytes for _ in request_stats.records)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_textfile(path: Union[str, Path], metrics: str):
+    """Writes the file atomically, so that the collector never reads a partially written one"""
+    path = Path(path)
+    with NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f".{path.name}.", delete=False
+    ) as tmp_file:
+        tmp_file.write(metrics)
+    os.chmod(tmp_file.name, 0o644)
+    os.replace(tmp_file.name, path)
@@ -1,6 +1,10 @@
 from typing import Union
 
-from confluence_poster.main_helpers import StateConfig
+from confluence_poster.main_helpers import (
+    StateConfig,
+    SkipReason,
+    get_page_url_from_response,
+)
 from confluence_poster.convert_utils import get_representation_for_format
 from confluence_poster.page_location_helpers import determine_location
 from confluence_poster.poster_config import Page
@@ -11,11 +15,13 @@ class CreationResult:
         self,
         page_created: bool,
         page_id: Union[int, None] = None,
-        comment: Union[str, None] = None,
+        comment: Union[str, SkipReason, None] = None,
+        page_url: Union[str, None] = None,
     ):
         self.page_created = page_created
         self.page_id = page_id
         self.comment = comment
+        self.page_url = page_url
 
     def __bool__(self):
         return self.page_created
@@ -34,15 +40,19 @@ def create_page(page: Page, state: StateConfig, create_in_root: bool) -> Creatio
             page=page, create_in_root=create_in_root, state=state
         ):
             echo("Creating page...")
-            page_id = state.confluence_instance.create_page(
-                space=page.page_space,
-                title=page.page_title,
-                body=page.page_text,
-                parent_id=location.parent_page_id,
-                representation=get_representation_for_format(
-                    page.page_file_format
-                ).value,
-            )["id"]
+            with state.timings.span(
+                "create_page", f"{page.page_space}::{page.page_title}"
+            ):
+                response = state.confluence_instance.create_page(
+                    space=page.page_space,
+                    title=page.page_title,
+                    body=page.page_text,
+                    parent_id=location.parent_page_id,
+                    representation=get_representation_for_format(
+                        page.page_file_format, page.storage_format
+                    ).value,
+                )
+            page_id = response["id"]
             if location.parent_page_id is None:
                 page_location_msg = f"in root of the space '{page.page_space}'"
             else:
@@ -51,10 +61,18 @@ def create_page(page: Page, state: StateConfig, create_in_root: bool) -> Creatio
             echo(
                 f"Created page #{page_id} {page_location_msg} called '{page.page_title}'."
             )
-            return CreationResult(True, page_id)
+            return CreationResult(
+                True,
+                page_id,
+                page_url=get_page_url_from_response(
+                    response, state.confluence_instance
+                ),
+            )
         else:
             return CreationResult(
-                False, comment="Could not determine location for the page."
+                False, comment=SkipReason("Could not determine location for the page.")
             )
     else:
-        return CreationResult(False, comment="User cancelled creation when prompted.")
+        return CreationResult(
+            False, comment=SkipReason("User cancelled creation when prompted.")
+        )
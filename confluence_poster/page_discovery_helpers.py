@@ -0,0 +1,145 @@
+import json
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Iterator, List, Union
+
+from confluence_poster.convert_utils import guess_file_format
+from confluence_poster.front_matter_helpers import read_front_matter
+from confluence_poster.poster_config import AllowedFileFormat, Page
+
+"""Procedures to discover page files on the filesystem"""
+
+# Kept in the scanned directory. It is hidden, so it is never taken for a page file
+SCAN_CACHE_NAME = ".confluence_poster_scan.json"
+
+
+def scan_page_files(
+    directory: Union[str, Path], recursive: bool = False
+) -> Iterator[Path]:
+    """Yields files with known page file formats from the directory, in a stable order.
+
+    Hidden files and directories are skipped."""
+    with os.scandir(directory) as it:
+        entries = sorted(
+            (_ for _ in it if not _.name.startswith(".")), key=lambda _: _.name
+        )
+    for entry in entries:
+        if entry.is_file():
+            try:
+                guess_file_format(entry.name)
+            except ValueError:
+                continue
+            yield Path(entry.path)
+        elif recursive and entry.is_dir():
+            yield from scan_page_files(entry.path, recursive=recursive)
+
+
+def derive_page_title(
+    page_file: Union[str, Path], default: Union[str, None] = None
+) -> str:
+    """Page title is taken from the front matter of the file, or else from `default` or the file name"""
+    if title := read_front_matter(page_file).get("title"):
+        return str(title)
+    return default or Path(page_file).stem
+
+
+class FrontMatterCache:
+    """Front matter of the scanned files, stored by the path relative to the scanned directory.
+    An entry is used while the file keeps its modification time and size."""
+
+    def __init__(self, file: Union[str, Path]):
+        self.file = Path(file)
+        try:
+            self._entries = json.loads(self.file.read_text())
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+        self._seen = {}
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, page_file: Path, key: str) -> dict:
+        stat = page_file.stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = [signature, read_front_matter(page_file)]
+        self._seen[key] = entry
+        return entry[1]
+
+    def save(self):
+        """Writes the entries of the files read since the cache was loaded, the removed files are dropped"""
+        if self.misses == 0 and self._seen.keys() == self._entries.keys():
+            return
+        try:
+            with NamedTemporaryFile(
+                "w", dir=self.file.parent, prefix=f"{self.file.name}.", delete=False
+            ) as tmp_file:
+                json.dump(self._seen, tmp_file)
+            os.replace(tmp_file.name, self.file)
+        except OSError:
+            pass  # a read-only directory is scanned without the cache
+
+
+def page_from_front_matter(
+    page_file: Path, metadata: dict, default_space: Union[str, None]
+) -> Page:
+    """Creates the page from the title, space, parent, parent_path, labels and format in the front matter.
+    The title defaults to the file name, the format is guessed from the extension.
+
+    :raises ValueError if the page cannot be defined
+    """
+    if (space := metadata.get("space") or default_space) is None:
+        raise ValueError(
+            f"Page file {page_file} does not have space specified, neither is default space"
+        )
+    if file_format := metadata.get("format"):
+        try:
+            file_format = AllowedFileFormat(str(file_format).lower())
+        except ValueError:
+            raise ValueError(f"Unknown format '{file_format}' in {page_file}")
+    else:
+        file_format = guess_file_format(page_file.name)
+    labels = metadata.get("labels") or None
+    if isinstance(labels, str):
+        labels = [labels]
+
+    return Page(
+        page_title=str(metadata.get("title") or page_file.stem),
+        page_file=str(page_file),
+        page_space=str(space),
+        parent_page_title=metadata.get("parent") or None,
+        parent_page_path=metadata.get("parent_path") or None,
+        page_file_format=file_format,
+        labels=labels,
+        front_matter=True,
+    )
+
+
+def discover_pages(
+    directory: Union[str, Path], default_space: Union[str, None]
+) -> List[Page]:
+    """Defines a page for every page file in the directory tree from the front matter of the file.
+
+    Only the headers of the files are read, and only of the ones that changed since the previous scan.
+
+    :raises ValueError if a page cannot be defined or several files define the same page
+    """
+    directory = Path(directory)
+    cache = FrontMatterCache(directory / SCAN_CACHE_NAME)
+    pages, page_files = [], {}
+    for page_file in scan_page_files(directory, recursive=True):
+        metadata = cache.read(page_file, page_file.relative_to(directory).as_posix())
+        page = page_from_front_matter(page_file, metadata, default_space)
+        if (page_key := (page.page_title, page.page_space)) in page_files:
+            raise ValueError(
+                f"Files {page_files[page_key]} and {page_file} define the same page "
+                f"'{page.page_title}' in space {page.page_space}"
+            )
+        page_files[page_key] = page_file
+        pages.append(page)
+    cache.save()
+    return pages
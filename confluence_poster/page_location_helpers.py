@@ -1,8 +1,11 @@
-from typing import Union
+from typing import Union, Dict, Iterator
 
 from confluence_poster.main_helpers import StateConfig, get_page_url
 from confluence_poster.poster_config import Page
 
+# Amount of child pages requested at once when walking the page tree
+CHILD_PAGES_LIMIT = 200
+
 
 def _find_parent(parent_name: str, space: str, state: StateConfig) -> Union[int, None]:
     """Helper function to locate the parent page.
@@ -25,6 +28,77 @@ def _find_parent(parent_name: str, space: str, state: StateConfig) -> Union[int,
         return None
 
 
+class _PageTreeNode:
+    """Node of the per-run cache of the page tree. Children are listed once, when they are first needed."""
+
+    __slots__ = ("page_id", "children")
+
+    def __init__(self, page_id: Union[int, None] = None):
+        self.page_id = page_id  # None for the space root
+        self.children: Union[Dict[str, "_PageTreeNode"], None] = None
+
+
+def _list_child_pages(
+    node: _PageTreeNode, space: str, state: StateConfig
+) -> Iterator[dict]:
+    """Lists the child pages of the node, or root pages of the space if node is the root"""
+    confluence = state.confluence_instance
+    start = 0
+    while True:
+        if node.page_id is None:
+            results = confluence.get_space_content(
+                space,
+                depth="root",
+                content_type="page",
+                start=start,
+                limit=CHILD_PAGES_LIMIT,
+                expand="",
+            ).get("results", [])
+        else:
+            results = confluence.get_page_child_by_type(
+                node.page_id, type="page", start=start, limit=CHILD_PAGES_LIMIT
+            )
+        yield from results
+        if len(results) < CHILD_PAGES_LIMIT:
+            return
+        start += len(results)
+
+
+def _find_parent_by_path(
+    parent_path: str, space: str, state: StateConfig
+) -> Union[int, None]:
+    """Helper function to locate the parent page by the path of titles from the space root, like 'A/B/C'.
+
+    Walks the child pages listings. Every listed level is cached in state.page_tree_cache, so pages with common
+    ancestors share the lookups.
+
+    :return page id if parent is found, None otherwise
+    """
+    state.print_function(f"Looking for the parent page with path '{parent_path}'")
+    node = state.page_tree_cache.setdefault(space, _PageTreeNode())
+    for title in (_.strip() for _ in parent_path.split("/") if _.strip()):
+        listed_now = False
+        if node.children is None:
+            node.children = {
+                _["title"]: _PageTreeNode(_["id"])
+                for _ in _list_child_pages(node, space, state)
+            }
+            listed_now = True
+        if title not in node.children and not listed_now:
+            # The page could have been created after the listing was cached
+            node.children = {
+                _["title"]: node.children.get(_["title"], _PageTreeNode(_["id"]))
+                for _ in _list_child_pages(node, space, state)
+            }
+        if (node := node.children.get(title)) is None:
+            state.print_function(f"Parent page '{parent_path}' not found")
+            return None
+
+    if node.page_id is not None:
+        state.print_function(f"Found page #{node.page_id} with path '{parent_path}'")
+    return node.page_id
+
+
 def _prompt_for_parent(state: StateConfig) -> str:
     """Function that handles user input """
     prompt = state.prompt_function
@@ -58,18 +132,38 @@ def determine_location(
     echo = state.print_function
     confirm = state.confirm_function
     always_echo = state.always_print_function
+    page_key = f"{page.page_space}::{page.page_title}"
+    span = state.timings.span
 
     if create_in_root:
         echo(f"Will create the page in root of space {page.page_space}")
         return LocationResult(True, None)
 
+    if page.parent_page_path:
+        echo(
+            f"Will create the page under the specified parent page path '{page.parent_page_path}'"
+        )
+        with span("determine_location", page_key):
+            parent_page_id = _find_parent_by_path(
+                parent_path=page.parent_page_path, space=page.page_space, state=state
+            )
+        if parent_page_id is not None:
+            return LocationResult(True, parent_page_id, page.parent_page_path)
+        else:
+            always_echo(
+                f"Provided page path '{page.parent_page_path}' not found in space '{page.page_space}'.\n"
+                "Skipping page."
+            )
+            return LocationResult(False)
+
     if page.parent_page_title:
         echo(
             f"Will create the page under the specified parent page '{page.parent_page_title}'"
         )
-        parent_page_id = _find_parent(
-            parent_name=page.parent_page_title, space=page.page_space, state=state
-        )
+        with span("determine_location", page_key):
+            parent_page_id = _find_parent(
+                parent_name=page.parent_page_title, space=page.page_space, state=state
+            )
         if parent_page_id is not None:
             return LocationResult(True, parent_page_id, page.parent_page_title)
         else:
@@ -83,12 +177,14 @@ def determine_location(
         while confirm(
             f"Should the script look for a parent in space {page.page_space}?"
             f" (N to be prompted to create the page in the space root)\n"
-            f"Hint: you can pass --create-in-space-root or --parent-page-title to skip this prompt."
+            f"Hint: you can pass --create-in-space-root, --parent-page-title or --parent-page-path to skip this prompt."
         ):
             parent_title = _prompt_for_parent(state)
-            if parent_id := _find_parent(
-                parent_name=parent_title, space=page.page_space, state=state
-            ):
+            with span("determine_location", page_key):
+                parent_id = _find_parent(
+                    parent_name=parent_title, space=page.page_space, state=state
+                )
+            if parent_id:
                 if confirm(
                     f"Proceed to create the page '{page.page_title}' under page '{parent_title}'?"
                 ):
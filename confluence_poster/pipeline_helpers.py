@@ -0,0 +1,39 @@
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Tuple, TypeVar, Union
+
+"""Overlapping of the independent stages of processing a sequence of pages"""
+
+Item = TypeVar("Item")
+Prepared = TypeVar("Prepared")
+
+
+def prepare_ahead(
+    items: Iterable[Item],
+    prepare: Callable[[Item], Prepared],
+    executor: Executor,
+    depth: int,
+    release: Union[Callable[[Item], None], None] = None,
+) -> Iterator[Tuple[Item, Prepared]]:
+    """Yields the items in their order together with the results of `prepare`.
+
+    While the consumer processes an item, up to `depth` following items are prepared in the executor.
+    The next item is submitted only when the consumer asks for it, so at most `depth` + 1 prepared items are held
+    in memory however slow the consumer is. With depth 0 the items are prepared one at a time.
+
+    Exceptions raised by `prepare` are raised when the consumer reaches the item.
+
+    :param release: called with the item once the consumer is done with it, e.g. to drop what `prepare` stored in it
+    """
+    iterator = iter(items)
+    pending = deque(
+        (item, executor.submit(prepare, item)) for item in islice(iterator, depth + 1)
+    )
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+        if release is not None:
+            release(item)
+        for item in islice(iterator, 1):
+            pending.append((item, executor.submit(prepare, item)))
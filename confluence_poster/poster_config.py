@@ -1,13 +1,14 @@
 import toml
+from sys import intern
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Union
-from operator import attrgetter
-from itertools import groupby
+from dataclasses import dataclass, fields as dataclass_fields
+from typing import List, Union
 from collections import UserDict
 from marshmallow import Schema, fields, ValidationError
 from enum import Enum
 
+from confluence_poster.front_matter_helpers import split_front_matter
+
 
 class AllowedFileFormat(str, Enum):
     confluencewiki = "confluencewiki"
@@ -16,13 +17,42 @@ class AllowedFileFormat(str, Enum):
     none = "None"
 
 
+class MarkdownEngine(str, Enum):
+    python_markdown = "python-markdown"
+    markdown_it = "markdown-it"
+    mistune = "mistune"
+
+
+def slotted(cls):
+    """Rebuilds a dataclass with __slots__ instead of the per-instance __dict__.
+
+    Backport of dataclass(slots=True) which is available only since Python 3.10"""
+    inherited_slots = {
+        slot for base in cls.__mro__[1:] for slot in getattr(base, "__slots__", ())
+    }
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(
+        _.name for _ in dataclass_fields(cls) if _.name not in inherited_slots
+    )
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # Defaults are already baked into generated __init__, class attributes would clash with the slots
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@slotted
 @dataclass
 class Page:
     page_title: str
     page_file: str
     page_space: Union[str, None]
     parent_page_title: Union[str, None] = None
-    _page_text: str = ""
+    parent_page_path: Union[str, None] = None
+    # None until the text is read from the page file or set
+    _page_text: Union[str, None] = None
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Page):
@@ -33,17 +63,29 @@ class Page:
 
     @property
     def page_text(self) -> str:
-        if self._page_text == "":
-            if (_file := Path(self.page_file)).exists():
-                self._page_text = Path(self.page_file).read_text()
+        if self._page_text is None:
+            if not (_file := Path(self.page_file)).is_file():
+                return ""
+            self._page_text = _file.read_text()
+            if self.front_matter:
+                # Metadata in the header of the file is not a part of the page
+                _, self._page_text = split_front_matter(self._page_text)
         return self._page_text
 
     @page_text.setter
-    def page_text(self, value: str):
+    def page_text(self, value: Union[str, None]):
         self._page_text = value
 
     page_file_format: AllowedFileFormat = AllowedFileFormat.none
     force_overwrite: Union[bool, None] = False
+    # Markdown is converted to storage format locally instead of being converted by Confluence
+    storage_format: Union[bool, None] = False
+    # Overrides the engine from the config
+    markdown_engine: Union[MarkdownEngine, None] = None
+    # Set on the page after it is posted. Only read from the front matter of the page file
+    labels: Union[List[str], None] = None
+    # The page file starts with a front matter that is not posted. Other files are posted as they are
+    front_matter: Union[bool, None] = False
 
 
 class AllowedFileFormatField(fields.Field):
@@ -58,11 +100,16 @@ class PageSchema(Schema):
     page_file = fields.Str()
     page_space = fields.Str()
     parent_page_title = fields.Str(missing=None)
-    _page_text = fields.Str()
+    parent_page_path = fields.Str(missing=None)
+    _page_text = fields.Str(allow_none=True)
     page_file_format = AllowedFileFormatField(
         default=AllowedFileFormat.none, missing=AllowedFileFormat.none
     )
     force_overwrite = fields.Boolean(default=False)
+    storage_format = fields.Boolean(default=False)
+    markdown_engine = fields.Str(missing=None)
+    labels = fields.List(fields.Str(), missing=None)
+    front_matter = fields.Boolean(default=False)
 
 
 @dataclass
@@ -109,6 +156,9 @@ class Config(PartialConfig):
         self.pages = _["pages"]
         self.auth = _["auth"]
         self.author = _.get("author", None)
+        self.markdown_engine = MarkdownEngine(
+            _.get("markdown_engine", MarkdownEngine.python_markdown)
+        )
 
     @property
     def pages(self):
@@ -127,23 +177,38 @@ class Config(PartialConfig):
                     )  # None is OK here, checked later
                     if not isinstance(default_space, str) or default_space is None:
                         raise ValueError("default.page_space should be a string")
+                    default_space = intern(default_space)
                 else:  # this is a page definition
                     for prop in item_content:  # TODO: better validation
                         if not isinstance(item_content[prop], str):
-                            if prop != "force_overwrite":
+                            if prop not in {
+                                "force_overwrite",
+                                "storage_format",
+                                "front_matter",
+                            }:
                                 raise ValueError(
                                     f"{prop} property of a page is not a string"
                                 )
 
+                    page_space = item_content.get("page_space", None)
+                    if (
+                        markdown_engine := item_content.get("markdown_engine", None)
+                    ) is not None:
+                        markdown_engine = MarkdownEngine(markdown_engine)
                     page = Page(
                         page_title=item_content.get("page_title", None),
                         page_file=item_content["page_file"],
                         page_file_format=AllowedFileFormat(
                             item_content.get("page_file_format", "None")
                         ),
-                        page_space=item_content.get("page_space", None),
+                        # Thousands of pages usually share a handful of spaces
+                        page_space=None if page_space is None else intern(page_space),
                         parent_page_title=item_content.get("page_parent_title", None),
+                        parent_page_path=item_content.get("page_parent_path", None),
                         force_overwrite=item_content.get("force_overwrite", False),
+                        storage_format=item_content.get("storage_format", False),
+                        markdown_engine=markdown_engine,
+                        front_matter=item_content.get("front_matter", False),
                     )
                     self.__pages.append(page)
             else:
@@ -151,6 +216,8 @@ class Config(PartialConfig):
                     "Pages section is malformed, refer to sample config.toml"
                 )
 
+        self.default_space = default_space
+
         # Validate pages
         # Page space may be none, in that case default space must be specified
         # Page name may be none, but the pages list may contain only one. In that case,
@@ -169,19 +236,19 @@ class Config(PartialConfig):
                     "There are more than 1 page, and one of the names is not specified"
                 )
 
-            # Check that there are no pages with same space and name - they will overwrite each other
-            page_title_func = attrgetter("page_title")
-            page_space_func = attrgetter("page_space")
-            groups = groupby(sorted(self.__pages, key=page_title_func), page_title_func)
-            for page_title, g in groups:
-                _ = list(g)
-                groups_space = groupby(sorted(_, key=page_space_func), page_space_func)
-                for space_name, group in groups_space:
-                    _ = list(group)
-                    if len(_) > 1:
-                        raise ValueError(
-                            f"There are more than 1 page called '{page_title}' in space {space_name}"
-                        )
+        # Check that there are no pages with same space and name - they will overwrite each other
+        seen_pages = set()
+        for page in self.__pages:
+            if (page_key := (page.page_title, page.page_space)) in seen_pages:
+                raise ValueError(
+                    f"There are more than 1 page called '{page.page_title}' in space {page.page_space}"
+                )
+            seen_pages.add(page_key)
+
+    def replace_pages(self, pages: List[Page]):
+        """Replaces the pages from the config file with the ones defined elsewhere, like in the front matter
+        of the scanned page files. The pages are validated by the caller."""
+        self.__pages = pages
 
     @property
     def auth(self):
@@ -0,0 +1,64 @@
+import cProfile
+import pstats
+import tracemalloc
+from enum import Enum
+from io import StringIO
+from pathlib import Path
+from typing import Union
+
+"""Profiling of the whole run, enabled by --profile"""
+
+SUMMARY_TOP = 20
+TRACEMALLOC_FRAMES = 25
+
+
+class ProfilerType(str, Enum):
+    cprofile = "cprofile"
+    tracemalloc = "tracemalloc"
+
+
+DEFAULT_OUTPUT = {
+    ProfilerType.cprofile: "confluence_poster.prof",
+    ProfilerType.tracemalloc: "confluence_poster.tracemalloc.txt",
+}
+
+
+class RunProfiler:
+    """Profiles the code between start() and stop().
+
+    cprofile writes the stats in pstats format, tracemalloc writes the diff of the memory snapshots taken at start
+    and stop"""
+
+    def __init__(self, profiler_type: ProfilerType, output: Union[Path, None] = None):
+        self.profiler_type = profiler_type
+        self.output = Path(output or DEFAULT_OUTPUT[profiler_type])
+        self._profile: Union[cProfile.Profile, None] = None
+        self._snapshot: Union[tracemalloc.Snapshot, None] = None
+
+    def start(self):
+        if self.profiler_type is ProfilerType.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def stop(self) -> str:
+        """Stops profiling and writes the output file. Returns the summary of the top entries"""
+        if self.profiler_type is ProfilerType.cprofile:
+            self._profile.disable()
+            self._profile.dump_stats(self.output)
+            summary = StringIO()
+            pstats.Stats(self._profile, stream=summary).sort_stats(
+                "cumulative"
+            ).print_stats(SUMMARY_TOP)
+            return summary.getvalue()
+
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        diff = snapshot.compare_to(self._snapshot, "lineno")
+        self.output.write_text("\n".join(str(_) for _ in diff) + "\n")
+        return "\n".join(
+            [f"Top {SUMMARY_TOP} allocations since the start of the run:"]
+            + [str(_) for _ in diff[:SUMMARY_TOP]]
+        )
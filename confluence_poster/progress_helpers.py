@@ -0,0 +1,101 @@
+import sys
+from threading import Event, Thread
+from time import perf_counter
+from typing import TextIO, Union
+
+from confluence_poster.request_stats_helpers import RequestStats
+
+"""Progress of processing the pages, rendered to stderr"""
+
+TTY_REFRESH_INTERVAL = 0.2
+# Without a terminal every update is a separate line, so they are rarer
+LINE_REFRESH_INTERVAL = 10
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02}m"
+    if minutes:
+        return f"{minutes}m{seconds:02}s"
+    return f"{seconds}s"
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class Progress:
+    """Shows processed pages, throughput, requests in flight, uploaded bytes and ETA.
+
+    On a terminal the line is redrawn in place, otherwise a line is printed periodically.
+    Writes to stderr directly, so it works regardless of --quiet and does not mix with stdout of filter mode.
+    """
+
+    def __init__(
+        self,
+        request_stats: Union[RequestStats, None] = None,
+        stream: TextIO = None,
+    ):
+        self.request_stats = request_stats
+        self.stream = sys.stderr if stream is None else stream
+        self.is_tty = self.stream.isatty()
+        self.total = 0
+        self.done = 0
+        self._started = None
+        self._stopped = Event()
+        self._thread: Union[Thread, None] = None
+
+    def start(self, total: int):
+        self.total = total
+        self._started = perf_counter()
+        self._thread = Thread(target=self._refresh, daemon=True)
+        self._thread.start()
+
+    def advance(self, pages: int = 1):
+        self.done += pages
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self._render(final=True)
+
+    def _refresh(self):
+        interval = TTY_REFRESH_INTERVAL if self.is_tty else LINE_REFRESH_INTERVAL
+        while not self._stopped.wait(interval):
+            self._render()
+
+    def status_line(self) -> str:
+        elapsed = perf_counter() - self._started
+        rate = self.done / elapsed if elapsed else 0
+        line = f"Pages {self.done}/{self.total}"
+        if self.total:
+            line += f" ({self.done * 100 // self.total}%)"
+        line += f" | {rate:.1f} pages/s"
+        if self.request_stats is not None:
+            line += (
+                f" | {self.request_stats.in_flight} requests in flight"
+                f" | {format_size(self.request_stats.sent_bytes)} uploaded"
+            )
+        if self.done < self.total:
+            eta = format_duration((self.total - self.done) / rate) if rate else "?"
+            line += f" | ETA {eta}"
+        else:
+            line += f" | done in {format_duration(elapsed)}"
+        return line
+
+    def _render(self, final: bool = False):
+        if self.is_tty:
+            # Clear the rest of the previous line, it may have been longer
+            self.stream.write(f"\r{self.status_line()}\033[K" + ("\n" if final else ""))
+        else:
+            self.stream.write(self.status_line() + "\n")
+        self.stream.flush()
@@ -0,0 +1,105 @@
+import json
+from enum import Enum
+from typing import Iterable, Iterator, TextIO, Union
+
+from confluence_poster.request_stats_helpers import RequestStats
+from confluence_poster.timing_helpers import Timings
+
+"""Machine-readable report, written while the pages are processed"""
+
+
+class ReportFormat(str, Enum):
+    text = "text"
+    ndjson = "ndjson"
+
+
+class NdjsonReportWriter:
+    """Writes one JSON record per processed page as soon as the page is done, and a summary record at the end.
+
+    Every record is flushed, so the report of a run that crashed halfway still has the processed pages
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        timings: Union[Timings, None] = None,
+        request_stats: Union[RequestStats, None] = None,
+        shard: Union[str, None] = None,
+    ):
+        self.stream = stream
+        self.timings = timings
+        self.request_stats = request_stats
+        # Set if the run posts only a part of the pages, the reports of the parts are merged afterwards
+        self.shard = shard
+        self.counts = {"created": 0, "updated": 0, "unprocessed": 0}
+
+    def _write(self, record: dict):
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def write_page(
+        self,
+        entry,
+        reason: Union[str, None] = None,
+        body_bytes: Union[int, None] = None,
+    ):
+        """:param entry: ReportEntry of the processed page"""
+        self.counts[entry.status] += 1
+        timings = {}
+        if self.timings is not None:
+            timings = dict(self.timings.pages.get(f"{entry.space}::{entry.title}", {}))
+        self._write(
+            {
+                "type": "page",
+                "status": entry.status,
+                "space": entry.space,
+                "title": entry.title,
+                "page_id": None if entry.page_id is None else str(entry.page_id),
+                "url": entry.url,
+                "reason": reason,
+                "body_bytes": body_bytes,
+                "timings": timings,
+            }
+        )
+
+    def write_summary(self):
+        record = {"type": "summary", **self.counts}
+        if self.timings is not None:
+            record["total_time"] = self.timings.total
+        if self.request_stats is not None:
+            records = self.request_stats.records
+            record["requests"] = len(records)
+            record["request_bytes"] = sum(_.request_bytes for _ in records)
+            record["response_bytes"] = sum(_.response_bytes for _ in records)
+        if self.shard is not None:
+            record["shard"] = self.shard
+        self._write(record)
+
+
+def merge_ndjson_reports(lines: Iterable[str]) -> Iterator[dict]:
+    """Merges the reports of the runs that posted the parts of the pages.
+
+    Yields the page records in their order and a single summary. The counts are added up, the runs are assumed
+    to be concurrent, so the total time is the time of the longest one.
+    """
+    summary = {"type": "summary", "created": 0, "updated": 0, "unprocessed": 0}
+    shards = []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record.get("type") != "summary":
+            yield record
+            continue
+        for key, value in record.items():
+            if key == "shard":
+                shards.append(value)
+            elif key == "total_time":
+                summary[key] = max(summary.get(key, 0), value)
+            elif key != "type":
+                summary[key] = summary.get(key, 0) + value
+    if shards:
+        summary["shards"] = sorted(
+            shards, key=lambda shard: [int(_) for _ in shard.split("/")]
+        )
+    yield summary
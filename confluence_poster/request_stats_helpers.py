@@ -0,0 +1,146 @@
+import re
+from collections import defaultdict
+from math import ceil
+from threading import Lock
+from typing import Dict, List, NamedTuple, Tuple
+from urllib.parse import urlsplit
+
+from requests import Response, Session
+
+"""Accounting of the HTTP requests made to Confluence during the run"""
+
+# Page, attachment and space ids are collapsed so that the calls are grouped by endpoint
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class RequestRecord(NamedTuple):
+    method: str
+    endpoint: str
+    status: int
+    request_bytes: int
+    response_bytes: int
+    latency: float
+
+
+def endpoint_template(url: str, base_path: str = "") -> str:
+    """Turns the request URL into the endpoint template, e.g. /rest/api/content/{id}/child/page"""
+    path = urlsplit(url).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path) :]
+    return _ID_SEGMENT.sub("/{id}", path) or "/"
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of the values"""
+    ordered = sorted(values)
+    return ordered[max(ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    # Streamed bodies (e.g. file-like objects) are not consumed here
+    return 0
+
+
+class RequestStats:
+    """Records every request made through the instrumented session.
+
+    Usage:
+        state.request_stats.instrument(session, base_url=url)
+        Confluence(url=url, session=session, ...)
+    """
+
+    def __init__(self):
+        self.records: List[RequestRecord] = []
+        self.in_flight = 0
+        self.sent_bytes = 0
+        self._base_path = ""
+        self._lock = Lock()
+
+    def instrument(self, session: Session, base_url: str = ""):
+        """Adds a response hook to the session and counts the requests waiting for the response"""
+        self._base_path = urlsplit(base_url).path.rstrip("/")
+        session.hooks["response"].append(self._on_response)
+        send = session.send
+
+        def _counting_send(*args, **kwargs):
+            with self._lock:
+                self.in_flight += 1
+            try:
+                return send(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+        session.send = _counting_send
+
+    def _on_response(self, response: Response, *args, **kwargs):
+        request = response.request
+        if kwargs.get("stream"):
+            # Reading the content would break the consumer of the stream
+            response_bytes = int(response.headers.get("Content-Length", 0))
+        else:
+            response_bytes = len(response.content)
+        self.record(
+            RequestRecord(
+                method=request.method,
+                endpoint=endpoint_template(request.url, self._base_path),
+                status=response.status_code,
+                request_bytes=_body_size(request.body),
+                response_bytes=response_bytes,
+                latency=response.elapsed.total_seconds(),
+            )
+        )
+        return response
+
+    def record(self, record: RequestRecord):
+        with self._lock:
+            self.records.append(record)
+            self.sent_bytes += record.request_bytes
+
+    def by_endpoint(self) -> Dict[Tuple[str, str], List[RequestRecord]]:
+        grouped = defaultdict(list)
+        with self._lock:
+            for record in self.records:
+                grouped[(record.method, record.endpoint)].append(record)
+        return grouped
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __str__(self) -> str:
+        grouped = self.by_endpoint()
+        output = f"HTTP requests: {len(self)}\n"
+        if not grouped:
+            return output
+        output += (
+            f"{'Endpoint':<48}{'Calls':>7}{'p50, ms':>10}{'p95, ms':>10}{'p99, ms':>10}"
+            f"{'Sent, B':>12}{'Received, B':>14}\n"
+        )
+        for (method, endpoint), records in sorted(
+            grouped.items(), key=lambda _: len(_[1]), reverse=True
+        ):
+            latencies = [_.latency * 1000 for _ in records]
+            output += (
+                f"{method + ' ' + endpoint:<48}{len(records):>7}"
+                f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+                f"{percentile(latencies, 99):>10.1f}"
+                f"{sum(_.request_bytes for _ in records):>12}"
+                f"{sum(_.response_bytes for _ in records):>14}\n"
+            )
+        statuses: Dict[int, int] = defaultdict(int)
+        for record in self.records:
+            statuses[record.status] += 1
+        output += (
+            f"Total: sent {sum(_.request_bytes for _ in self.records)} B,"
+            f" received {sum(_.response_bytes for _ in self.records)} B\n"
+        )
+        output += "Statuses: " + ", ".join(
+            f"{status}: {count}" for status, count in sorted(statuses.items())
+        )
+        return output + "\n"
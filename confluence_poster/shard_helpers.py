@@ -0,0 +1,64 @@
+from hashlib import sha256
+from typing import List, NamedTuple, Tuple
+
+from confluence_poster.poster_config import Page
+
+"""Partitioning of the pages between several runs, e.g. CI runners in different networks"""
+
+
+class Shard(NamedTuple):
+    """Part number `index` (counted from 1) out of `count` parts"""
+
+    index: int
+    count: int
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(value: str) -> Shard:
+    """:raises ValueError if the value is not like '1/3'"""
+    index, _, count = value.partition("/")
+    try:
+        shard = Shard(int(index), int(count))
+    except ValueError:
+        raise ValueError(f"Shard should look like 1/3, not '{value}'")
+    if not 1 <= shard.index <= shard.count:
+        raise ValueError(f"Shard index should be between 1 and {shard.count}")
+    return shard
+
+
+def _parent_title(page: Page):
+    if page.parent_page_path:
+        return page.parent_page_path.strip("/").rsplit("/", 1)[-1]
+    return page.parent_page_title
+
+
+def _chain_root(page: Page, pages: dict) -> Tuple[str, str]:
+    """Follows the parents of the page while they are also posted, so that a parent and its children
+    end up in the same shard and the parent is created first"""
+    key = (page.page_space, page.page_title)
+    seen = {key}
+    while (parent := pages.get((page.page_space, _parent_title(page)))) is not None:
+        if (parent_key := (parent.page_space, parent.page_title)) in seen:
+            break
+        key = parent_key
+        seen.add(key)
+        page = parent
+    return key
+
+
+def select_shard(pages: List[Page], shard: Shard) -> List[Page]:
+    """Picks the pages of the shard, keeping their order.
+
+    The pages are assigned by a hash of the space and the title of the topmost posted page of their parent chain.
+    The hash does not depend on the other pages, so adding a page to the config does not move the rest.
+    """
+    by_key = {(_.page_space, _.page_title): _ for _ in pages}
+    selected = []
+    for page in pages:
+        space, title = _chain_root(page, by_key)
+        digest = sha256(f"{space}\0{title}".encode()).hexdigest()
+        if int(digest[:16], 16) % shard.count == shard.index - 1:
+            selected.append(page)
+    return selected
@@ -0,0 +1,140 @@
+import json
+from enum import Enum
+from typing import Iterable, Iterator, NamedTuple, Tuple, Union
+
+from confluence_poster.poster_config import AllowedFileFormat
+from confluence_poster.main_helpers import StateConfig, Report, ReportEntry
+from confluence_poster.report_helpers import NdjsonReportWriter
+from confluence_poster.tree_sync_helpers import TreePage, sync_page
+
+"""Posting of pages that arrive on stdin one JSON record per line"""
+
+
+class StdinFormat(str, Enum):
+    text = "text"
+    ndjson = "ndjson"
+
+
+class PageRecord(NamedTuple):
+    title: str
+    space: str
+    parent: Union[str, None]
+    file_format: AllowedFileFormat
+    body: str
+
+
+def parse_page_record(line: str, default_space: Union[str, None]) -> PageRecord:
+    """Parses a line like {"title": ..., "space": ..., "parent": ..., "format": ..., "body": ...}.
+    Only the title and the body are mandatory. The page is created in the space root if there is no parent.
+
+    :raises ValueError if the record is malformed
+    """
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Not a JSON object: {e}")
+    if not isinstance(record, dict):
+        raise ValueError("Not a JSON object")
+    for key in ("title", "body"):
+        if not isinstance(record.get(key), str) or (key == "title" and not record[key]):
+            raise ValueError(f"'{key}' should be a string")
+    for key in ("space", "parent", "format"):
+        if record.get(key) is not None and not isinstance(record[key], str):
+            raise ValueError(f"'{key}' should be a string")
+
+    try:
+        file_format = AllowedFileFormat(record.get("format") or "markdown")
+    except ValueError:
+        raise ValueError(f"Unknown format '{record['format']}'")
+    if file_format is AllowedFileFormat.none:
+        raise ValueError("Format should be specified explicitly")
+    if not (record.get("space") or default_space):
+        raise ValueError("'space' should be specified, there is no default space")
+
+    return PageRecord(
+        title=record["title"],
+        space=record.get("space") or default_space,
+        parent=record.get("parent") or None,
+        file_format=file_format,
+        body=record["body"],
+    )
+
+
+def read_page_records(
+    lines: Iterable[str], default_space: Union[str, None]
+) -> Iterator[Tuple[int, Union[PageRecord, None], Union[str, None]]]:
+    """Reads the records one line at a time, blank lines are skipped.
+
+    :return line number, record and the reason if the record could not be parsed
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, parse_page_record(line, default_space), None
+        except ValueError as e:
+            yield number, None, f"Line {number}: {e}"
+
+
+def post_page_stream(
+    lines: Iterable[str],
+    state: StateConfig,
+    default_space: Union[str, None],
+    result_writer: NdjsonReportWriter,
+) -> Report:
+    """Posts every page as soon as its record is read, so only one page is held in memory.
+    A result record is written for every page before the next line is read.
+
+    :param result_writer: writer of the result records, may be the writer of the report
+    """
+    report = Report(
+        confluence_instance=state.confluence_instance,
+        request_stats=state.request_stats,
+        writer=state.report_writer,
+        progress=state.progress,
+        page_counts=state.page_counts,
+        keep_entries=state.print_report,
+    )
+
+    def add_result(entry: ReportEntry, reason: Union[str, None] = None):
+        report.add(entry, reason)
+        if result_writer is not report.writer:
+            result_writer.write_page(entry, reason)
+
+    # Parents are usually shared by many pages of the stream
+    parent_ids = {}
+
+    for number, record, reason in read_page_records(lines, default_space):
+        if record is None:
+            add_result(
+                ReportEntry(default_space, None, None, None, "unprocessed"), reason
+            )
+            continue
+
+        page = TreePage(
+            page_title=record.title,
+            page_file="",
+            page_space=record.space,
+            page_file_format=record.file_format,
+        )
+        page.page_text = record.body
+
+        parent_id = None
+        if record.parent is not None:
+            parent_key = (record.space, record.parent)
+            if parent_key not in parent_ids:
+                with state.timings.span("get_page_id"):
+                    parent_id = state.confluence_instance.get_page_id(
+                        space=record.space, title=record.parent
+                    )
+                if parent_id is None:
+                    add_result(
+                        ReportEntry.from_page(page, "unprocessed"),
+                        f"Line {number}: parent page '{record.parent}' not found",
+                    )
+                    continue
+                parent_ids[parent_key] = parent_id
+            parent_id = parent_ids[parent_key]
+
+        add_result(*sync_page(page, parent_id, state))
+    return report
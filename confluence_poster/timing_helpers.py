@@ -0,0 +1,90 @@
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Union, Dict, List
+
+"""Lightweight instrumentation that measures how long the phases of the run take"""
+
+
+class Timings:
+    """Collects the durations of the run phases, overall and per page.
+
+    Usage:
+        with state.timings.span("get_page_id", page="SPACE::Title"):
+            ...
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.phases: Dict[str, List[float]] = defaultdict(list)
+        self.pages: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._lock = Lock()
+
+    @contextmanager
+    def span(self, phase: str, page: Union[str, None] = None):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, perf_counter() - start, page)
+
+    def record(self, phase: str, duration: float, page: Union[str, None] = None):
+        with self._lock:
+            self.phases[phase].append(duration)
+            if page is not None:
+                self.pages[page][phase] += duration
+
+    @property
+    def total(self) -> float:
+        return perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "total": self.total,
+                "phases": {
+                    phase: {
+                        "count": len(durations),
+                        "total": sum(durations),
+                        "mean": sum(durations) / len(durations),
+                        "max": max(durations),
+                    }
+                    for phase, durations in self.phases.items()
+                },
+                "pages": {
+                    page: {**phases, "total": sum(phases.values())}
+                    for page, phases in self.pages.items()
+                },
+            }
+
+    def write_json(self, path: Union[str, Path]):
+        Path(path).write_text(json.dumps(self.as_dict(), indent=2))
+
+    def __str__(self) -> str:
+        data = self.as_dict()
+        output = f"Timings (total {data['total']:.3f}s):\n"
+        output += (
+            f"{'Phase':<28}{'Count':>8}{'Total, s':>12}{'Mean, s':>12}{'Max, s':>12}\n"
+        )
+        for phase, stats in sorted(
+            data["phases"].items(), key=lambda _: _[1]["total"], reverse=True
+        ):
+            output += (
+                f"{phase:<28}{stats['count']:>8}{stats['total']:>12.3f}"
+                f"{stats['mean']:>12.3f}{stats['max']:>12.3f}\n"
+            )
+        if data["pages"]:
+            output += "Per page:\n"
+            for page, phases in data["pages"].items():
+                breakdown = ", ".join(
+                    f"{phase} {duration:.3f}s"
+                    for phase, duration in phases.items()
+                    if phase != "total"
+                )
+                output += f"{page} {phases['total']:.3f}s: {breakdown}\n"
+        return output
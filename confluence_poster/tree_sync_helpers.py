@@ -0,0 +1,237 @@
+import os
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, List, Tuple
+from atlassian.errors import ApiError
+from requests.exceptions import HTTPError
+
+from confluence_poster.poster_config import AllowedFileFormat, slotted
+from confluence_poster.main_helpers import (
+    StateConfig,
+    PostedPage,
+    Report,
+    ReportEntry,
+    SkipReason,
+    check_last_updated_by,
+    get_page_url_from_response,
+)
+from confluence_poster.convert_utils import (
+    guess_file_format,
+    get_representation_for_format,
+    convert_markdown_with_engine,
+    convert_markdown_to_storage,
+)
+from confluence_poster.page_discovery_helpers import derive_page_title
+
+"""Procedures that mirror a directory tree of page files as a tree of pages"""
+
+# File with this name (and any known extension) holds the text of the page created for its directory
+INDEX_PAGE_STEM = "index"
+
+
+@slotted
+@dataclass
+class TreePage(PostedPage):
+    """Page that is a node in the mirrored tree"""
+
+    parent: Union["TreePage", None] = None
+    depth: int = 0
+
+
+def _page_file_entries(directory: Union[str, Path]) -> Tuple[list, list]:
+    """Returns page files and directories inside the directory, sorted by name. Hidden entries are skipped."""
+    files, directories = [], []
+    with os.scandir(directory) as it:
+        for entry in sorted(it, key=lambda _: _.name):
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                directories.append(entry)
+            elif entry.is_file():
+                try:
+                    guess_file_format(entry.name)
+                except ValueError:
+                    continue
+                files.append(entry)
+    return files, directories
+
+
+def build_page_tree(
+    directory: Union[str, Path], page_space: str
+) -> List[List[TreePage]]:
+    """Maps the directory tree onto pages.
+
+    Every page file becomes a page. Every subdirectory becomes a page with the text of its 'index' file (empty if
+    there is none), the files inside it become its children. The 'index' file of the directory itself is skipped,
+    the top level pages go under the root page of the tree.
+
+    :return pages grouped by depth: level 0 is the top of the tree, every level depends only on the previous one
+    """
+    levels: List[List[TreePage]] = []
+    titles = {}
+
+    def add_page(page: TreePage):
+        if (title := page.page_title) in titles:
+            raise ValueError(
+                f"Files {titles[title]} and {page.page_file or 'directory'} produce pages with the same title "
+                f"'{title}'"
+            )
+        titles[title] = page.page_file
+        if len(levels) <= page.depth:
+            levels.append([])
+        levels[page.depth].append(page)
+
+    def walk(files: list, directories: list, parent: Union[TreePage, None], depth: int):
+        for entry in files:
+            if Path(entry.name).stem == INDEX_PAGE_STEM:
+                continue  # the text of the parent page, there is none at the top level
+            add_page(
+                TreePage(
+                    page_title=derive_page_title(entry.path),
+                    page_file=entry.path,
+                    page_space=page_space,
+                    page_file_format=guess_file_format(entry.name),
+                    front_matter=True,
+                    parent=parent,
+                    depth=depth,
+                )
+            )
+        for entry in directories:
+            child_files, child_directories = _page_file_entries(entry.path)
+            index_file = next(
+                (_ for _ in child_files if Path(_.name).stem == INDEX_PAGE_STEM), None
+            )
+            page = TreePage(
+                page_title=entry.name,
+                page_file="",
+                page_space=page_space,
+                page_file_format=AllowedFileFormat.confluencewiki,
+                front_matter=True,
+                parent=parent,
+                depth=depth,
+            )
+            if index_file is not None:
+                # Index files share the name, the directory names the page unless the front matter does
+                page.page_title = derive_page_title(index_file.path, default=entry.name)
+                page.page_file = index_file.path
+                page.page_file_format = guess_file_format(index_file.name)
+            add_page(page)
+            walk(child_files, child_directories, page, depth + 1)
+
+    walk(*_page_file_entries(directory), parent=None, depth=0)
+    return levels
+
+
+def sync_page(
+    page: TreePage, root_parent_id: Union[int, None], state: StateConfig
+) -> Tuple[ReportEntry, Union[str, None]]:
+    """Creates or updates a single page of the tree.
+
+    :return entry for the report, reason if the page was not processed
+    """
+    confluence = state.confluence_instance
+    echo = state.print_function
+    page_key = f"{page.page_space}::{page.page_title}"
+    span = state.timings.span
+
+    if page.parent is None:
+        parent_id = root_parent_id
+    elif (parent_id := page.parent.page_id) is None:
+        return (
+            ReportEntry.from_page(page, "unprocessed"),
+            f"Parent page '{page.parent.page_title}' was not processed",
+        )
+
+    if page.page_file_format is AllowedFileFormat.markdown:
+        with span("markdown_conversion", page_key):
+            if page.storage_format:
+                page.page_text = convert_markdown_to_storage(page.page_text)
+            else:
+                page.page_text = convert_markdown_with_engine(
+                    page.page_text,
+                    engine=state.config.markdown_engine,
+                    workers=state.markdown_workers,
+                    cache=state.markdown_cache,
+                )
+    representation = get_representation_for_format(
+        page.page_file_format, page.storage_format
+    ).value
+
+    try:
+        with span("get_page_id", page_key):
+            page_id = confluence.get_page_id(
+                space=page.page_space, title=page.page_title
+            )
+        if page_id:
+            page.page_id = page_id
+            if not (state.force or page.force_overwrite):
+                updated_by_author, page_last_updated_by = check_last_updated_by(
+                    page_id=page_id,
+                    username_to_check=state.config.author,
+                    confluence_instance=confluence,
+                )
+                if not updated_by_author:
+                    # Children are still processed, the page itself exists
+                    return (
+                        ReportEntry.from_page(page, "unprocessed"),
+                        SkipReason(
+                            f"Last updated by {page_last_updated_by}, not {state.config.author}"
+                        ),
+                    )
+            with span("update_existing_page", page_key):
+                response = confluence.update_existing_page(
+                    page_id=page_id,
+                    title=page.page_title,
+                    body=page.page_text,
+                    representation=representation,
+                    minor_edit=state.minor_edit,
+                )
+            echo(f"Updated page #{page_id} '{page.page_title}'")
+            status = "updated"
+        else:
+            with span("create_page", page_key):
+                response = confluence.create_page(
+                    space=page.page_space,
+                    title=page.page_title,
+                    body=page.page_text,
+                    # parent id comes from the response for the previous level, no lookup needed
+                    parent_id=parent_id,
+                    representation=representation,
+                )
+            page.page_id = response["id"]
+            echo(f"Created page #{page.page_id} called '{page.page_title}'.")
+            status = "created"
+    except (ApiError, HTTPError) as e:
+        return ReportEntry.from_page(page, "unprocessed"), str(e)
+
+    return (
+        ReportEntry.from_page(
+            page, status, get_page_url_from_response(response, confluence)
+        ),
+        None,
+    )
+
+
+def sync_page_tree(
+    levels: List[List[TreePage]],
+    root_parent_id: Union[int, None],
+    state: StateConfig,
+    max_workers: int,
+) -> Report:
+    """Posts the tree one level at a time. Pages in the same level are posted concurrently."""
+    report = Report(
+        confluence_instance=state.confluence_instance,
+        request_stats=state.request_stats,
+        writer=state.report_writer,
+        progress=state.progress,
+        page_counts=state.page_counts,
+        keep_entries=state.print_report,
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level in levels:
+            for entry, reason in executor.map(
+                lambda _: sync_page(_, root_parent_id, state), level
+            ):
+                report.add(entry, reason)
+    return report
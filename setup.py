@@ -40,7 +40,11 @@ setup(
         "lxml",
         "marshmallow>=3.12.1",
     ],
-    extras_require={"docs": ["jinja2", "typer-cli"]},
+    extras_require={
+        "docs": ["jinja2", "typer-cli"],
+        "markdown-it": ["markdown-it-py"],
+        "mistune": ["mistune>=2"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Environment :: Console",
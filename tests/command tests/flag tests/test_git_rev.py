@@ -0,0 +1,104 @@
+import subprocess
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+from functools import partial
+
+from confluence_poster.main import app
+from utils import (
+    generate_run_cmd,
+    run_with_config,
+    get_page_id_from_stdout,
+    get_page_body,
+)
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner(mix_stderr=False)
+default_run_cmd = generate_run_cmd(runner=runner, app=app)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def commit_page_file(page_file: Path, text: str, monkeypatch):
+    """Commits the text of the page file to a new repository, and leaves another text in the working tree.
+    The revision is looked up in the repository of the current directory, like git does
+    """
+    repo = page_file.parent
+    monkeypatch.chdir(repo)
+    page_file.write_text(text)
+    for args in (
+        ["init", "-q"],
+        ["add", page_file.name],
+        ["-c", "user.name=pytest", "-c", "user.email=pytest@example.com"]
+        + ["commit", "-q", "-m", "Page"],
+    ):
+        subprocess.run(["git", "-C", str(repo), *args], check=True)
+    page_file.write_text("Not committed")
+
+
+def test_post_page_from_git_rev(make_one_page_config, monkeypatch):
+    config_file, config = make_one_page_config
+    commit_page_file(Path(config.pages[0].page_file), "h1. Committed", monkeypatch)
+
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--git-rev", "HEAD", "--force-create"],
+        other_args=["post-page", "--create-in-space-root"],
+    )
+    assert result.exit_code == 0
+    assert get_page_body(get_page_id_from_stdout(result.stdout)) == "<h1>Committed</h1>"
+
+
+def test_convert_markdown_from_git_rev(make_one_page_config, tmp_path, monkeypatch):
+    config_file, config = make_one_page_config
+    page_file = Path(config.pages[0].page_file)
+    commit_page_file(page_file, "# Committed", monkeypatch)
+
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--git-rev", "HEAD"],
+        other_args=["convert-markdown"],
+    )
+    assert result.exit_code == 0
+    assert result.stdout == "<h1>Committed</h1>\n"
+
+    # The output is not converted again while the blob is the same
+    output_dir = tmp_path / "output"
+    for skipped in (0, 1):
+        result = run_with_config(
+            config_file=config_file,
+            pre_args=["--git-rev", "HEAD"],
+            other_args=["convert-markdown", "--output-dir", str(output_dir)],
+        )
+        assert result.exit_code == 0
+        assert f"skipped {skipped} unchanged pages" in result.stderr
+    assert (output_dir / f"{page_file.stem}.html").read_text() == "<h1>Committed</h1>"
+
+
+def test_empty_page_file_at_git_rev(make_one_page_config, monkeypatch):
+    """An empty file in the revision is an empty page, not a reason to read the working tree"""
+    config_file, config = make_one_page_config
+    commit_page_file(Path(config.pages[0].page_file), "", monkeypatch)
+
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--git-rev", "HEAD", "--force-create"],
+        other_args=["post-page", "--create-in-space-root"],
+    )
+    assert result.exit_code == 0
+    assert get_page_body(get_page_id_from_stdout(result.stdout)) == ""
+
+
+@pytest.mark.parametrize(
+    "args,exit_code",
+    [
+        (["--git-rev", "no_such_revision", "post-page"], 1),
+        (["--git-rev", "HEAD", "validate"], 3),
+    ],
+    ids=["Unknown revision", "Other command"],
+)
+def test_git_rev_errors(make_one_page_config, args, exit_code, monkeypatch):
+    config_file, config = make_one_page_config
+    commit_page_file(Path(config.pages[0].page_file), "h1. Committed", monkeypatch)
+    result = run_with_config(config_file=config_file, pre_args=args)
+    assert result.exit_code == exit_code
@@ -46,7 +46,9 @@ def test_different_config(tmp_path, config_file):
         assert type(result.exception) is FileNotFoundError
 
 
-@pytest.mark.parametrize("param", ["page_title", "parent_page_title"])
+@pytest.mark.parametrize(
+    "param", ["page_title", "parent_page_title", "parent_page_path"]
+)
 def test_page_title_specified_two_pages(tmp_path, param):
     """For parameters that require that only one page is in config - make sure exception is raised if there are
     more pages in the config"""
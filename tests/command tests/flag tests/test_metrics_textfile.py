@@ -0,0 +1,34 @@
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+
+from confluence_poster.main import app
+from utils import generate_run_cmd, run_with_config, generate_local_config
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner()
+default_run_cmd = generate_run_cmd(
+    runner=runner, app=app, default_args=["--force-create", "post-page"]
+)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def test_metrics_textfile(tmp_path):
+    config_file, config = generate_local_config(tmp_path, pages=2)
+    textfile = tmp_path / "confluence_poster.prom"
+
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--metrics-textfile", str(textfile)],
+        other_args=["--create-in-space-root"],
+    )
+    assert result.exit_code == 0
+
+    metrics = textfile.read_text().splitlines()
+    assert 'confluence_poster_pages{command="post-page",status="created"} 2' in metrics
+    assert "# TYPE confluence_poster_phase_duration_seconds histogram" in metrics
+    assert any(
+        _.startswith('confluence_poster_api_requests{command="post-page",method="POST"')
+        for _ in metrics
+    )
@@ -0,0 +1,67 @@
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+from confluence_poster.main import app
+from utils import (
+    generate_run_cmd,
+    run_with_config,
+    fake_title_generator,
+    get_page_id_from_stdout,
+    confluence_instance,
+    mk_tmp_file,
+)
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner()
+default_run_cmd = generate_run_cmd(runner=runner, app=app, default_args=["post-page"])
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+@pytest.mark.parametrize(
+    "parent_page_path_source",
+    ["cmdline", "config"],
+    ids=lambda source: f"Post page with parent path provided from {source}",
+)
+def test_post_page_with_parent_path(setup_page, parent_page_path_source, tmp_path):
+    """Creates a chain of pages root page -> child -> grandchild, locating the parents by path"""
+    config_file, (root_id, root_title) = setup_page(1)
+    parent_id, parent_path = root_id, root_title
+    for _ in range(2):
+        page_title = next(fake_title_generator)
+        if parent_page_path_source == "cmdline":
+            pre_args = ["--parent-page-path", parent_path, "--page-title", page_title]
+            page_config = config_file
+        else:
+            pre_args = ["--page-title", page_title]
+            page_config = mk_tmp_file(
+                tmp_path,
+                config_to_clone=config_file,
+                key_to_update="pages.page1.page_parent_path",
+                value_to_update=parent_path,
+            )
+        result = run_with_config(
+            input="Y\n",  # create page
+            pre_args=pre_args,
+            config_file=page_config,
+        )
+        assert result.exit_code == 0
+        assert "Which page should the script look for?" not in result.stdout
+        assert f"with path '{parent_path}'" in result.stdout
+        page_id = get_page_id_from_stdout(result.stdout)
+        assert page_id in confluence_instance.get_child_id_list(parent_id)
+
+        parent_id, parent_path = page_id, f"{parent_path}/{page_title}"
+
+
+def test_post_page_parent_path_not_found(make_one_page_config):
+    config_file, _ = make_one_page_config
+    missing_path = f"{next(fake_title_generator)}/{next(fake_title_generator)}"
+    result = run_with_config(
+        input="Y\n",
+        pre_args=["--parent-page-path", missing_path],
+        config_file=config_file,
+    )
+    assert result.exit_code == 0
+    assert f"Provided page path '{missing_path}' not found" in result.stdout
+    assert get_page_id_from_stdout(result.stdout) is None
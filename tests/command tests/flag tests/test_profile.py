@@ -0,0 +1,59 @@
+import pstats
+import pytest
+from typer.testing import CliRunner
+
+from confluence_poster.main import app
+from utils import generate_run_cmd, mk_tmp_file
+
+pytestmark = pytest.mark.offline
+
+runner = CliRunner(mix_stderr=False)
+run_cmd = generate_run_cmd(runner=runner, app=app, default_args=["convert-markdown"])
+
+
+@pytest.fixture(scope="function")
+def markdown_config(tmp_path):
+    page_file = tmp_path / "page.md"
+    page_file.write_text("# Title\n* one\n* two")
+    config_file = mk_tmp_file(tmp_path, key_to_pop="pages.page2")
+    return mk_tmp_file(
+        tmp_path,
+        config_to_clone=config_file,
+        key_to_update="pages.page1.page_file",
+        value_to_update=str(page_file),
+    )
+
+
+@pytest.mark.parametrize("profiler", ["cprofile", "tracemalloc"])
+def test_profile_convert_markdown(tmp_path, markdown_config, profiler):
+    """Checks that the profile is written and the summary does not get into stdout"""
+    profile_file = tmp_path / "profile"
+    result = run_cmd(
+        config=markdown_config,
+        pre_args=["--profile", profiler, "--profile-output", str(profile_file)],
+    )
+    assert result.exit_code == 0
+    assert result.stdout == "<h1>Title</h1>\n<ul>\n<li>one</li>\n<li>two</li>\n</ul>\n"
+    assert f"Profile written to {profile_file}" in result.stderr
+    if profiler == "cprofile":
+        assert pstats.Stats(str(profile_file)).total_calls > 0
+    else:
+        assert profile_file.read_text()
+
+
+def test_profile_quiet(tmp_path, markdown_config):
+    """With --quiet only the profile file is written"""
+    profile_file = tmp_path / "profile"
+    result = run_cmd(
+        config=markdown_config,
+        pre_args=[
+            "--quiet",
+            "--profile",
+            "cprofile",
+            "--profile-output",
+            str(profile_file),
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Profile written" not in result.stderr
+    assert profile_file.exists()
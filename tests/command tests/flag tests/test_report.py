@@ -1,7 +1,7 @@
 import pytest
 from typer.testing import CliRunner
 from confluence_poster.main import app
-from confluence_poster.main import get_page_url
+from confluence_poster.main_helpers import get_page_url
 from utils import (
     generate_run_cmd,
     run_with_config,
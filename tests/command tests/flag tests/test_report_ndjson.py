@@ -0,0 +1,76 @@
+import json
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+
+from confluence_poster.main import app
+from utils import generate_run_cmd, run_with_config, generate_local_config
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner()
+default_run_cmd = generate_run_cmd(
+    runner=runner, app=app, default_args=["--force-create", "post-page"]
+)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def read_records(report_file) -> list:
+    return [json.loads(_) for _ in report_file.read_text().splitlines()]
+
+
+def test_ndjson_report(tmp_path):
+    """Checks that every page gets a record, followed by the summary"""
+    config_file, config = generate_local_config(tmp_path, pages=2)
+    report_file = tmp_path / "report.ndjson"
+    pre_args = ["--report-format", "ndjson", "--report-file", str(report_file)]
+
+    for status in ["created", "updated"]:
+        result = run_with_config(
+            config_file=config_file,
+            pre_args=pre_args,
+            other_args=["--create-in-space-root"],
+        )
+        assert result.exit_code == 0
+        assert "Created pages:" not in result.stdout, "Text report was not requested"
+
+        *pages, summary = read_records(report_file)
+        assert [_["title"] for _ in pages] == [_.page_title for _ in config.pages]
+        for record in pages:
+            assert record["type"] == "page"
+            assert record["status"] == status
+            assert record["page_id"] and record["url"]
+            assert record["body_bytes"] > 0
+            assert "get_page_id" in record["timings"]
+        assert summary["type"] == "summary"
+        assert summary[status] == 2
+        assert summary["requests"] > 0
+
+
+def test_ndjson_report_to_stdout(tmp_path, record_pages):
+    """Checks that without --report-file stdout holds only the records of the report"""
+    config_file, config = generate_local_config(tmp_path, pages=2)
+    result = generate_run_cmd(
+        runner=CliRunner(mix_stderr=False),
+        app=app,
+        default_args=["--report-format", "ndjson", "--force-create", "post-page"],
+    )(config=config_file, other_args=["--create-in-space-root"])
+    assert result.exit_code == 0
+
+    *pages, summary = [json.loads(_) for _ in result.stdout.splitlines()]
+    record_pages |= {_["page_id"] for _ in pages}
+    assert [_["title"] for _ in pages] == [_.page_title for _ in config.pages]
+    assert summary["type"] == "summary"
+    assert summary["created"] == 2
+    assert "Finished processing pages" in result.stderr
+
+
+@pytest.mark.parametrize("command", ["convert-markdown", "validate"])
+def test_ndjson_report_only_for_posting(make_one_page_config, command):
+    """The commands that do not post pages reject the ndjson report, it would be mixed with their output"""
+    config_file, _ = make_one_page_config
+    result = generate_run_cmd(runner=CliRunner(mix_stderr=False), app=app)(
+        config=config_file, pre_args=["--report-format", "ndjson"], other_args=[command]
+    )
+    assert result.exit_code == 3
+    assert result.stdout == ""
@@ -0,0 +1,69 @@
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+
+from confluence_poster.main import app
+from utils import (
+    generate_run_cmd,
+    run_with_config,
+    fake_title_generator,
+    get_pages_ids_from_stdout,
+    confluence_instance,
+)
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner()
+default_run_cmd = generate_run_cmd(runner=runner, app=app)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def test_post_scanned_pages(tmp_path, make_one_page_config, record_pages):
+    """Pages come from the front matter of the files in the directory, not from the config"""
+    config_file, config = make_one_page_config
+    space = config.pages[0].page_space
+    parent = next(fake_title_generator)
+    parent_id = confluence_instance.create_page(space, parent, "Parent")["id"]
+    record_pages.add(parent_id)
+    titles = [next(fake_title_generator) for _ in range(2)]
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "first.md").write_text(
+        f"---\ntitle: {titles[0]}\nparent: {parent}\n---\n# First"
+    )
+    (docs / "second.wiki").write_text(
+        f"---\ntitle: {titles[1]}\nparent: {parent}\nlabels: [docs, generated]\n---\nh1. Second"
+    )
+
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--scan", str(docs), "--force-create"],
+        other_args=["post-page"],
+    )
+    assert result.exit_code == 0
+    assert len(get_pages_ids_from_stdout(result.stdout)) == 2
+    assert config.pages[0].page_title not in result.stdout
+
+    for title in titles:
+        page_id = confluence_instance.get_page_id(space, title)
+        assert confluence_instance.get_parent_content_id(page_id) == parent_id
+    labels = confluence_instance.get_page_labels(page_id)["results"]
+    assert sorted(_["name"] for _ in labels) == ["docs", "generated"]
+
+
+def test_scan_no_pages(tmp_path, make_one_page_config):
+    config_file, _ = make_one_page_config
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--scan", str(tmp_path / "docs")],
+        other_args=["post-page"],
+    )
+    assert result.exit_code != 0
+
+    (tmp_path / "docs").mkdir()
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--scan", str(tmp_path / "docs")],
+        other_args=["post-page"],
+    )
+    assert result.exit_code == 1
@@ -0,0 +1,46 @@
+import json
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+
+from confluence_poster.main import app
+from utils import generate_run_cmd, run_with_config, generate_local_config
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner(mix_stderr=False)
+default_run_cmd = generate_run_cmd(runner=runner, app=app)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def test_post_shards(tmp_path):
+    """Every page is posted by exactly one of the shards, the reports of the shards are merged"""
+    config_file, config = generate_local_config(tmp_path, pages=6)
+    reports = []
+    for index in (1, 2, 3):
+        reports.append(tmp_path / f"report_{index}.ndjson")
+        result = run_with_config(
+            config_file=config_file,
+            pre_args=["--shard", f"{index}/3", "--force-create", "--report-format"]
+            + ["ndjson", "--report-file", str(reports[-1])],
+            other_args=["post-page", "--create-in-space-root"],
+        )
+        assert result.exit_code == 0
+
+    result = runner.invoke(app, ["merge-reports", *(str(_) for _ in reports)])
+    assert result.exit_code == 0
+    *pages, summary = [json.loads(_) for _ in result.stdout.splitlines()]
+    assert sorted(_["title"] for _ in pages) == sorted(
+        _.page_title for _ in config.pages
+    )
+    assert summary["created"] == 6
+    assert summary["shards"] == ["1/3", "2/3", "3/3"]
+
+
+@pytest.mark.parametrize("shard", ["3", "4/3"])
+def test_bad_shard(make_one_page_config, shard):
+    config_file, _ = make_one_page_config
+    result = run_with_config(
+        config_file=config_file, pre_args=["--shard", shard], other_args=["post-page"]
+    )
+    assert result.exit_code == 2
@@ -0,0 +1,106 @@
+import json
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+
+from confluence_poster.main import app
+from utils import (
+    generate_run_cmd,
+    run_with_config,
+    fake_title_generator,
+    get_page_body,
+    confluence_instance,
+    generate_local_config,
+)
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner(mix_stderr=False)
+default_run_cmd = generate_run_cmd(
+    runner=runner,
+    app=app,
+    default_args=["--page-file", "-", "--stdin-format", "ndjson"],
+)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def test_post_page_ndjson_stream(make_one_page_config, record_pages):
+    """Every record produces a result line, the broken ones do not stop the stream"""
+    config_file, config = make_one_page_config
+    parent, child = next(fake_title_generator), next(fake_title_generator)
+    lines = [
+        {"title": parent, "body": "# Parent"},
+        {"title": child, "parent": parent, "format": "html", "body": "<p>Child</p>"},
+        "not a record",
+        {"title": next(fake_title_generator), "parent": "No such page", "body": ""},
+    ]
+    stdin = "\n".join(_ if isinstance(_, str) else json.dumps(_) for _ in lines)
+
+    result = run_with_config(
+        config_file=config_file, other_args=["post-page"], input=stdin
+    )
+    assert result.exit_code == 0
+    records = [json.loads(_) for _ in result.stdout.splitlines()]
+    record_pages |= {_["page_id"] for _ in records if _["page_id"]}
+    assert [_["status"] for _ in records] == [
+        "created",
+        "created",
+        "unprocessed",
+        "unprocessed",
+    ]
+    assert records[2]["reason"].startswith("Line 3:")
+    assert "No such page" in records[3]["reason"]
+
+    space = config.pages[0].page_space
+    assert confluence_instance.get_parent_content_id(records[1]["page_id"]) == str(
+        confluence_instance.get_page_id(space, parent)
+    )
+    assert get_page_body(records[1]["page_id"]) == "<p>Child</p>"
+
+    # The same stream updates the pages
+    result = run_with_config(
+        config_file=config_file, other_args=["post-page"], input=stdin
+    )
+    assert result.exit_code == 0
+    statuses = [json.loads(_)["status"] for _ in result.stdout.splitlines()]
+    assert statuses[:2] == ["updated", "updated"]
+
+
+def test_post_page_ndjson_without_config_pages(tmp_path, record_pages):
+    """The config only provides the default space. Result records go to stdout with the report in a file"""
+    config_file, config = generate_local_config(tmp_path, pages=0)
+    assert not config.pages
+    report_file = tmp_path / "report.ndjson"
+    stdin = "\n".join(
+        json.dumps({"title": next(fake_title_generator), "body": "Text"})
+        for _ in range(2)
+    )
+
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--report-format", "ndjson", "--report-file", str(report_file)],
+        other_args=["post-page"],
+        input=stdin,
+    )
+    assert result.exit_code == 0
+    records = [json.loads(_) for _ in result.stdout.splitlines()]
+    record_pages |= {_["page_id"] for _ in records}
+    assert [_["status"] for _ in records] == ["created", "created"]
+    assert all(_["space"] == config.default_space for _ in records)
+
+    *pages, summary = [json.loads(_) for _ in report_file.read_text().splitlines()]
+    assert [_["page_id"] for _ in pages] == [_["page_id"] for _ in records]
+    assert summary["created"] == 2
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["convert-markdown"], ["--page-file", "other", "post-page"]],
+    ids=["Convert markdown", "Not stdin"],
+)
+def test_ndjson_only_for_post_page_from_stdin(make_one_page_config, args):
+    config_file, _ = make_one_page_config
+    result = runner.invoke(
+        app, ["--config", str(config_file), "--stdin-format", "ndjson", *args]
+    )
+    assert result.exit_code == 3
@@ -0,0 +1,90 @@
+import pytest
+from typer.testing import CliRunner
+from tomlkit import parse
+from pathlib import Path
+
+from confluence_poster.main import app
+from confluence_poster.poster_config import Config
+from utils import generate_run_cmd, mk_tmp_file
+
+pytestmark = pytest.mark.offline
+
+runner = CliRunner()
+run_cmd = generate_run_cmd(runner=runner, app=app, default_args=["add-pages"])
+
+
+@pytest.fixture(scope="function")
+def page_directory(tmp_path) -> Path:
+    docs = tmp_path / "docs"
+    (docs / "nested").mkdir(parents=True)
+    (docs / "first.md").write_text("# First")
+    (docs / "second.confluencewiki").write_text("h1. Second")
+    (docs / "front_matter.md").write_text("---\ntitle: Page from front matter\n---\n")
+    (docs / "not_a_page.docx").write_text("")
+    (docs / "nested" / "third.md").write_text("# Third")
+    return docs
+
+
+def get_pages(config_file) -> dict:
+    return {
+        name: page
+        for name, page in parse(Path(config_file).read_text())["pages"].items()
+        if name != "default"
+    }
+
+
+@pytest.mark.parametrize("recursive", [False, True])
+def test_add_pages(tmp_path, page_directory, recursive):
+    config_file = mk_tmp_file(tmp_path, key_to_pop="pages.page2")
+    other_args = [str(page_directory)] + (["--recursive"] if recursive else [])
+    result = run_cmd(config=config_file, other_args=other_args)
+
+    assert result.exit_code == 0
+    pages = get_pages(config_file)
+    titles = {_["page_title"] for _ in pages.values()}
+    expected_titles = {"first", "second", "Page from front matter"}
+    if recursive:
+        expected_titles.add("third")
+    assert expected_titles < titles
+    assert len(pages) == len(expected_titles) + 1
+    assert f"Added {len(expected_titles)} pages" in result.stdout
+    # Page numbers do not collide with the existing page
+    assert pages["page1"]["page_title"] == "Some page title"
+    # Resulting config is still valid, the front matter of the added pages is not posted
+    config = Config(config_file)
+    added_pages = [_ for _ in config.pages if _.page_title in expected_titles]
+    assert all(_.front_matter for _ in added_pages)
+    assert not any("title:" in _.page_text for _ in added_pages)
+
+
+def test_add_pages_skips_known(tmp_path, page_directory):
+    config_file = mk_tmp_file(
+        tmp_path,
+        key_to_update="pages.page2",
+        value_to_update={
+            "page_title": "first",
+            "page_file": "elsewhere.md",
+            "page_space": "DEFAULT_SPACE_KEY",
+        },
+    )
+    result = run_cmd(config=config_file, other_args=[str(page_directory)])
+    assert result.exit_code == 0
+    assert "Added 2 pages" in result.stdout, "Page with known title should be skipped"
+
+    original_text = Path(config_file).read_text()
+    result = run_cmd(config=config_file, other_args=[str(page_directory)])
+    assert result.exit_code == 0
+    assert "No new pages found" in result.stdout
+    assert Path(config_file).read_text() == original_text
+
+
+def test_add_pages_space(tmp_path, page_directory):
+    config_file = tmp_path / "new_config.toml"
+    result = run_cmd(
+        config=config_file,
+        other_args=[str(page_directory), "--page-space", "SPC"],
+    )
+    assert result.exit_code == 0
+    pages = get_pages(config_file)
+    assert len(pages) == 3
+    assert all(_["page_space"] == "SPC" for _ in pages.values())
@@ -51,7 +51,106 @@ def test_convert_online(make_one_page_config):
 
 
 def test_convert_multiple_pages(make_two_page_config):
+    """Every page is converted, the text of each page is preceded by its title"""
     config_file, config = make_two_page_config
+    for number, page in enumerate(config.pages):
+        Path(page.page_file).write_text(f"# Page {number}")
     result = run_with_config(config_file=config_file)
 
-    assert result.exit_code == 1
+    assert result.exit_code == 0
+    assert result.stdout == "".join(
+        f"<!-- {page.page_title} -->\n<h1>Page {number}</h1>\n"
+        for number, page in enumerate(config.pages)
+    )
+
+
+def test_convert_files(make_one_page_config, tmp_path):
+    config_file, config = make_one_page_config
+    files = [tmp_path / "one.md", tmp_path / "two.md"]
+    for file in files:
+        file.write_text(f"# {file.stem}")
+    result = run_with_config(
+        config_file=config_file, other_args=[str(_) for _ in files]
+    )
+
+    assert result.exit_code == 0
+    assert result.stdout == (
+        f"<!-- {files[0]} -->\n<h1>one</h1>\n<!-- {files[1]} -->\n<h1>two</h1>\n"
+    )
+
+
+def test_convert_online_cached(make_two_page_config, tmp_path):
+    """Repeated conversion of the same text does not make requests to Confluence"""
+    config_file, config = make_two_page_config
+    for page in config.pages:
+        Path(page.page_file).write_text("# Title\n* one\n* two")
+    metrics_file = tmp_path / "metrics.prom"
+    pre_args = [
+        "--markdown-cache-dir",
+        str(tmp_path / "cache"),
+        "--metrics-textfile",
+        str(metrics_file),
+    ]
+
+    for requests in (1, 0):
+        result = run_with_config(
+            config_file=config_file,
+            pre_args=pre_args,
+            other_args=["--use-confluence-converter"],
+        )
+        assert result.exit_code == 0
+        assert result.stdout.count("<h1>Title</h1> <ul> <li>one <li>two </ul> \n") == 2
+        converter_requests = sum(
+            int(line.rsplit(" ", 1)[1])
+            for line in metrics_file.read_text().splitlines()
+            if line.startswith("confluence_poster_api_requests{")
+            and "markdownxhtmlconverter" in line
+        )
+        # Both pages have the same text, it is sent once
+        assert converter_requests == requests
+
+
+def test_convert_to_storage_format(make_one_page_config):
+    config_file, config = make_one_page_config
+    Path(config.pages[0].page_file).write_text("# Title\n```\ncode\n```")
+
+    result = run_with_config(config_file=config_file, other_args=["--storage-format"])
+
+    assert result.exit_code == 0
+    assert result.stdout == (
+        "<h1>Title</h1>\n"
+        '<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[code]]>'
+        "</ac:plain-text-body></ac:structured-macro>\n"
+    )
+
+
+def test_convert_to_output_dir(make_two_page_config, tmp_path):
+    """Every page is written to its own file, unchanged pages are not converted again"""
+    config_file, config = make_two_page_config
+    output_dir = tmp_path / "output"
+    page_files = [Path(_.page_file) for _ in config.pages]
+    for number, page_file in enumerate(page_files):
+        page_file.write_text(f"# Page {number}")
+
+    def run() -> str:
+        result = run_with_config(
+            config_file=config_file,
+            other_args=["--output-dir", str(output_dir), "--workers", "2"],
+        )
+        assert result.exit_code == 0
+        assert result.stdout == ""
+        return result.stderr
+
+    assert "Converted 2 pages, skipped 0 unchanged pages." in run()
+    for number, page_file in enumerate(page_files):
+        assert (
+            output_dir / f"{page_file.stem}.html"
+        ).read_text() == f"<h1>Page {number}</h1>"
+
+    assert "Converted 0 pages, skipped 2 unchanged pages." in run()
+
+    page_files[1].write_text("# Changed page")
+    assert "Converted 1 pages, skipped 1 unchanged pages." in run()
+    assert (
+        output_dir / f"{page_files[1].stem}.html"
+    ).read_text() == "<h1>Changed page</h1>"
@@ -167,12 +167,14 @@ def test_post_single_page_with_parent(setup_page, parent_page_title_source, tmp_
 def test_render_ok(tmp_path, setup_page):
     """Test that is supposed ot check that the page rendered confluencewiki format successfully"""
     config_file, (page_id, page_title) = setup_page(1)
+    page_file = tmp_path / "page2.confluencewiki"
+    page_file.write_text("h1. Header\n\nSome text")
 
     config = mk_tmp_file(
         tmp_path,
         config_to_clone=real_confluence_config,
         key_to_update="pages.page1.page_file",
-        value_to_update="page2.confluencewiki",
+        value_to_update=str(page_file),
     )
     run_with_title(page_title, config_file=config)
     assert get_page_body(page_id) == "<h1>Header</h1>\n\n<p>Some text</p>"
@@ -0,0 +1,94 @@
+import pytest
+from typer.testing import CliRunner
+from functools import partial
+from confluence_poster.main import app
+from utils import (
+    generate_run_cmd,
+    run_with_config,
+    fake_title_generator,
+    get_pages_ids_from_stdout,
+    confluence_instance,
+)
+
+pytestmark = pytest.mark.online
+
+runner = CliRunner()
+default_run_cmd = generate_run_cmd(
+    runner=runner, app=app, default_args=["--report", "sync-tree"]
+)
+run_with_config = partial(run_with_config, default_run_cmd=default_run_cmd)
+
+
+def write_page(path, title: str, text: str = "Text"):
+    path.write_text(f"---\ntitle: {title}\n---\n{text}")
+
+
+def test_sync_tree(tmp_path, make_one_page_config):
+    config_file, config = make_one_page_config
+    docs = tmp_path / "docs"
+    (docs / "section").mkdir(parents=True)
+    titles = {
+        name: next(fake_title_generator)
+        for name in ("top", "section", "child", "other_child")
+    }
+    write_page(docs / "top.md", titles["top"])
+    write_page(docs / "section" / "index.md", titles["section"])
+    write_page(docs / "section" / "child.md", titles["child"])
+    write_page(docs / "section" / "other_child.confluencewiki", titles["other_child"])
+
+    result = run_with_config(config_file=config_file, other_args=[str(docs)])
+    assert result.exit_code == 0
+    assert len(get_pages_ids_from_stdout(result.stdout)) == 4
+
+    space = config.pages[0].page_space
+    section_id = confluence_instance.get_page_id(space, titles["section"])
+    for child in ("child", "other_child"):
+        child_id = confluence_instance.get_page_id(space, titles[child])
+        assert confluence_instance.get_parent_content_id(child_id) == section_id
+
+    # Second run updates the pages
+    write_page(docs / "section" / "child.md", titles["child"], text="Updated text")
+    result = run_with_config(config_file=config_file, other_args=[str(docs)])
+    assert result.exit_code == 0
+    assert len(get_pages_ids_from_stdout(result.stdout)) == 0
+    assert "Created pages:\nNone\nUpdated pages:" in result.stdout
+    child_id = confluence_instance.get_page_id(space, titles["child"])
+    assert (
+        "Updated text"
+        in confluence_instance.get_page_by_id(child_id, expand="body.storage")["body"][
+            "storage"
+        ]["value"]
+    )
+
+
+def test_sync_tree_no_root_page(tmp_path, make_one_page_config):
+    config_file, _ = make_one_page_config
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    result = run_with_config(
+        config_file=config_file,
+        other_args=[str(docs), "--root-page-title", next(fake_title_generator)],
+    )
+    assert result.exit_code == 1
+
+
+def test_sync_tree_storage_format(tmp_path, make_one_page_config):
+    """Markdown is posted as storage format, code blocks become the code macro"""
+    config_file, config = make_one_page_config
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    title = next(fake_title_generator)
+    write_page(docs / "page.md", title, text="```\ncode\n```")
+
+    result = run_with_config(
+        config_file=config_file, other_args=["--storage-format", str(docs)]
+    )
+    assert result.exit_code == 0
+
+    page_id = confluence_instance.get_page_id(config.pages[0].page_space, title)
+    assert (
+        '<ac:structured-macro ac:name="code">'
+        in confluence_instance.get_page_by_id(page_id, expand="body.storage")["body"][
+            "storage"
+        ]["value"]
+    )
@@ -2,6 +2,7 @@ from typer.testing import CliRunner
 import pytest
 from confluence_poster.main import app
 from confluence_poster.poster_config import Page, Config
+from confluence_poster.main_helpers import PostedPage
 from utils import (
     generate_run_cmd,
     generate_local_config,
@@ -220,3 +221,26 @@ def test_update_both_pages(make_two_pages, tmp_path):
         with open(page.page_file, "r") as f:
             page_content = f.read()
             assert page_content in get_page_body(page_id)
+
+
+def test_posted_page_texts_released(make_two_pages, monkeypatch):
+    """Checks that the pages do not keep their texts once they are posted"""
+    config_file, config = make_two_pages
+    posted_pages = []
+    from_page = PostedPage.from_page
+
+    def record_posted_page(page):
+        posted_page = from_page(page)
+        posted_pages.append(posted_page)
+        return posted_page
+
+    monkeypatch.setattr(PostedPage, "from_page", record_posted_page)
+    result = run_with_config(
+        config_file=config_file,
+        pre_args=["--force-create"],
+        other_args=["--create-in-space-root"],
+    )
+    assert result.exit_code == 0
+    assert result.stdout.count("Creating page") == 2
+    assert [_.page_title for _ in posted_pages] == [_.page_title for _ in config.pages]
+    assert all(_._page_text is None for _ in posted_pages)
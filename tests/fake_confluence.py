@@ -0,0 +1,572 @@
+"""In-memory stand-in for the Confluence REST API.
+
+Implements the subset of the API used by confluence_poster and its tests: content search, getting, creating,
+updating and removing pages, child pages, page history, attachments, space lookups and the tinymce markdown
+converter. Latency, jitter, injected errors and throttling are configurable to emulate a loaded instance.
+
+Usage:
+    with FakeConfluenceServer(spaces=("SPACE",), latency=0.05) as server:
+        Confluence(url=server.url, username="user", password="password")
+
+Or as a standalone server:
+    python tests/fake_confluence.py --port 8090 --space SPACE --latency 0.05
+"""
+
+import argparse
+import json
+import re
+from base64 import b64decode
+from collections import deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from random import Random
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from markdown import markdown
+
+
+class FakeApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super(FakeApiError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+def wiki_to_storage(text: str) -> str:
+    """Very rough conversion of confluencewiki markup: headers, bullet lists and paragraphs only"""
+    output = []
+    for line in text.strip().splitlines():
+        if header := re.fullmatch(r"h([1-6])\.\s+(.*)", line.strip()):
+            level, content = header.groups()
+            output.append(f"<h{level}>{escape(content)}</h{level}>")
+        elif item := re.fullmatch(r"\*\s+(.*)", line.strip()):
+            if output[-1:] == ["</ul>"]:
+                output.pop()
+            else:
+                output.append("<ul>")
+            output += [f"<li>{escape(item.group(1))}</li>", "</ul>"]
+        elif line.strip():
+            output.append(f"<p>{escape(line.strip())}</p>")
+        elif output[-1:] != [""]:
+            output.append("")
+    return "\n".join(output)
+
+
+def tinymce_convert(text: str) -> str:
+    """Mimics the tag soup returned by the converter built into Confluence"""
+    html = markdown(text, extensions=("tables", "fenced_code"))
+    return html.replace("</li>", "").replace("\n", " ") + " "
+
+
+class FakeConfluence:
+    """Storage and the request handling logic of the fake instance.
+
+    :param spaces: keys of the spaces that exist on the instance
+    :param latency: delay in seconds added to every request
+    :param jitter: random deviation in seconds from the latency
+    :param error_rate: share of the requests that fail with HTTP 500
+    :param rate_limit: maximum number of requests per second, requests above it get HTTP 429
+    :param seed: seed for the jitter and the error injection
+    """
+
+    def __init__(
+        self,
+        spaces: Iterable[str] = ("SPACE",),
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        rate_limit: Union[int, None] = None,
+        seed: Union[int, None] = None,
+    ):
+        self.spaces = {
+            key: {"id": number, "key": key} for number, key in enumerate(spaces, 1)
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.pages: Dict[int, dict] = {}
+        self.attachments: Dict[int, dict] = {}
+        self.request_count = 0
+        self._random = Random(seed)
+        self._ids = count(100001)
+        self._recent_requests = deque()
+        self._lock = Lock()
+        self._routes: List[Tuple[str, re.Pattern, Callable]] = [
+            ("GET", re.compile(r"/rest/api/content/?"), self.search_content),
+            ("POST", re.compile(r"/rest/api/content/?"), self.create_content),
+            ("GET", re.compile(r"/rest/api/content/(\d+)"), self.get_content),
+            ("PUT", re.compile(r"/rest/api/content/(\d+)"), self.update_content),
+            ("DELETE", re.compile(r"/rest/api/content/(\d+)"), self.remove_content),
+            ("GET", re.compile(r"/rest/api/content/(\d+)/history"), self.get_history),
+            (
+                "GET",
+                re.compile(r"/rest/api/content/(\d+)/child/page"),
+                self.get_children,
+            ),
+            (
+                "GET",
+                re.compile(r"/rest/api/content/(\d+)/child/attachment"),
+                self.get_attachments,
+            ),
+            (
+                "POST",
+                re.compile(r"/rest/api/content/(\d+)/child/attachment"),
+                self.create_attachment,
+            ),
+            (
+                "POST",
+                re.compile(r"/rest/api/content/(\d+)/child/attachment/(\d+)/data"),
+                self.update_attachment,
+            ),
+            ("GET", re.compile(r"/rest/api/content/(\d+)/label"), self.get_labels),
+            ("POST", re.compile(r"/rest/api/content/(\d+)/label"), self.add_labels),
+            ("GET", re.compile(r"/rest/api/space/([^/]+)"), self.get_space),
+            (
+                "GET",
+                re.compile(r"/rest/api/space/([^/]+)/content/page"),
+                self.get_space_pages,
+            ),
+            (
+                "POST",
+                re.compile(r"/rest/tinymce/1/markdownxhtmlconverter"),
+                self.convert_markdown,
+            ),
+        ]
+
+    def handle(
+        self, method: str, url: str, user: str, headers: dict, body: bytes
+    ) -> Tuple[int, Union[dict, str, None], dict]:
+        """Processes the request. Returns status, payload and extra headers for the response"""
+        self._delay()
+        with self._lock:
+            self.request_count += 1
+            if self.rate_limit is not None and self._throttled():
+                return (
+                    429,
+                    {"statusCode": 429, "message": "Rate limit exceeded"},
+                    {"Retry-After": "1"},
+                )
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 500, {"statusCode": 500, "message": "Injected error"}, {}
+
+            split_url = urlsplit(url)
+            params = dict(parse_qsl(split_url.query))
+            for route_method, pattern, handler in self._routes:
+                if route_method == method and (
+                    match := pattern.fullmatch(split_url.path)
+                ):
+                    try:
+                        status, payload = handler(
+                            *match.groups(),
+                            params=params,
+                            user=user,
+                            headers=headers,
+                            body=body,
+                        )
+                    except FakeApiError as e:
+                        return (
+                            e.status,
+                            {"statusCode": e.status, "message": e.message},
+                            {},
+                        )
+                    return status, payload, {}
+            return (
+                404,
+                {
+                    "statusCode": 404,
+                    "message": f"No route for {method} {split_url.path}",
+                },
+                {},
+            )
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            sleep(delay)
+
+    def _throttled(self) -> bool:
+        now = monotonic()
+        while self._recent_requests and now - self._recent_requests[0] > 1:
+            self._recent_requests.popleft()
+        if len(self._recent_requests) >= self.rate_limit:
+            return True
+        self._recent_requests.append(now)
+        return False
+
+    # Representation
+
+    def _page_json(self, page: dict) -> dict:
+        return {
+            "id": str(page["id"]),
+            "type": "page",
+            "status": "current",
+            "title": page["title"],
+            "space": {"key": page["space"]},
+            "version": {
+                "number": page["version"],
+                "minorEdit": page["minor_edit"],
+                "message": page["message"],
+                "by": self._user_json(page["updated_by"]),
+            },
+            "body": {"storage": {"value": page["body"], "representation": "storage"}},
+            "ancestors": [
+                {"id": str(_["id"]), "type": "page", "title": _["title"]}
+                for _ in self._ancestors(page)
+            ],
+            "_links": {"webui": f"/pages/viewpage.action?pageId={page['id']}"},
+        }
+
+    @staticmethod
+    def _user_json(user: str) -> dict:
+        return {"type": "known", "username": user, "email": user, "displayName": user}
+
+    @staticmethod
+    def _attachment_json(attachment: dict) -> dict:
+        return {
+            "id": str(attachment["id"]),
+            "type": "attachment",
+            "title": attachment["title"],
+            "version": {"number": attachment["version"]},
+            "metadata": {"mediaType": attachment["media_type"]},
+            "extensions": {"fileSize": len(attachment["data"])},
+            "_links": {
+                "download": f"/download/attachments/{attachment['page_id']}/{attachment['title']}"
+            },
+        }
+
+    def _ancestors(self, page: dict) -> List[dict]:
+        ancestors = []
+        while (parent := self.pages.get(page["parent_id"])) is not None:
+            ancestors.insert(0, parent)
+            page = parent
+        return ancestors
+
+    @staticmethod
+    def _paginate(items: list, params: dict, default_limit: int = 25) -> dict:
+        start = int(params.get("start", 0))
+        limit = int(params.get("limit", default_limit))
+        results = items[start : start + limit]
+        return {
+            "results": results,
+            "start": start,
+            "limit": limit,
+            "size": len(results),
+        }
+
+    def _find_page(self, page_id: str) -> dict:
+        if (page := self.pages.get(int(page_id))) is None:
+            raise FakeApiError(404, f"No content found with id: {page_id}")
+        return page
+
+    def _storage_body(self, body: dict) -> str:
+        if "wiki" in body:
+            return wiki_to_storage(body["wiki"]["value"])
+        for representation in ("storage", "editor"):
+            if representation in body:
+                return body[representation]["value"]
+        raise FakeApiError(400, "Unsupported body representation")
+
+    def _title_taken(
+        self, space: str, title: str, page_id: Union[int, None] = None
+    ) -> bool:
+        return any(
+            _["space"] == space and _["title"] == title and _["id"] != page_id
+            for _ in self.pages.values()
+        )
+
+    # Handlers. Each one returns status and payload
+
+    def search_content(self, params: dict, **kwargs):
+        pages = [
+            self._page_json(_)
+            for _ in self.pages.values()
+            if params.get("spaceKey") in (None, _["space"])
+            and params.get("title") in (None, _["title"])
+        ]
+        return 200, self._paginate(pages, params)
+
+    def create_content(self, body: bytes, user: str, **kwargs):
+        data = json.loads(body)
+        space = data.get("space", {}).get("key")
+        if space not in self.spaces:
+            raise FakeApiError(404, f"No space with key : {space}")
+        if self._title_taken(space, data["title"]):
+            raise FakeApiError(
+                400,
+                "A page with this title already exists: A page already exists with the title "
+                f"{data['title']} in the space with key {space}",
+            )
+        parent_id = None
+        if ancestors := data.get("ancestors"):
+            parent_id = int(self._find_page(ancestors[-1]["id"])["id"])
+        page = {
+            "id": next(self._ids),
+            "title": data["title"],
+            "space": space,
+            "body": self._storage_body(data["body"]),
+            "parent_id": parent_id,
+            "version": 1,
+            "minor_edit": False,
+            "message": "",
+            "created_by": user,
+            "updated_by": user,
+            "labels": [],
+        }
+        self.pages[page["id"]] = page
+        return 200, self._page_json(page)
+
+    def get_content(self, page_id: str, **kwargs):
+        return 200, self._page_json(self._find_page(page_id))
+
+    def update_content(self, page_id: str, body: bytes, user: str, **kwargs):
+        page = self._find_page(page_id)
+        data = json.loads(body)
+        version = data.get("version", {})
+        if version.get("number") != page["version"] + 1:
+            raise FakeApiError(
+                409,
+                f"Version must be incremented on update. Current version is: {page['version']}",
+            )
+        if self._title_taken(page["space"], data["title"], page["id"]):
+            raise FakeApiError(
+                400, f"A page with this title already exists: {data['title']}"
+            )
+        if "body" in data:
+            page["body"] = self._storage_body(data["body"])
+        if ancestors := data.get("ancestors"):
+            page["parent_id"] = int(self._find_page(ancestors[-1]["id"])["id"])
+        page.update(
+            title=data["title"],
+            version=version["number"],
+            minor_edit=version.get("minorEdit", False),
+            message=version.get("message", ""),
+            updated_by=user,
+        )
+        return 200, self._page_json(page)
+
+    def remove_content(self, page_id: str, **kwargs):
+        page = self.pages.pop(self._find_page(page_id)["id"])
+        for child in self.pages.values():
+            if child["parent_id"] == page["id"]:
+                child["parent_id"] = page["parent_id"]
+        return 204, None
+
+    def get_history(self, page_id: str, **kwargs):
+        page = self._find_page(page_id)
+        return 200, {
+            "latest": True,
+            "createdBy": self._user_json(page["created_by"]),
+            # Like on the real instances, the minor edit flag is not exposed in the history
+            "lastUpdated": {
+                "number": page["version"],
+                "message": page["message"],
+                "by": self._user_json(page["updated_by"]),
+            },
+        }
+
+    def get_children(self, page_id: str, params: dict, **kwargs):
+        parent_id = self._find_page(page_id)["id"]
+        children = [
+            self._page_json(_)
+            for _ in self.pages.values()
+            if _["parent_id"] == parent_id
+        ]
+        return 200, self._paginate(children, params)
+
+    def get_attachments(self, page_id: str, params: dict, **kwargs):
+        page_id = self._find_page(page_id)["id"]
+        attachments = [
+            self._attachment_json(_)
+            for _ in self.attachments.values()
+            if _["page_id"] == page_id and params.get("filename") in (None, _["title"])
+        ]
+        return 200, self._paginate(attachments, params, default_limit=50)
+
+    @staticmethod
+    def _read_upload(headers: dict, body: bytes) -> Tuple[str, str, bytes]:
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {headers.get('Content-Type', '')}\r\n\r\n".encode() + body
+        )
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                return (
+                    part.get_filename(),
+                    part.get_content_type(),
+                    part.get_payload(decode=True),
+                )
+        raise FakeApiError(400, "No file in the request")
+
+    def create_attachment(self, page_id: str, headers: dict, body: bytes, **kwargs):
+        page_id = self._find_page(page_id)["id"]
+        name, media_type, data = self._read_upload(headers, body)
+        if any(
+            _["page_id"] == page_id and _["title"] == name
+            for _ in self.attachments.values()
+        ):
+            raise FakeApiError(
+                400,
+                f"Cannot add a new attachment with same file name as an existing attachment: {name}",
+            )
+        attachment = {
+            "id": next(self._ids),
+            "page_id": page_id,
+            "title": name,
+            "media_type": media_type,
+            "data": data,
+            "version": 1,
+        }
+        self.attachments[attachment["id"]] = attachment
+        return 200, {"results": [self._attachment_json(attachment)], "size": 1}
+
+    def update_attachment(
+        self, page_id: str, attachment_id: str, headers: dict, body: bytes, **kwargs
+    ):
+        page_id = self._find_page(page_id)["id"]
+        if (
+            attachment := self.attachments.get(int(attachment_id))
+        ) is None or attachment["page_id"] != page_id:
+            raise FakeApiError(404, f"No attachment found with id: {attachment_id}")
+        _, attachment["media_type"], attachment["data"] = self._read_upload(
+            headers, body
+        )
+        attachment["version"] += 1
+        return 200, self._attachment_json(attachment)
+
+    def get_labels(self, page_id: str, params: dict, **kwargs):
+        labels = [
+            {"prefix": "global", "name": _, "id": _}
+            for _ in self._find_page(page_id)["labels"]
+        ]
+        return 200, self._paginate(labels, params, default_limit=200)
+
+    def add_labels(self, page_id: str, body: bytes, **kwargs):
+        page = self._find_page(page_id)
+        data = json.loads(body)
+        for label in data if isinstance(data, list) else [data]:
+            if label["name"] not in page["labels"]:
+                page["labels"].append(label["name"])
+        return self.get_labels(page_id, params={})
+
+    def get_space(self, space_key: str, **kwargs):
+        if (space := self.spaces.get(space_key)) is None:
+            raise FakeApiError(404, f"No space with key : {space_key}")
+        return 200, {**space, "name": space_key, "type": "global"}
+
+    def get_space_pages(self, space_key: str, params: dict, **kwargs):
+        if space_key not in self.spaces:
+            raise FakeApiError(404, f"No space with key : {space_key}")
+        pages = [
+            self._page_json(_)
+            for _ in self.pages.values()
+            if _["space"] == space_key
+            and (params.get("depth") != "root" or _["parent_id"] is None)
+        ]
+        return 200, self._paginate(pages, params)
+
+    def convert_markdown(self, body: bytes, **kwargs):
+        return 200, tinymce_convert(json.loads(body)["wiki"])
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so that the clients reuse connections like they do with a real instance
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without this every response waits for the delayed ACK
+    disable_nagle_algorithm = True
+
+    def _process(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        user = "anonymous"
+        if (auth := self.headers.get("Authorization", "")).startswith("Basic "):
+            user = b64decode(auth[len("Basic ") :]).decode().split(":", 1)[0]
+        status, payload, extra_headers = self.server.fake.handle(
+            self.command, self.path, user, dict(self.headers), body
+        )
+
+        if payload is None:
+            data, content_type = b"", "application/json"
+        elif isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain;charset=UTF-8"
+        else:
+            data, content_type = json.dumps(payload).encode(), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for header, value in extra_headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _process
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeConfluenceServer(ThreadingHTTPServer):
+    """HTTP server for FakeConfluence. Serves in a background thread when started.
+
+    Accepts the same keyword arguments as FakeConfluence, exposes it as .fake"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **kwargs):
+        super(FakeConfluenceServer, self).__init__((host, port), _RequestHandler)
+        self.fake = FakeConfluence(**kwargs)
+        self._thread: Union[Thread, None] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeConfluenceServer":
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--space", action="append", help="Space key, may be repeated")
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeConfluenceServer(
+        host=args.host,
+        port=args.port,
+        spaces=args.space or ("SPACE",),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    print(f"Serving fake Confluence on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,87 @@
+import os
+import pytest
+
+from confluence_poster.tree_sync_helpers import build_page_tree
+from confluence_poster.poster_config import AllowedFileFormat
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture(scope="function")
+def page_tree(tmp_path):
+    """Creates the following tree:
+
+    docs
+    ├── index.md (skipped, there is no directory page to be the text of)
+    ├── page.md
+    ├── empty_section
+    │   └── child.confluencewiki
+    ├── plain_section
+    │   └── index.md (no front matter)
+    └── section
+        ├── index.md (title: Section title)
+        ├── .hidden.md
+        ├── attachment.docx
+        └── subsection
+            └── grandchild.md
+    """
+    docs = tmp_path / "docs"
+    (docs / "empty_section").mkdir(parents=True)
+    (docs / "section" / "subsection").mkdir(parents=True)
+    (docs / "plain_section").mkdir()
+    (docs / "index.md").write_text("# Index")
+    (docs / "page.md").write_text("# Page")
+    (docs / "empty_section" / "child.confluencewiki").write_text("h1. Child")
+    (docs / "plain_section" / "index.md").write_text("# Plain section")
+    (docs / "section" / "index.md").write_text("---\ntitle: Section title\n---\n")
+    (docs / "section" / ".hidden.md").write_text("# Hidden")
+    (docs / "section" / "attachment.docx").write_text("")
+    (docs / "section" / "subsection" / "grandchild.md").write_text("# Grandchild")
+    return docs
+
+
+def test_build_page_tree(page_tree):
+    levels = build_page_tree(page_tree, page_space="LOC")
+    titles = [[_.page_title for _ in level] for level in levels]
+    assert titles == [
+        ["page", "empty_section", "plain_section", "Section title"],
+        ["child", "subsection"],
+        ["grandchild"],
+    ]
+    pages = {_.page_title: _ for level in levels for _ in level}
+    assert all(_.page_space == "LOC" for _ in pages.values())
+    assert pages["page"].parent is None
+    assert pages["child"].parent is pages["empty_section"]
+    assert pages["grandchild"].parent is pages["subsection"]
+    assert pages["subsection"].parent is pages["Section title"]
+    assert pages["grandchild"].depth == 2
+
+    # Directory without index file is an empty page
+    assert pages["empty_section"].page_text == ""
+    assert pages["empty_section"].page_file_format is AllowedFileFormat.confluencewiki
+    assert pages["Section title"].page_file_format is AllowedFileFormat.markdown
+    assert pages["child"].page_file_format is AllowedFileFormat.confluencewiki
+    assert pages["page"].page_text == "# Page"
+    assert pages["plain_section"].page_text == "# Plain section"
+
+
+def test_build_page_tree_duplicate_titles(page_tree):
+    (page_tree / "section" / "page.md").write_text("# Same title as top level page")
+    with pytest.raises(ValueError):
+        build_page_tree(page_tree, page_space="LOC")
+
+
+def test_build_page_tree_scans_once(page_tree, monkeypatch):
+    """Every directory is listed once"""
+    scanned = []
+    scandir = os.scandir
+
+    def record_scandir(path):
+        scanned.append(str(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", record_scandir)
+    build_page_tree(page_tree, page_space="LOC")
+    assert sorted(scanned) == sorted(
+        {str(page_tree), *(str(_) for _ in page_tree.rglob("*") if _.is_dir())}
+    )
@@ -1,4 +1,9 @@
-from confluence_poster.poster_config import Config, Page, PartialConfig
+from confluence_poster.poster_config import (
+    Config,
+    Page,
+    PartialConfig,
+    MarkdownEngine,
+)
 from dataclasses import fields
 from utils import mk_tmp_file
 import toml
@@ -124,7 +129,11 @@ def test_page_section_not_dict(tmp_path):
 
 def test_page_definition_not_str(tmp_path):
     """Defines each field one by one as a non-str and tests that exception is thrown"""
-    for page_def in [_.name for _ in fields(Page) if _.name != "force_overwrite"]:
+    for page_def in [
+        _.name
+        for _ in fields(Page)
+        if _.name not in {"force_overwrite", "storage_format", "front_matter"}
+    ]:
         config_file = mk_tmp_file(
             tmp_path, key_to_update=f"pages.page1.{page_def}", value_to_update=1
         )
@@ -214,6 +223,47 @@ def test_page_parent_specified(tmp_path):
     assert config.pages[0].parent_page_title == parent_title
 
 
+def test_page_parent_path_specified(tmp_path):
+    """Tests that the path to the page parent is applied from the config file"""
+    parent_path = "Team/Runbooks/Parent title"
+    config_file = mk_tmp_file(
+        tmp_path,
+        key_to_update="pages.page1.page_parent_path",
+        value_to_update=parent_path,
+    )
+    config = Config(config_file)
+    assert config.pages[0].parent_page_path == parent_path
+    assert config.pages[1].parent_page_path is None
+
+
+def test_markdown_engine_specified(tmp_path):
+    """Tests that the markdown engine is applied globally and overridden per page"""
+    config = Config(mk_tmp_file(tmp_path))
+    assert config.markdown_engine is MarkdownEngine.python_markdown
+    assert config.pages[0].markdown_engine is None
+
+    config_file = mk_tmp_file(
+        tmp_path, key_to_update="markdown_engine", value_to_update="mistune"
+    )
+    assert Config(config_file).markdown_engine is MarkdownEngine.mistune
+
+    config_file = mk_tmp_file(
+        tmp_path,
+        key_to_update="pages.page1.markdown_engine",
+        value_to_update="markdown-it",
+    )
+    assert Config(config_file).pages[0].markdown_engine is MarkdownEngine.markdown_it
+
+
+@pytest.mark.parametrize(
+    "key", ["markdown_engine", "pages.page1.markdown_engine"], ids=["Global", "Page"]
+)
+def test_unknown_markdown_engine(tmp_path, key):
+    config_file = mk_tmp_file(tmp_path, key_to_update=key, value_to_update="unknown")
+    with pytest.raises(ValueError):
+        _ = Config(config_file)
+
+
 @pytest.mark.parametrize(
     "page_1_title,page_1_space,page_2_title,page_2_space,result",
     [
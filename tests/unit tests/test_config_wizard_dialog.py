@@ -1,7 +1,7 @@
 from confluence_poster.config_wizard import config_dialog, DialogParameter
 from pathlib import Path
 from typer.testing import CliRunner
-from tomlkit import parse
+from tomlkit import parse, dumps
 import pytest
 from itertools import product
 from utils import setup_input
@@ -201,9 +201,13 @@ def test_config_file_printing(prepare_config_file):
     tested_path = "parent.parent_update_node"
 
     original_value = get_attribute_by_path(tested_path, parse(config_text))
+    config_document = parse(config_text)
     assert original_value not in print_config_with_hidden_attrs(
-        parse(config_text), [tested_path]
+        config_document, [tested_path, "nonexistent.path", "update_node"]
     )
+    assert (
+        dumps(config_document) == config_text
+    ), "Printing the config should not change it"
 
 
 def test_incremental_config_dialog(prepare_config_file, monkeypatch, capsys):
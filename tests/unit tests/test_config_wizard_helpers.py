@@ -1,4 +1,4 @@
-from tomlkit import parse
+from tomlkit import parse, dumps
 import io
 from pathlib import Path
 
@@ -101,12 +101,14 @@ def test_create_or_update_attribute(mode):
     elif where == "child":
         attribute_path = "parent.child." + attribute_path
 
+    config = parse(document)
     updated_config = create_update_attr(
-        attribute=attribute_path, value=value, config=source_config
+        attribute=attribute_path, value=value, config=config
     )
     assert (
-        updated_config != source_config
-    ), "This function should not change the original content"
+        updated_config is config
+    ), "This function should edit the document in place, without copying it"
+    assert updated_config != source_config
     assert (
         get_attribute_by_path(attribute_path=attribute_path, config=updated_config)
         == value
@@ -120,6 +122,9 @@ def test_create_or_update_attribute(mode):
         checked_attributes = get_filled_attributes(source_config) + (attribute_path,)
 
     assert set(checked_attributes) == set(get_filled_attributes(updated_config))
+    assert (
+        parse(dumps(updated_config)) == updated_config
+    ), "Edited document should be valid"
 
 
 def test_get_filled_attributes():
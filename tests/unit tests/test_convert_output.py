@@ -0,0 +1,37 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from confluence_poster.convert_output_helpers import (
+    ConversionJob,
+    convert_to_directory,
+)
+
+pytestmark = pytest.mark.offline
+
+
+def test_converter_change_converts_again(tmp_path):
+    with ThreadPoolExecutor() as executor:
+        written, skipped = convert_to_directory(
+            [ConversionJob("docs/page.md", "text", str.upper, "upper")],
+            tmp_path,
+            executor,
+        )
+        assert (written, skipped) == ([tmp_path / "page.html"], [])
+        assert (tmp_path / "page.html").read_text() == "TEXT"
+
+        written, skipped = convert_to_directory(
+            [ConversionJob("docs/page.md", "text", str.title, "title")],
+            tmp_path,
+            executor,
+        )
+        assert (written, skipped) == ([tmp_path / "page.html"], [])
+        assert (tmp_path / "page.html").read_text() == "Text"
+
+
+def test_same_output_names(tmp_path):
+    jobs = [
+        ConversionJob(page_file, "text", str.upper, "upper")
+        for page_file in ("one/page.md", "two/page.md")
+    ]
+    with pytest.raises(ValueError) as e:
+        convert_to_directory(jobs, tmp_path, ThreadPoolExecutor())
+    assert "page.html" in e.value.args[0]
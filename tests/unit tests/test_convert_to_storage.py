@@ -0,0 +1,62 @@
+import pytest
+import xml.etree.ElementTree as etree
+from confluence_poster.convert_utils import convert_markdown_to_storage
+
+pytestmark = pytest.mark.offline
+
+
+def parse_storage(storage: str) -> etree.Element:
+    """Storage format is XHTML with namespaced macros, the namespaces are declared to parse it"""
+    return etree.fromstring(
+        '<root xmlns:ac="http://atlassian.com/content" xmlns:ri="http://atlassian.com/resource/identifier">'
+        f"{storage}</root>"
+    )
+
+
+def test_fenced_code_macro():
+    storage = convert_markdown_to_storage(
+        "# Title\n\n```python\nif a < b and c]]>d:\n    pass\n```\n"
+    )
+    parse_storage(storage)
+    assert storage == (
+        "<h1>Title</h1>\n"
+        '<ac:structured-macro ac:name="code">'
+        '<ac:parameter ac:name="language">python</ac:parameter>'
+        "<ac:plain-text-body><![CDATA[if a < b and c]]]]><![CDATA[>d:\n    pass]]>"
+        "</ac:plain-text-body></ac:structured-macro>"
+    )
+
+
+def test_indented_code_macro():
+    storage = convert_markdown_to_storage("Text\n\n    x < y &amp;\n")
+    parse_storage(storage)
+    assert (
+        '<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[x < y &amp;]]>'
+        in storage
+    )
+    assert "<pre>" not in storage
+
+
+def test_images():
+    storage = convert_markdown_to_storage(
+        '![Local](images/pic.png "Title") ![Remote](https://example.com/pic.png)'
+    )
+    parse_storage(storage)
+    assert (
+        '<ac:image ac:alt="Local" ac:title="Title"><ri:attachment ri:filename="pic.png">'
+        in storage
+    )
+    assert (
+        '<ac:image ac:alt="Remote"><ri:url ri:value="https://example.com/pic.png">'
+        in storage
+    )
+
+
+def test_table():
+    storage = convert_markdown_to_storage("| a | b |\n|---|:-:|\n| 1 | 2 |")
+    table = parse_storage(storage).find("table")
+    assert table.find("thead") is None
+    rows = table.findall("tbody/tr")
+    assert [_.tag for _ in rows[0]] == ["th", "th"]
+    assert [_.text for _ in rows[1]] == ["1", "2"]
+    assert rows[1][1].get("style") == "text-align: center;"
@@ -0,0 +1,72 @@
+import json
+import pytest
+
+from confluence_poster.page_discovery_helpers import (
+    SCAN_CACHE_NAME,
+    FrontMatterCache,
+    discover_pages,
+)
+from confluence_poster.poster_config import AllowedFileFormat
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture(scope="function")
+def page_directory(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "nested").mkdir(parents=True)
+    (docs / "plain.md").write_text("# Plain")
+    (docs / "nested" / "full.text").write_text(
+        "---\ntitle: Full\nspace: OTHER\nparent: Parent\nparent_path: Team/Docs\n"
+        "labels: [one, two]\nformat: confluencewiki\n---\nh1. Full"
+    )
+    return docs
+
+
+def test_discover_pages(page_directory):
+    full, plain = discover_pages(page_directory, "DEFAULT")
+    assert (plain.page_title, plain.page_space) == ("plain", "DEFAULT")
+    assert plain.page_file_format is AllowedFileFormat.markdown
+    assert plain.labels is None
+
+    assert (full.page_title, full.page_space) == ("Full", "OTHER")
+    assert full.parent_page_title == "Parent"
+    assert full.parent_page_path == "Team/Docs"
+    assert full.labels == ["one", "two"]
+    assert full.page_file_format is AllowedFileFormat.confluencewiki
+    assert full.page_text == "h1. Full"
+
+
+@pytest.mark.parametrize(
+    "header,default_space",
+    [("title: plain", "DEFAULT"), ("format: docx", "DEFAULT"), ("title: Page", None)],
+    ids=["Same title", "Unknown format", "No space"],
+)
+def test_discover_pages_errors(page_directory, header, default_space):
+    (page_directory / "other.md").write_text(f"---\n{header}\n---\n")
+    with pytest.raises(ValueError):
+        discover_pages(page_directory, default_space)
+
+
+def test_front_matter_cache(page_directory, monkeypatch):
+    """Only the files that changed since the previous scan are read, removed files leave the cache"""
+    discover_pages(page_directory, "DEFAULT")
+    cache_file = page_directory / SCAN_CACHE_NAME
+    assert set(json.loads(cache_file.read_text())) == {"plain.md", "nested/full.text"}
+
+    cache = FrontMatterCache(cache_file)
+    for page_file in (page_directory / "plain.md", page_directory / "nested/full.text"):
+        cache.read(page_file, page_file.relative_to(page_directory).as_posix())
+    assert (cache.hits, cache.misses) == (2, 0)
+
+    (page_directory / "plain.md").write_text("---\ntitle: Renamed page\n---\n")
+    (page_directory / "nested" / "full.text").unlink()
+    read_files = []
+    monkeypatch.setattr(
+        "confluence_poster.page_discovery_helpers.read_front_matter",
+        lambda _: read_files.append(_.name) or {"title": "Renamed page"},
+    )
+    (page,) = discover_pages(page_directory, "DEFAULT")
+    assert page.page_title == "Renamed page"
+    assert read_files == ["plain.md"]
+    assert set(json.loads(cache_file.read_text())) == {"plain.md"}
@@ -0,0 +1,36 @@
+import pytest
+from atlassian import Confluence
+from requests import HTTPError
+
+from fake_confluence import FakeConfluence, FakeConfluenceServer
+
+pytestmark = pytest.mark.offline
+
+
+def test_error_injection():
+    """Checks that the injected errors reach the client"""
+    with FakeConfluenceServer(spaces=("LOC",), error_rate=1) as server:
+        confluence = Confluence(url=server.url, username="user", password="password")
+        with pytest.raises(HTTPError) as e:
+            confluence.get_space("LOC")
+        assert e.value.response.status_code == 500
+
+
+def test_throttling():
+    """Requests above the rate limit get HTTP 429"""
+    fake = FakeConfluence(spaces=("LOC",), rate_limit=2)
+    statuses = [
+        fake.handle("GET", "/rest/api/space/LOC", "user", {}, b"")[0] for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_last_updated_by():
+    """The version of the page records the authenticated user"""
+    fake = FakeConfluence(spaces=("LOC",))
+    body = b'{"title": "Page", "space": {"key": "LOC"}, "body": {"storage": {"value": ""}}}'
+    status, page, _ = fake.handle("POST", "/rest/api/content/", "user", {}, body)
+    assert status == 200
+    assert page["version"]["by"]["username"] == "user"
+    status, _, _ = fake.handle("POST", "/rest/api/content/", "user", {}, body)
+    assert status == 400, "Pages with the same title in the same space are not allowed"
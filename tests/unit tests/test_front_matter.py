@@ -0,0 +1,69 @@
+import pytest
+
+from confluence_poster.front_matter_helpers import (
+    split_front_matter,
+    read_front_matter,
+)
+from confluence_poster.poster_config import Page
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.mark.parametrize(
+    "text,metadata,body",
+    [
+        ("# Title\n", {}, "# Title\n"),
+        ("---\ntitle: Page\n---\nBody", {"title": "Page"}, "Body"),
+        (
+            "---\ntitle: 'Quoted: title'\n# comment\n\nlabels: [one, \"two\"]\n---\nBody",
+            {"title": "Quoted: title", "labels": ["one", "two"]},
+            "Body",
+        ),
+        (
+            "---\nNot a key value line\n---\nBody",
+            {},
+            "---\nNot a key value line\n---\nBody",
+        ),
+        ("---\ntitle: Page\nBody", {}, "---\ntitle: Page\nBody"),
+        ("----\ntitle: Page\n----\nBody", {}, "----\ntitle: Page\n----\nBody"),
+    ],
+    ids=[
+        "No front matter",
+        "Simple front matter",
+        "Quotes, comments, empty lines and lists",
+        "Header is not a front matter",
+        "Front matter is not closed",
+        "Confluencewiki horizontal line is not a delimiter",
+    ],
+)
+def test_split_front_matter(tmp_path, text, metadata, body):
+    assert split_front_matter(text) == (metadata, body)
+    page_file = tmp_path / "page.md"
+    page_file.write_text(text)
+    assert read_front_matter(page_file) == metadata
+
+
+def test_read_front_matter_reads_only_header(tmp_path):
+    page_file = tmp_path / "page.md"
+    # Body is not valid utf-8, reading it would not fail, but it should not be touched at all
+    page_file.write_bytes(b"---\ntitle: Page\n---\n" + b"\xff" * 1024)
+    assert read_front_matter(page_file) == {"title": "Page"}
+
+
+@pytest.mark.parametrize(
+    "front_matter,page_text",
+    [(True, "# Body"), (False, "---\nNote: kept\n---\n# Body")],
+    ids=["Page with front matter", "Page file posted as it is"],
+)
+def test_page_text_without_front_matter(tmp_path, front_matter, page_text):
+    """Only the pages that are known to have a front matter lose the header, e.g. a note between two
+    horizontal rules is kept"""
+    page_file = tmp_path / "page.md"
+    page_file.write_text("---\nNote: kept\n---\n# Body")
+    p = Page(
+        page_title="Page",
+        page_file=str(page_file),
+        page_space="LOC",
+        front_matter=front_matter,
+    )
+    assert p.page_text == page_text
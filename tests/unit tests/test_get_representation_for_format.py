@@ -32,3 +32,14 @@ def test_get_representation_for_format(file_format, representation, exception):
             get_representation_for_format(file_format)
     else:
         assert get_representation_for_format(file_format) == representation
+
+
+def test_storage_representation():
+    assert (
+        get_representation_for_format(AllowedFileFormat.markdown, storage_format=True)
+        == Representation.storage
+    )
+    assert (
+        get_representation_for_format(AllowedFileFormat.html, storage_format=True)
+        == Representation.editor
+    )
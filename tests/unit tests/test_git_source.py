@@ -0,0 +1,66 @@
+import subprocess
+import pytest
+
+from confluence_poster.git_source_helpers import GitSource
+
+pytestmark = pytest.mark.offline
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture(scope="function")
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.name", "pytest")
+    git(tmp_path, "config", "user.email", "pytest@example.com")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "page.md").write_text("---\ntitle: Page\n---\n# First")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "First")
+    git(tmp_path, "tag", "first")
+    (tmp_path / "docs" / "page.md").write_text("# Second")
+    (tmp_path / "docs" / "binary.md").write_bytes(b"\n\x00" * 10)
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "Second")
+    (tmp_path / "docs" / "page.md").write_text("# Not committed")
+    return tmp_path
+
+
+def test_read_page_from_revision(repo):
+    page_file = repo / "docs" / "page.md"
+    source = GitSource("first", repo)
+    object_id, text = source.read_page(page_file, front_matter=True)
+    assert text == "# First"
+    assert source.read_page(page_file)[1] == "---\ntitle: Page\n---\n# First"
+    assert object_id == git(repo, "rev-parse", "first:docs/page.md")
+
+    head = GitSource("HEAD", repo)
+    assert head.read_page(page_file)[1] == "# Second"
+    # The same process serves all the requests
+    assert head.read_blob(repo / "docs" / "binary.md")[1] == b"\n\x00" * 10
+    assert head.read_page(page_file)[1] == "# Second"
+    source.close()
+    head.close()
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["docs/binary.md", "docs", "../outside.md"],
+    ids=["Missing", "Tree", "Outside"],
+)
+def test_read_missing_page(repo, path):
+    source = GitSource("first", repo)
+    with pytest.raises(FileNotFoundError):
+        source.read_page(repo / path)
+    source.close()
+
+
+def test_unknown_revision(repo, tmp_path_factory):
+    with pytest.raises(ValueError):
+        GitSource("no_such_revision", repo)
+    with pytest.raises(ValueError):
+        GitSource("HEAD", tmp_path_factory.mktemp("not_a_repo"))
@@ -0,0 +1,46 @@
+import pytest
+from confluence_poster.convert_utils import convert_using_markdown_lib
+from confluence_poster.markdown_cache_helpers import MarkdownCache
+
+pytestmark = pytest.mark.offline
+
+section = """# Section {number}
+
+Text of section {number} with a [link][ref{number}].
+
+```
+# Not a heading
+```
+
+[ref{number}]: https://example.com/{number}
+"""
+document = "\n".join(section.format(number=_) for _ in range(10))
+
+
+def test_cached_conversion(tmp_path):
+    cache = MarkdownCache(tmp_path)
+    expected = convert_using_markdown_lib(document)
+    assert convert_using_markdown_lib(document, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (0, 10)
+
+    assert convert_using_markdown_lib(document, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (10, 10)
+
+
+@pytest.mark.parametrize(
+    "old,new",
+    [
+        ("Text of section 3 ", "Changed text of section 3 "),
+        ("https://example.com/3", "https://example.org/3"),
+    ],
+    ids=["Changed text", "Changed reference definition"],
+)
+def test_only_changed_section_converted(tmp_path, old, new):
+    cache = MarkdownCache(tmp_path)
+    convert_using_markdown_lib(document, cache=cache)
+
+    changed = document.replace(old, new)
+    assert convert_using_markdown_lib(
+        changed, cache=cache
+    ) == convert_using_markdown_lib(changed)
+    assert (cache.hits, cache.misses) == (9, 11)
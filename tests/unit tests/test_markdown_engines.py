@@ -0,0 +1,38 @@
+import re
+import pytest
+from confluence_poster.convert_utils import convert_markdown_with_engine
+from confluence_poster.poster_config import MarkdownEngine
+
+pytestmark = pytest.mark.offline
+
+md_text = (
+    "# Title\n\n* One\n* Two\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\n```python\ncode\n```"
+)
+engine_packages = {
+    MarkdownEngine.python_markdown: "markdown",
+    MarkdownEngine.markdown_it: "markdown_it",
+    MarkdownEngine.mistune: "mistune",
+}
+
+
+@pytest.mark.parametrize("engine", list(MarkdownEngine), ids=lambda _: _.value)
+def test_engines_render_same_html(engine):
+    pytest.importorskip(engine_packages[engine])
+    html = convert_markdown_with_engine(md_text, engine=engine)
+    # Engines differ only in whitespace between the tags
+    assert re.sub(r">\s+", ">", html).strip() == (
+        "<h1>Title</h1><ul><li>One</li><li>Two</li></ul>"
+        "<table><thead><tr><th>a</th><th>b</th></tr></thead>"
+        "<tbody><tr><td>1</td><td>2</td></tr></tbody></table>"
+        '<pre><code class="language-python">code\n</code></pre>'
+    )
+
+
+def test_engine_not_installed(monkeypatch):
+    import sys
+
+    # None in sys.modules makes the import fail
+    monkeypatch.setitem(sys.modules, "mistune", None)
+    with pytest.raises(ValueError) as e:
+        convert_markdown_with_engine(md_text, engine=MarkdownEngine.mistune)
+    assert "confluence_poster[mistune]" in e.value.args[0]
@@ -0,0 +1,72 @@
+import pytest
+from collections import Counter
+
+from confluence_poster.main_helpers import Report, ReportEntry, SkipReason
+from confluence_poster.metrics_helpers import format_metrics, write_metrics_textfile
+from confluence_poster.request_stats_helpers import RequestRecord, RequestStats
+from confluence_poster.timing_helpers import Timings
+
+pytestmark = pytest.mark.offline
+
+
+def test_format_metrics():
+    timings = Timings()
+    timings.record("get_page_id", 0.02)
+    timings.record("get_page_id", 3)
+    request_stats = RequestStats()
+    request_stats.record(
+        RequestRecord("GET", "/rest/api/content", 200, 0, 100, latency=0.02)
+    )
+    request_stats.record(
+        RequestRecord("PUT", "/rest/api/content/{id}", 429, 10, 20, latency=0.5)
+    )
+
+    metrics = format_metrics(
+        "post-page", timings, request_stats, page_counts={"created": 2}
+    ).splitlines()
+    assert 'confluence_poster_pages{command="post-page",status="created"} 2' in metrics
+    assert 'confluence_poster_pages{command="post-page",status="updated"} 0' in metrics
+    assert 'confluence_poster_pages{command="post-page",status="failed"} 0' in metrics
+    assert (
+        'confluence_poster_phase_duration_seconds_bucket{command="post-page",phase="get_page_id",le="0.025"} 1'
+        in metrics
+    )
+    assert (
+        'confluence_poster_phase_duration_seconds_bucket{command="post-page",phase="get_page_id",le="+Inf"} 2'
+        in metrics
+    )
+    assert (
+        'confluence_poster_api_requests{command="post-page",method="PUT",endpoint="/rest/api/content/{id}",status="429"} 1'
+        in metrics
+    )
+    assert 'confluence_poster_api_sent_bytes{command="post-page"} 10' in metrics
+
+
+def test_write_metrics_textfile(tmp_path):
+    """The file is replaced, no temporary files are left behind"""
+    textfile = tmp_path / "confluence_poster.prom"
+    write_metrics_textfile(textfile, "first\n")
+    write_metrics_textfile(textfile, "second\n")
+    assert textfile.read_text() == "second\n"
+    assert list(tmp_path.iterdir()) == [textfile]
+
+
+def test_page_counts_skipped_and_failed():
+    """Pages left unprocessed on purpose are counted apart from the failures"""
+    page_counts = Counter()
+    report = Report(page_counts=page_counts)
+    report.add(ReportEntry("LOC", "created", "1", None, "created"))
+    report.add(
+        ReportEntry("LOC", "other author", "2", None, "unprocessed"),
+        SkipReason("Last updated by other, not pytest"),
+    )
+    for title in ("missing file", "API error"):
+        report.add(ReportEntry("LOC", title, None, None, "unprocessed"), "Error")
+
+    metrics = format_metrics("post-page", Timings(), page_counts=page_counts)
+    for status, number in [("created", 1), ("skipped", 1), ("failed", 2)]:
+        assert (
+            f'confluence_poster_pages{{command="post-page",status="{status}"}} {number}'
+            in metrics.splitlines()
+        )
+    assert "unprocessed" not in metrics
@@ -8,6 +8,7 @@ from confluence_poster.poster_config import (
     PageSchema,
     AllowedFileFormat,
 )
+from confluence_poster.main_helpers import PostedPage
 
 pytestmark = pytest.mark.offline
 
@@ -82,3 +83,35 @@ def test_page_text(tmp_path, file_exists):
 
     p.page_text = updated_content
     assert p.page_text == updated_content
+
+
+def test_empty_page_text_is_kept(tmp_path):
+    """Text that was set to an empty string is not replaced by the contents of the file"""
+    page_file = tmp_path / "page.confluencewiki"
+    page_file.write_text("h1. Test")
+    p = Page(page_title="title", page_file=str(page_file), page_space="LOC")
+    p.page_text = ""
+    assert p.page_text == ""
+
+
+def test_page_is_slotted():
+    """Pages are kept in memory for the whole run, huge configs should not pay for per-instance __dict__"""
+    p = Page(page_title="title", page_file="/tmp/file.md", page_space="LOC")
+    assert not hasattr(p, "__dict__")
+    with pytest.raises(AttributeError):
+        p.some_attribute = "value"
+
+
+def test_posted_page_from_page():
+    p = Page(
+        page_title="title",
+        page_file="/tmp/file.md",
+        page_space="LOC",
+        page_file_format=AllowedFileFormat.markdown,
+        _page_text="text",
+    )
+    posted_page = PostedPage.from_page(p)
+    assert not hasattr(posted_page, "__dict__")
+    assert asdict(p).items() <= asdict(posted_page).items()
+    assert posted_page.page_text is p.page_text, "Page text should not be copied"
+    assert posted_page.page_id is None and posted_page.version_comment is None
@@ -0,0 +1,65 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from confluence_poster.pipeline_helpers import prepare_ahead
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.mark.parametrize("depth", [0, 1, 3])
+def test_prepare_ahead_bounded(depth):
+    """Items come in order, no more than depth items are prepared ahead of the consumed one"""
+    prepared, lock = [], Lock()
+
+    def prepare(item):
+        with lock:
+            prepared.append(item)
+        return item * 2
+
+    consumed = []
+    with ThreadPoolExecutor(max_workers=max(depth, 1)) as executor:
+        for item, result in prepare_ahead(range(10), prepare, executor, depth):
+            assert result == item * 2
+            with lock:
+                assert len(prepared) <= item + depth + 1
+            consumed.append(item)
+    assert consumed == list(range(10))
+    assert sorted(prepared) == list(range(10))
+
+
+def test_prepare_ahead_overlaps():
+    """The next item is prepared while the consumer is busy with the current one"""
+    prepared = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for item, _ in prepare_ahead([1, 2], prepared.append, executor, depth=1):
+            if item == 1:
+                executor.submit(
+                    lambda: None
+                ).result()  # everything submitted before is done
+                assert prepared == [1, 2]
+
+
+def test_prepare_ahead_error():
+    def prepare(item):
+        if item == 2:
+            raise ValueError(item)
+        return item
+
+    consumed = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(ValueError):
+            for item, _ in prepare_ahead(range(5), prepare, executor, depth=2):
+                consumed.append(item)
+    assert consumed == [0, 1]
+
+
+def test_prepare_ahead_release():
+    """Items are released once the consumer asks for the next one"""
+    released = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for item, _ in prepare_ahead(
+            range(3), lambda _: None, executor, depth=1, release=released.append
+        ):
+            assert released == list(range(item))
+    assert released == [0, 1, 2]
@@ -0,0 +1,45 @@
+import pytest
+from io import StringIO
+
+from confluence_poster.progress_helpers import Progress, format_duration, format_size
+from confluence_poster.request_stats_helpers import RequestStats
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.mark.parametrize(
+    "seconds,expected", [(5, "5s"), (65, "1m05s"), (3725, "1h02m")]
+)
+def test_format_duration(seconds, expected):
+    assert format_duration(seconds) == expected
+
+
+@pytest.mark.parametrize(
+    "size,expected", [(512, "512 B"), (2048, "2.0 KiB"), (3 * 1024**2, "3.0 MiB")]
+)
+def test_format_size(size, expected):
+    assert format_size(size) == expected
+
+
+def test_progress_not_tty():
+    """Without a terminal the progress is printed as separate lines, the last one when the run stops"""
+    stream = StringIO()
+    progress = Progress(request_stats=RequestStats(), stream=stream)
+    progress.start(4)
+    progress.advance()
+    assert "Pages 1/4 (25%)" in progress.status_line()
+    assert "ETA" in progress.status_line()
+    progress.advance(3)
+    progress.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert "\r" not in stream.getvalue()
+    assert lines[-1].startswith("Pages 4/4 (100%)")
+    assert "0 requests in flight | 0 B uploaded | done in" in lines[-1]
+
+
+def test_progress_stop_without_start():
+    """Commands that do not process pages never start the progress"""
+    stream = StringIO()
+    Progress(stream=stream).stop()
+    assert stream.getvalue() == ""
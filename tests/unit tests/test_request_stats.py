@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from requests import Request, Response, Session
+
+from confluence_poster.request_stats_helpers import (
+    RequestStats,
+    endpoint_template,
+    percentile,
+)
+
+pytestmark = pytest.mark.offline
+
+
+def mk_response(method: str, url: str, body=None, content=b"", latency_ms=10):
+    response = Response()
+    response.status_code = 200
+    response._content = content
+    response.request = Request(method, url, data=body).prepare()
+    response.elapsed = timedelta(milliseconds=latency_ms)
+    return response
+
+
+@pytest.mark.parametrize(
+    "url,base_path,endpoint",
+    [
+        (
+            "https://confluence.local/rest/api/content/123?expand=version",
+            "",
+            "/rest/api/content/{id}",
+        ),
+        (
+            "https://site.atlassian.net/wiki/rest/api/content/123/child/attachment",
+            "/wiki",
+            "/rest/api/content/{id}/child/attachment",
+        ),
+        (
+            "https://confluence.local/rest/api/space/SPACE1",
+            "",
+            "/rest/api/space/SPACE1",
+        ),
+    ],
+)
+def test_endpoint_template(url, base_path, endpoint):
+    assert endpoint_template(url, base_path) == endpoint
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([5], 99) == 5
+
+
+def test_instrument_adds_hook():
+    session = Session()
+    stats = RequestStats()
+    stats.instrument(session, base_url="https://site.atlassian.net/wiki")
+    assert stats._on_response in session.hooks["response"]
+
+
+def test_records_grouped_by_endpoint():
+    """Checks that the calls are accounted per endpoint, together with bytes and statuses"""
+    stats = RequestStats()
+    for page_id in range(3):
+        stats._on_response(
+            mk_response(
+                "GET",
+                f"https://confluence.local/rest/api/content/{page_id}",
+                content=b"{}",
+            )
+        )
+    stats._on_response(
+        mk_response("PUT", "https://confluence.local/rest/api/content/1", body="body")
+    )
+
+    grouped = stats.by_endpoint()
+    assert len(grouped[("GET", "/rest/api/content/{id}")]) == 3
+    assert grouped[("PUT", "/rest/api/content/{id}")][0].request_bytes == 4
+
+    output = str(stats)
+    assert "HTTP requests: 4" in output
+    assert "sent 4 B, received 6 B" in output
+    assert "Statuses: 200: 4" in output
@@ -0,0 +1,86 @@
+import json
+import pytest
+
+from confluence_poster.poster_config import Page
+from confluence_poster.report_helpers import merge_ndjson_reports
+from confluence_poster.shard_helpers import Shard, parse_shard, select_shard
+
+pytestmark = pytest.mark.offline
+
+
+def make_pages(count: int) -> list:
+    return [Page(f"Page {_}", "", "LOC") for _ in range(count)]
+
+
+@pytest.mark.parametrize("value", ["1", "0/3", "4/3", "a/b", "1/0"])
+def test_parse_bad_shard(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_shards_partition_pages():
+    """Every page goes to exactly one shard, the order of the pages is kept"""
+    pages = make_pages(100)
+    shards = [select_shard(pages, Shard(_, 4)) for _ in range(1, 5)]
+    assert sorted(_.page_title for shard in shards for _ in shard) == sorted(
+        _.page_title for _ in pages
+    )
+    assert all(shards), "Pages should be spread over the shards"
+    for shard in shards:
+        assert shard == [_ for _ in pages if _ in shard]
+
+
+def test_shards_are_stable():
+    """Adding pages does not move the existing ones"""
+    pages = make_pages(50)
+    before = select_shard(pages, Shard(2, 3))
+    after = select_shard(pages + [Page("New page", "", "LOC")], Shard(2, 3))
+    assert [_.page_title for _ in before] == [
+        _.page_title for _ in after if _.page_title != "New page"
+    ]
+
+
+def test_parent_chains_stay_together():
+    pages = make_pages(30)
+    for number in range(1, 10):
+        # A chain: Page 0 <- Page 1 <- ... <- Page 9
+        pages[number].parent_page_title = f"Page {number - 1}"
+    pages[10].parent_page_path = "Some/Path/Page 9"
+    pages[11].parent_page_title = "Page that is not posted"
+    for number in range(1, 4):
+        titles = {_.page_title for _ in select_shard(pages, Shard(number, 3))}
+        chain = {f"Page {_}" for _ in range(11)}
+        assert chain <= titles or not chain & titles
+
+
+def test_parent_cycle():
+    pages = make_pages(2)
+    pages[0].parent_page_title = "Page 1"
+    pages[1].parent_page_title = "Page 0"
+    assert len(select_shard(pages, Shard(1, 2)) + select_shard(pages, Shard(2, 2))) == 2
+
+
+def test_merge_reports():
+    lines = [
+        {"type": "page", "title": "A", "status": "created"},
+        {"type": "summary", "created": 1, "updated": 0, "unprocessed": 0},
+        {"type": "page", "title": "B", "status": "updated"},
+        {"type": "summary", "created": 0, "updated": 1, "unprocessed": 0},
+    ]
+    for summary, requests, total_time, shard in (
+        (lines[1], 3, 2.0, "2/2"),
+        (lines[3], 4, 3.0, "1/2"),
+    ):
+        summary.update(requests=requests, total_time=total_time, shard=shard)
+
+    *pages, summary = merge_ndjson_reports(json.dumps(_) + "\n" for _ in lines)
+    assert [_["title"] for _ in pages] == ["A", "B"]
+    assert summary == {
+        "type": "summary",
+        "created": 1,
+        "updated": 1,
+        "unprocessed": 0,
+        "requests": 7,
+        "total_time": 3.0,
+        "shards": ["1/2", "2/2"],
+    }
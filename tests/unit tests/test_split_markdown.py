@@ -0,0 +1,68 @@
+import pytest
+from confluence_poster.convert_utils import split_markdown, convert_using_markdown_lib
+
+pytestmark = pytest.mark.offline
+
+section = """# Section {number}
+
+Some *text* with a [reference link][ref{number}] and `code`.
+
+* One
+* Two
+    * Nested
+
+```python
+# Not a heading
+print({number})
+```
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+## Subsection {number}
+Paragraph
+### Heading right after text
+
+> Quote
+> # Heading in quote
+
+[ref{number}]: https://example.com/{number} "Title"
+"""
+document = "\n".join(section.format(number=_) for _ in range(20))
+
+
+def test_split_at_headings():
+    chunks = split_markdown(document, min_chunk_size=1)
+    # Headings right after a paragraph or inside a quote are not split at
+    assert len(chunks) == 40
+    for number, chunk in enumerate(chunks[::2]):
+        assert chunk.startswith(f"# Section {number}")
+        # The chunk gets only the reference definitions it uses
+        assert f"[ref{number}]: https://example.com/{number}" in chunk
+        assert chunk.count("]: https://example.com/") == 1
+    assert all(_.startswith("## Subsection") for _ in chunks[1::2])
+
+
+def test_split_small_document():
+    assert split_markdown(document) == [document]
+
+
+def test_no_split_in_fenced_code():
+    text = "# One\n\n````\n\n# Not a heading\n```\n\n# Still not\n````\n\n# Two\n"
+    assert split_markdown(text, min_chunk_size=1) == [
+        "# One\n\n````\n\n# Not a heading\n```\n\n# Still not\n````\n",
+        "# Two",
+    ]
+
+
+def test_no_split_with_html_blocks():
+    text = "# One\n\n<div>\n\n# Inside div\n\n</div>\n\n# Two\n"
+    assert split_markdown(text, min_chunk_size=1) == [text]
+
+
+@pytest.mark.parametrize("min_chunk_size", [1, 500, 4000])
+def test_parallel_conversion_matches_single(min_chunk_size):
+    assert convert_using_markdown_lib(
+        document, workers=2, min_chunk_size=min_chunk_size
+    ) == convert_using_markdown_lib(document)
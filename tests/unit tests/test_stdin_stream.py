@@ -0,0 +1,75 @@
+import json
+import pytest
+
+from confluence_poster.poster_config import AllowedFileFormat
+from confluence_poster.stdin_stream_helpers import (
+    parse_page_record,
+    read_page_records,
+)
+
+pytestmark = pytest.mark.offline
+
+
+def test_parse_page_record_defaults():
+    record = parse_page_record(json.dumps({"title": "Page", "body": "# Text"}), "SPC")
+    assert record.title == "Page"
+    assert record.space == "SPC"
+    assert record.parent is None
+    assert record.file_format is AllowedFileFormat.markdown
+    assert record.body == "# Text"
+
+
+def test_parse_page_record_all_fields():
+    line = json.dumps(
+        {
+            "title": "Page",
+            "space": "OTHER",
+            "parent": "Parent",
+            "format": "confluencewiki",
+            "body": "h1. Text",
+        }
+    )
+    record = parse_page_record(line, "SPC")
+    assert record.space == "OTHER"
+    assert record.parent == "Parent"
+    assert record.file_format is AllowedFileFormat.confluencewiki
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "not json",
+        "[]",
+        json.dumps({"body": "Text"}),
+        json.dumps({"title": "", "body": "Text"}),
+        json.dumps({"title": "Page"}),
+        json.dumps({"title": "Page", "body": "Text", "space": 1}),
+        json.dumps({"title": "Page", "body": "Text", "format": "docx"}),
+        json.dumps({"title": "Page", "body": "Text", "format": "None"}),
+    ],
+)
+def test_parse_page_record_malformed(line):
+    with pytest.raises(ValueError):
+        parse_page_record(line, "SPC")
+
+
+def test_parse_page_record_no_space():
+    line = json.dumps({"title": "Page", "body": "Text"})
+    with pytest.raises(ValueError):
+        parse_page_record(line, None)
+    assert parse_page_record(line[:-1] + ', "space": "SPC"}', None).space == "SPC"
+
+
+def test_read_page_records_keeps_going():
+    """Malformed lines are reported with their number, blank lines are skipped"""
+    lines = [
+        json.dumps({"title": "One", "body": ""}) + "\n",
+        "\n",
+        "broken\n",
+        json.dumps({"title": "Two", "body": ""}) + "\n",
+    ]
+    records = list(read_page_records(lines, "SPC"))
+    assert [_[0] for _ in records] == [1, 3, 4]
+    assert records[0][1].title == "One"
+    assert records[1][1] is None and records[1][2].startswith("Line 3:")
+    assert records[2][1].title == "Two"
@@ -0,0 +1,46 @@
+import json
+import pytest
+
+from confluence_poster.timing_helpers import Timings
+
+pytestmark = pytest.mark.offline
+
+
+def test_span_records_phase_and_page():
+    """Checks that the spans are aggregated per phase and per page"""
+    timings = Timings()
+    for _ in range(3):
+        with timings.span("get_page_id", page="SPACE::Page"):
+            pass
+    with timings.span("load_config"):
+        pass
+
+    data = timings.as_dict()
+    assert data["phases"]["get_page_id"]["count"] == 3
+    assert data["phases"]["load_config"]["count"] == 1
+    assert list(data["pages"]) == ["SPACE::Page"]
+    assert set(data["pages"]["SPACE::Page"]) == {"get_page_id", "total"}
+
+
+def test_span_records_on_exception():
+    """The time spent in the phase is recorded even if the phase raised"""
+    timings = Timings()
+    with pytest.raises(ValueError):
+        with timings.span("create_page", page="SPACE::Page"):
+            raise ValueError
+    assert timings.as_dict()["phases"]["create_page"]["count"] == 1
+
+
+def test_timings_output(tmp_path):
+    """Checks the table and the JSON representation of the timings"""
+    timings = Timings()
+    timings.record("markdown_conversion", 0.5, page="SPACE::Page")
+    timings.record("markdown_conversion", 1.5, page="SPACE::Page")
+
+    assert "markdown_conversion" in str(timings)
+    assert "SPACE::Page 2.000s" in str(timings)
+
+    timings_file = tmp_path / "timings.json"
+    timings.write_json(timings_file)
+    stats = json.loads(timings_file.read_text())["phases"]["markdown_conversion"]
+    assert stats == {"count": 2, "total": 2.0, "mean": 1.0, "max": 1.5}
@@ -8,8 +8,12 @@ from pathlib import Path
 import re
 from inspect import currentframe
 import io
+import atexit
+from shutil import rmtree
+from tempfile import mkdtemp
 
 from confluence_poster.poster_config import Config
+from fake_confluence import FakeConfluenceServer
 
 
 def locate_real_confluence_config_file(config_name="local_config.toml"):
@@ -22,23 +26,62 @@ def locate_real_confluence_config_file(config_name="local_config.toml"):
         return str(tests_directory / config_name)
 
 
+def start_fake_confluence() -> (str, str):
+    """Starts the fake Confluence server and generates the configs for two users of it.
+    The server is stopped and the configs are removed when the tests finish.
+
+    Returns paths to the config and the other user's config"""
+    server = FakeConfluenceServer(spaces=("LOC",)).start()
+    config_dir = Path(mkdtemp(prefix="confluence_poster_fake_"))
+    atexit.register(rmtree, config_dir, ignore_errors=True)
+    atexit.register(server.stop)
+
+    page_file = config_dir / "page1.confluencewiki"
+    page_file.write_text("h1. Header\n\nSome text")
+    config_files = []
+    for username in ("pytest", "pytest_other"):
+        config_file = config_dir / f"{username}_config.toml"
+        config_file.write_text(
+            toml.dumps(
+                {
+                    "pages": {
+                        "default": {"page_space": "LOC"},
+                        "page1": {
+                            "page_title": "pytest: fake confluence page",
+                            "page_file": str(page_file),
+                        },
+                    },
+                    "auth": {
+                        "confluence_url": server.url,
+                        "username": username,
+                        "password": "password",
+                        "is_cloud": False,
+                    },
+                }
+            )
+        )
+        config_files.append(str(config_file))
+    return tuple(config_files)
+
+
 # The config filename for testing against local instance
 real_confluence_config = locate_real_confluence_config_file()
 other_user_config = locate_real_confluence_config_file("local_config_other_user.toml")
 repo_config_path = locate_real_confluence_config_file("config.toml")
 
-if Path(real_confluence_config).exists():
-    real_config = Config(real_confluence_config)
-    confluence_instance = Confluence(
-        url=real_config.auth.url,
-        username=real_config.auth.username,
-        password=real_config.auth.password,
-    )
-else:
+if not Path(real_confluence_config).exists():
     print(
-        f"Config for testing local confluence: {real_confluence_config} does not exist."
+        f"Config for testing local confluence: {real_confluence_config} does not exist. "
+        "Using fake Confluence."
     )
-    confluence_instance = None
+    real_confluence_config, other_user_config = start_fake_confluence()
+
+real_config = Config(real_confluence_config)
+confluence_instance = Confluence(
+    url=real_config.auth.url,
+    username=real_config.auth.username,
+    password=real_config.auth.password,
+)
 
 
 def mk_tmp_file(